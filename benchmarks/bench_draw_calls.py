@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_draw_calls
+~~~~~~~~
+Draw calls and GL state changes per frame
+
+A board like the one on a game round (board, scores label, two
+paddles, the ball and a number of extra balls) is drawn sprite by
+sprite and then as a single batch, counting GL calls on each frame.
+Counts don't depend on the driver, so a software rendered context
+(e.g. LIBGL_ALWAYS_SOFTWARE=1 under xvfb-run) does just fine.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/bench_draw_calls.py [entities] [frames]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import sys
+import time
+
+import pyglet
+
+from uberpong.engine.glstats import GLCallCounter
+
+
+def build_board(entities, batch=None):
+    """Sprites and labels as laid out by PlayerClient"""
+    texture = pyglet.image.Texture.create(1024, 1024)
+    paddle = texture.get_region(0, 0, 32, 64)
+    ball = texture.get_region(32, 0, 32, 32)
+    board = texture.get_region(0, 256, 800, 600)
+
+    groups = [pyglet.graphics.OrderedGroup(i) for i in range(4)]
+    if batch is None:
+        groups = [None] * 4
+
+    things = [
+        pyglet.sprite.Sprite(board, batch=batch, group=groups[0]),
+        pyglet.text.Label(
+            '3   5', font_size=48, x=400, y=568,
+            batch=batch, group=groups[1]
+        ),
+        pyglet.sprite.Sprite(paddle, x=32, y=300,
+                             batch=batch, group=groups[2]),
+        pyglet.sprite.Sprite(paddle, x=768, y=300,
+                             batch=batch, group=groups[2]),
+    ]
+    for i in range(entities + 1):
+        things.append(pyglet.sprite.Sprite(
+            ball, x=(i * 37) % 800, y=(i * 53) % 600,
+            batch=batch, group=groups[3]
+        ))
+    return things
+
+
+def run(window, counter, draw, frames):
+    counter.reset()
+    start = time.perf_counter()
+    for i in range(frames):
+        window.switch_to()
+        window.dispatch_events()
+        window.clear()
+        draw()
+        counter.end_frame()
+        window.flip()
+    elapsed = time.perf_counter() - start
+    return (
+        counter.total_draw_calls / frames,
+        counter.total_state_changes / frames,
+        1000 * elapsed / frames
+    )
+
+
+def main(argv):
+    entities = int(argv[1]) if len(argv) > 1 else 20
+    frames = int(argv[2]) if len(argv) > 2 else 120
+
+    window = pyglet.window.Window(800, 600, vsync=False, visible=False)
+    counter = GLCallCounter()
+    counter.install()
+
+    things = build_board(entities)
+
+    def draw_each():
+        for thing in things:
+            thing.draw()
+
+    batch = pyglet.graphics.Batch()
+    batched = build_board(entities, batch)
+
+    print('{:>10} {:>12} {:>14} {:>10}'.format(
+        'mode', 'draw calls', 'state changes', 'ms/frame'))
+    for mode, draw in (('each', draw_each), ('batch', batch.draw)):
+        draws, states, ms = run(window, counter, draw, frames)
+        print('{:>10} {:>12.1f} {:>14.1f} {:>10.3f}'.format(
+            mode, draws, states, ms))
+
+    counter.uninstall()
+    window.close()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
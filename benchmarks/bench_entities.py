@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_entities
+~~~~~~~~
+Physics tick time against entity count
+
+A board is populated with an increasing number of balls and
+obstacles, and the time it takes to step the space for a tick
+is measured with both the default broadphase and a spatial hash.
+Results are plotted right onto the terminal.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/bench_entities.py [ticks]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import sys
+import time
+
+from uberpong.engine.spot import spot_set
+from uberpong.game.cvars import register_cvars
+from uberpong.engine.entity import EntityManager
+from uberpong.game.entities import Ball, Board, Obstacle
+
+# Board dimensions
+WIDTH, HEIGHT = 800, 600
+
+# Entity counts to be measured
+COUNTS = (1, 10, 25, 50, 100, 200, 400)
+
+# Physics timestep (the same as the server default)
+TIMESTEP = 1.0 / 66
+
+# Width of the longest bar on the plot
+PLOT_WIDTH = 50
+
+
+def spot_init():
+    """Server SPOT values needed by entities"""
+    register_cvars()
+    spot_set('ball_size', (32, 32))
+    spot_set('obstacle_size', (16, 16))
+
+
+def build(count, spatial_hash):
+    """Create a board with count entities on it (a fifth are obstacles)"""
+    mgr = EntityManager()
+    Board(WIDTH, HEIGHT, mgr)
+    mgr.register_class('ent_ball', Ball)
+    mgr.register_class('ent_obstacle', Obstacle)
+
+    obstacles = count // 5
+    balls = count - obstacles
+
+    mgr.create_entities(
+        'ent_obstacle', obstacles,
+        positions=[
+            (WIDTH // 4 + (i * 37) % (WIDTH // 2),
+             16 + (i * 53) % (HEIGHT - 32))
+            for i in range(obstacles)
+        ]
+    )
+    for i, ball in enumerate(mgr.create_entities(
+            'ent_ball', balls,
+            positions=[
+                (48 + (i * 41) % (WIDTH - 96), 24 + (i * 29) % (HEIGHT - 48))
+                for i in range(balls)
+            ])):
+        ball.apply_impulse((1500 if i % 2 else -1500, (i % 7 - 3) * 300))
+
+    if spatial_hash:
+        mgr.enable_spatial_hash()
+    return mgr
+
+
+def measure(count, spatial_hash, ticks):
+    """Mean tick time in milliseconds"""
+    mgr = build(count, spatial_hash)
+    start = time.perf_counter()
+    for i in range(ticks):
+        mgr.step(TIMESTEP)
+    return (time.perf_counter() - start) * 1000 / ticks
+
+
+def plot(results):
+    """Plot results as horizontal bars"""
+    top = max(max(r) for r in results.values())
+    for count, (tree, shash) in sorted(results.items()):
+        for label, value in (('tree', tree), ('hash', shash)):
+            bar = '#' * max(1, int(PLOT_WIDTH * value / top))
+            print('{:>5} {} {:8.3f} ms |{}'.format(count, label, value, bar))
+
+
+def main(argv):
+    ticks = int(argv[0]) if len(argv) else 200
+    spot_init()
+
+    results = {}
+    for count in COUNTS:
+        results[count] = (
+            measure(count, False, ticks),
+            measure(count, True, ticks)
+        )
+
+    print('tick time against entity count ({} ticks each)'.format(ticks))
+    plot(results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
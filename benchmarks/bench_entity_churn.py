@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_entity_churn
+~~~~~~~~
+Memory per entity and entity churn throughput
+
+Memory taken by each ball is measured with tracemalloc, then balls
+are created and destroyed over and over with and without pooling.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/bench_entity_churn.py [count] [rounds]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import sys
+import time
+import tracemalloc
+
+from uberpong.engine.spot import spot_set
+from uberpong.game.cvars import register_cvars
+from uberpong.engine.entity import EntityManager
+from uberpong.game.entities import Ball
+
+
+def spot_init():
+    """Server SPOT values needed by entities"""
+    register_cvars()
+    spot_set('ball_size', (32, 32))
+
+
+def memory_per_entity(count):
+    """Bytes allocated per ball"""
+    mgr = EntityManager()
+    mgr.register_class('ent_ball', Ball)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    balls = mgr.create_entities('ent_ball', count)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(s.size_diff for s in after.compare_to(before, 'filename'))
+    assert len(balls) == count
+    return size / count
+
+
+def churn(count, rounds, pooled):
+    """Entities created (and destroyed) per second"""
+    mgr = EntityManager()
+    mgr.register_class('ent_ball', Ball, pooled=pooled)
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        balls = mgr.create_entities('ent_ball', count)
+        mgr.destroy_entities([b.handle for b in balls])
+    return count * rounds / (time.perf_counter() - start)
+
+
+def main(argv):
+    count = int(argv[0]) if len(argv) > 0 else 200
+    rounds = int(argv[1]) if len(argv) > 1 else 50
+    spot_init()
+
+    print('memory per entity: {:.0f} bytes'.format(memory_per_entity(count)))
+    for pooled in (False, True):
+        print('churn ({}): {:.0f} entities/s'.format(
+            'pooled' if pooled else 'unpooled', churn(count, rounds, pooled)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_frame_pacing
+~~~~~~~~
+CPU usage of the main loop with and without frame pacing
+
+The main loop of Game.go is run for a few seconds on screens alike
+the ones on the game: a static one (credits, splash) and a game
+round one (board batch plus a 66 Hz tick on the clock), the static
+one also at the idle rate static states ask for. CPU usage, frames
+per second and the worst gap between window event dispatches are
+reported for each of them. Since input wakes the loop up, that gap
+is no bound on input latency where displays can be waited on (X11),
+only elsewhere.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/bench_frame_pacing.py [seconds] [fps]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import sys
+import time
+
+import pyglet
+
+# Frame rate static states (e.g. credits) idle at
+IDLE_FPS = 10
+
+from uberpong.engine.pacer import FramePacer
+
+
+def static_screen():
+    label = pyglet.text.Label('UBER PONG', font_size=48, x=400, y=300,
+                              anchor_x='center', anchor_y='center')
+    return label.draw, None
+
+
+def round_screen():
+    batch = pyglet.graphics.Batch()
+    texture = pyglet.image.Texture.create(1024, 1024)
+    sprites = [
+        pyglet.sprite.Sprite(texture.get_region(0, 256, 800, 600),
+                             batch=batch),
+        pyglet.sprite.Sprite(texture.get_region(0, 0, 32, 64),
+                             x=32, y=300, batch=batch),
+        pyglet.sprite.Sprite(texture.get_region(0, 0, 32, 64),
+                             x=768, y=300, batch=batch),
+        pyglet.sprite.Sprite(texture.get_region(32, 0, 32, 32),
+                             x=400, y=300, batch=batch),
+    ]
+
+    def tick(dt):
+        sprites[3].x = (sprites[3].x + 3) % 800
+
+    return batch.draw, tick
+
+
+def run(window, draw, seconds, pacer):
+    frames = 0
+    max_gap = 0.0
+    last_events = time.perf_counter()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < seconds:
+        pyglet.clock.tick()
+
+        due = pacer is None or pacer.frame_due()
+        window.switch_to()
+        window.dispatch_events()
+        now = time.perf_counter()
+        max_gap = max(max_gap, now - last_events)
+        last_events = now
+        if due:
+            window.clear()
+            draw()
+            window.flip()
+            frames += 1
+
+        if pacer is not None:
+            if due:
+                pacer.frame_done()
+            pacer.wait()
+
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    return 100 * cpu / wall, frames / wall, 1000 * max_gap
+
+
+def main(argv):
+    seconds = float(argv[1]) if len(argv) > 1 else 3
+    fps = int(argv[2]) if len(argv) > 2 else 60
+
+    window = pyglet.window.Window(800, 600, vsync=False)
+
+    print('{:>8} {:>8} {:>8} {:>8} {:>12}'.format(
+        'screen', 'pacing', 'cpu %', 'fps', 'max gap ms'))
+    for name, screen in (('static', static_screen), ('round', round_screen)):
+        draw, tick = screen()
+        if tick is not None:
+            pyglet.clock.schedule_interval(tick, 1 / 66.0)
+
+        pacers = [('off', None), ('on', FramePacer(fps))]
+        if tick is None:
+            pacers.append(('idle', FramePacer(min(fps, IDLE_FPS))))
+        for pacing, pacer in pacers:
+            cpu, rate, gap = run(window, draw, seconds, pacer)
+            print('{:>8} {:>8} {:>8.1f} {:>8.1f} {:>12.2f}'.format(
+                name, pacing, cpu, rate, gap))
+
+        if tick is not None:
+            pyglet.clock.unschedule(tick)
+
+    window.close()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_messages
+~~~~~~~~
+Message bus throughput
+
+Ticks worth of messages (10k by default) are sent among a bunch
+of entities using a few types of message, and then dispatched.
+The legacy dict envelope queue is measured as well for reference.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/bench_messages.py [messages] [ticks]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import sys
+import time
+import statistics
+
+from uberpong.engine.message import MessageBus, message_type
+
+# Entities taking part on this benchmark
+RECIPIENTS = 100
+
+Hit = message_type('Hit', ('force',))
+Score = message_type('Score', ('points',))
+Ping = message_type('Ping')
+
+
+class Sink:
+    """A recipient counting what it gets"""
+
+    def __init__(self):
+        self.received = 0
+
+    def on_message(self, msg):
+        self.received += 1
+
+    def on_messages(self, messages):
+        self.received += len(messages)
+
+
+def count_batch(recipient, messages):
+    recipient.received += len(messages)
+
+
+def bench_bus(sinks, messages, ticks):
+    bus = MessageBus()
+    bus.register_handler(Hit, count_batch)
+    bus.register_handler(Score, count_batch)
+    types = (Hit, Score)
+    resolve = sinks.__getitem__
+
+    timings = []
+    for tick in range(ticks):
+        start = time.perf_counter()
+        post = bus.post
+        for i in range(messages):
+            post(types[i & 1]((0, i % RECIPIENTS, i)))
+        bus.dispatch(resolve)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_legacy(sinks, messages, ticks):
+    queue = []
+
+    timings = []
+    for tick in range(ticks):
+        start = time.perf_counter()
+        for i in range(messages):
+            queue.append({'from': 0, 'to': i % RECIPIENTS, 'data': {'n': i}})
+        while len(queue):
+            msg = queue.pop()
+            sinks[msg['to']].on_message(msg)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(argv):
+    messages = int(argv[0]) if len(argv) > 0 else 10000
+    ticks = int(argv[1]) if len(argv) > 1 else 50
+
+    for name, bench in (('bus', bench_bus), ('legacy', bench_legacy)):
+        sinks = [Sink() for i in range(RECIPIENTS)]
+        timings = bench(sinks, messages, ticks)
+        assert sum(s.received for s in sinks) == messages * ticks
+
+        # median tick time is way less sensitive to noise than the mean
+        tick_time = statistics.median(timings)
+        print('{:>7}: {:10.0f} msg/s, {:7.3f} ms/tick (median)'.format(
+            name, messages / tick_time, tick_time * 1000))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
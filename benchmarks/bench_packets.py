@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_packets
+~~~~~~~~
+Packet build throughput
+
+Command requests and full update responses (both players, the ball
+and a few extra entities) are built over and over, on fresh packets
+and on pooled ones, and the number of builds per second is reported.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/bench_packets.py [builds]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import sys
+import time
+from array import array
+
+from uberpong.game.net.packet import Request, Response
+
+
+class State:
+    """Stand-in for an EntityState holding a few entities"""
+
+    def __init__(self, count):
+        self.count = count
+        self.positions = array('d', range(2 * count))
+        self.velocities = array('d', range(2 * count))
+
+
+def build_response(response, state):
+    response.status = Response.STATUS_OK
+    response.reason = Response.REASON_UPDATE
+    response.state = 102
+    response.set_ball_info(position=(400, 300), velocity=(-120, 40))
+    response.add_entities_state(40, state)
+    response.set_player_info(
+        name='you', score=3, number=1,
+        position=(20, 300), velocity=(0, -14)
+    )
+    response.set_player_info(
+        name='foe', score=5, number=2,
+        position=(780, 240), velocity=(0, 30)
+    )
+    return response.data
+
+
+def bench_requests(builds, pooled):
+    start = time.perf_counter()
+    for i in range(builds):
+        if pooled:
+            request = Request.acquire()
+            request.command = Request.CMD_MV_UP
+            request.player_id = 65537
+            request.data
+            request.release()
+        else:
+            request = Request(command=Request.CMD_MV_UP)
+            request.player_id = 65537
+            request.data
+    return builds / (time.perf_counter() - start)
+
+
+def bench_responses(builds, pooled, state):
+    start = time.perf_counter()
+    for i in range(builds):
+        if pooled:
+            response = Response.acquire()
+            build_response(response, state)
+            response.release()
+        else:
+            build_response(Response(), state)
+    return builds / (time.perf_counter() - start)
+
+
+def main(argv):
+    builds = int(argv[1]) if len(argv) > 1 else 1000000
+    state = State(4)
+
+    print('{:>10} {:>8} {:>14}'.format('packet', 'pooled', 'builds/s'))
+    for pooled in (False, True):
+        rate = bench_requests(builds, pooled)
+        print('{:>10} {:>8} {:>14,.0f}'.format('request', str(pooled), rate))
+    for pooled in (False, True):
+        rate = bench_responses(builds // 4, pooled, state)
+        print('{:>10} {:>8} {:>14,.0f}'.format('response', str(pooled), rate))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_proxy
+~~~~~~~~
+Network conditions proxy throughput
+
+A Proxy is run on a process of its own, emulating some latency,
+jitter and loss both ways, in front of an echo server. Lots of
+clients, each one on a socket of its own (so the proxy opens as many
+sockets towards the server), send datagrams through it at a steady
+rate for a while.
+
+Reported:
+
+    * packets relayed per second (both ways) and how many of them
+      made it across, beyond those lost on purpose
+    * CPU time the proxy spends per packet relayed, and the rate
+      that would take a whole core
+
+Client sockets take file descriptors on this process and the proxy's
+upstream ones on its own, so the open files limit (ulimit -n) has to
+allow for a few more than the number of clients.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/bench_proxy.py [clients] [rate] [seconds]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import multiprocessing
+import selectors
+import socket
+import sys
+import time
+
+from uberpong.ming.proxy import Conditions, Proxy
+
+HOST = '127.0.0.1'
+PROXY_PORT = 54290
+SERVER_PORT = 54291
+PAYLOAD = b'x' * 64
+LOSS = 0.01
+
+
+def run_proxy(ready, stop, results):
+    """Relay packets until told to stop, then report"""
+    conditions = Conditions(latency=20, jitter=5, loss=LOSS)
+    proxy = Proxy(port=PROXY_PORT, server_address=HOST,
+                  server_port=SERVER_PORT, up=conditions, down=conditions,
+                  seed=1)
+    ready.set()
+    cpu = time.process_time()
+    while not stop.is_set():
+        proxy.poll(0.05)
+    cpu = time.process_time() - cpu
+    results.put((cpu, proxy.up.packets_in + proxy.down.packets_in,
+                 proxy.packets_out, len(proxy.sockets) - 1))
+    proxy.close()
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rate = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind((HOST, SERVER_PORT))
+    server.setblocking(False)
+
+    ready, stop = multiprocessing.Event(), multiprocessing.Event()
+    results = multiprocessing.Queue()
+    proxy = multiprocessing.Process(target=run_proxy,
+                                    args=(ready, stop, results))
+    proxy.start()
+    ready.wait()
+
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ)
+    socks = []
+    for i in range(clients):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.bind((HOST, 0))
+        selector.register(sock, selectors.EVENT_READ)
+        socks.append(sock)
+
+    sent = echoed = returned = 0
+    start = time.perf_counter()
+    end = start + seconds
+    while True:
+        now = time.perf_counter()
+        if now >= end:
+            break
+
+        # clients take turns sending, at a steady rate overall
+        due = int((now - start) * rate)
+        while sent < due:
+            socks[sent % clients].sendto(PAYLOAD, (HOST, PROXY_PORT))
+            sent += 1
+
+        # the server echoes, clients take answers in
+        for key, events in selector.select(0.001):
+            sock = key.fileobj
+            while True:
+                try:
+                    data, address = sock.recvfrom(2048)
+                except BlockingIOError:
+                    break
+                if sock is server:
+                    server.sendto(data, address)
+                    echoed += 1
+                else:
+                    returned += 1
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    cpu, packets_in, packets_out, upstream = results.get()
+    proxy.join()
+    for sock in socks:
+        sock.close()
+    server.close()
+
+    relayed = echoed + returned
+    expected = sent * (1 - LOSS) + echoed * (1 - LOSS)
+    print('{} clients ({} proxy sockets) for {:.1f} s, {} packets/s sent'
+          .format(clients, upstream, elapsed, rate))
+    print('relayed:   {:10.0f} packets/s both ways'.format(relayed / elapsed))
+    print('delivered: {:10.1f} % of those not lost on purpose'.format(
+        100 * relayed / expected))
+    print('proxy cpu: {:10.1f} us/packet ({:.0f} packets/s on a core)'
+          .format(cpu / packets_in * 1e6, packets_in / cpu))
+
+
+if __name__ == '__main__':
+    main()
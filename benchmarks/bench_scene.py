@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_scene
+~~~~~~~~
+Server throughput on a headless, in-process simulation
+
+A Scene and two scripted players are put together on a loopback
+network (no sockets) and a clock driven by hand (no waiting), and
+a number of matches is played at full speed. Players follow the ball
+and miss it every now and then, driven by a seeded RNG, so every run
+plays exactly the same matches and only timings change across runs.
+
+Reported:
+
+    * ticks per second, out of the time spent on Scene.tick alone
+    * time spent per phase of a tick: pump (incoming requests),
+      step (physics), dispatch (entity messages) and broadcast
+      (building and sending snapshots)
+    * net memory blocks per tick (sys.getallocatedblocks, leaks and
+      growing buffers show up here) and garbage collections of the
+      youngest generation per 1000 ticks (allocation churn)
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/bench_scene.py [matches] [score_max] [seed]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import gc
+import random
+import sys
+import time
+
+import uberpong.ming as ming
+from uberpong.ming.loopback import LoopbackNetwork
+from uberpong.engine.clock import ManualClock
+from uberpong.engine.cvar import cvar_get, cvar_set
+from uberpong.engine.spot import spot_set
+from uberpong.game.cvars import register_cvars
+from uberpong.game.net import Request, Response
+from uberpong.game.net.scene import Scene
+from uberpong.game.net.host import SceneHost
+
+WIDTH, HEIGHT = 800, 600
+PORT = 54212
+
+# Longest match (in ticks) before giving up on it
+MAX_TICKS = 66 * 60 * 10
+
+
+def spot_init():
+    """Server SPOT values and cvars, as set by the game"""
+    register_cvars()
+    spot_set('paddle_position_start', (32, HEIGHT // 2))
+    spot_set('paddle_size', (32, 64))
+    spot_set('ball_position_start', (WIDTH // 2, HEIGHT // 2))
+    spot_set('ball_size', (32, 32))
+    spot_set('obstacle_size', (16, 16))
+
+    # a degrading server would play different matches on each run
+    cvar_set('sv_watchdog', False)
+    cvar_set('sv_profile', True)
+    cvar_set('sv_profile_dump', 0)
+
+
+class ScriptedPlayer(ming.Client):
+    """A player following the ball, missing it every now and then"""
+
+    def __init__(self, *, rng, skill, **kwargs):
+        """Constructor
+
+        Kwargs:
+            rng(random.Random): source of misses
+            skill(float): chance of moving the right way on a command
+            kwargs(dict, optional): see ming.Client
+        """
+        super().__init__(**kwargs)
+        self._rng = rng
+        self._skill = skill
+        self.id = None
+        self.state = None
+        self.paddle_y = None
+        self.ball_y = None
+
+    def on_data_received(self, data, host, port):
+        response = Response.acquire()
+        try:
+            response.data = data
+        except ValueError:
+            response.release()
+            return
+        if response.status == Response.STATUS_OK:
+            if response.reason == Response.REASON_CONN_GRANTED:
+                self.id = response.player_id
+            self.state = response.state
+
+            me = response.get_player_info(name='you')
+            if me is not None:
+                self.paddle_y = me['position'][1]
+            ball = response.get_ball_info()
+            if ball is not None:
+                self.ball_y = ball['position'][1]
+        response.release()
+
+    def command(self, command):
+        request = Request.acquire()
+        request.command = command
+        request.player_id = self.id
+        self.send(request.data)
+        request.release()
+
+    def act(self):
+        """Send whatever command the script says"""
+        if self.id is None:
+            self.command(Request.CMD_CONNECT)
+        elif self.state == Scene.ST_BEGIN:
+            self.command(Request.CMD_READY)
+        elif self.state == Scene.ST_PLAYING and self.ball_y is not None:
+            if self._rng.random() > self._skill:
+                return
+            if self.ball_y > self.paddle_y + 8:
+                self.command(Request.CMD_MV_UP)
+            elif self.ball_y < self.paddle_y - 8:
+                self.command(Request.CMD_MV_DN)
+
+    def receive(self):
+        """Take in everything sent by the server"""
+        while self.sock.pending:
+            self.pump()
+
+
+def play_match(seed):
+    """Play a whole match
+
+    Returns:
+        A tuple holding the scene stats, ticks played and the
+        time spent on Scene.tick
+    """
+    clock = ManualClock()
+    network = LoopbackNetwork()
+    scene = Scene(port=PORT, width=WIDTH, height=HEIGHT,
+                  clock=clock, sock=network.socket())
+
+    # the hosting client would reset the board as the match goes
+    host = SceneHost(scene, clock=clock, restart=False)
+    players = [
+        ScriptedPlayer(port=PORT, sock=network.socket(),
+                       rng=random.Random(seed * 2 + i), skill=0.9 - i * 0.1)
+        for i in range(2)
+    ]
+
+    tickrate = 1.0 / cvar_get('tickrate')
+    cmd_every = max(1, round(cvar_get('tickrate') / cvar_get('cl_cmdrate')))
+    elapsed = 0.0
+    ticks = 0
+    while scene.state != Scene.ST_GAME_SET and ticks < MAX_TICKS:
+        if ticks % cmd_every == 0:
+            for player in players:
+                player.act()
+
+        start = time.perf_counter()
+        clock.advance(tickrate)
+        elapsed += time.perf_counter() - start
+        ticks += 1
+
+        for player in players:
+            player.receive()
+
+    stats = scene.stats()
+    for player in players:
+        player.close()
+    host.close()
+    return stats, ticks, elapsed
+
+
+def main():
+    matches = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    score_max = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    spot_init()
+    cvar_set('sv_score_max', score_max)
+
+    collections = [0]
+
+    def on_gc(phase, info):
+        if phase == 'start' and info['generation'] == 0:
+            collections[0] += 1
+
+    phases = {}
+    total_ticks = 0
+    total_elapsed = 0.0
+    gc.callbacks.append(on_gc)
+    blocks = sys.getallocatedblocks()
+    for match in range(matches):
+        stats, ticks, elapsed = play_match(seed + match)
+        total_ticks += ticks
+        total_elapsed += elapsed
+        for phase, s in stats.items():
+            phases[phase] = phases.get(phase, 0.0) + s['total']
+    blocks = sys.getallocatedblocks() - blocks
+    gc.callbacks.remove(on_gc)
+
+    print('{} matches, {} ticks ({:.0f} s simulated)'.format(
+        matches, total_ticks, total_ticks / cvar_get('tickrate')))
+    print('ticks/s:     {:10.0f}'.format(total_ticks / total_elapsed))
+    print('us/tick:     {:10.1f}'.format(total_elapsed / total_ticks * 1e6))
+    tick_ms = phases.pop('tick')
+    for phase, ms in phases.items():
+        print('  {:<10} {:8.1f} us/tick {:5.1f}%'.format(
+            phase, ms / total_ticks * 1000, 100 * ms / tick_ms))
+    print('blocks/tick: {:10.2f}'.format(blocks / total_ticks))
+    print('gc0/1k ticks:{:10.1f}'.format(collections[0] * 1000 / total_ticks))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_scores_label
+~~~~~~~~
+Scores label update cost per frame
+
+Scores label updates are timed over a round, with the old way of
+setting text, font size and position on every frame against two
+prebuilt labels only laid out again when scores change. Scores
+change once every 'rate' frames.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/bench_scores_label.py [frames] [rate]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import sys
+import time
+
+import pyglet
+
+GRAY = (128, 128, 128)
+
+
+def every_frame(frames, rate):
+    label = pyglet.text.Label('', font_size=48, x=400, y=568,
+                              anchor_x='center', anchor_y='center')
+    start = time.perf_counter()
+    for frame in range(frames):
+        score = frame // rate
+        label.y = 568
+        label.font_size = 48
+        label.text = '{}   {}'.format(score, score)
+    return time.perf_counter() - start
+
+
+def dirty_flag(frames, rate):
+    batch = pyglet.graphics.Batch()
+    labels = (
+        pyglet.text.Label('', font_size=48, x=400, y=568, batch=batch,
+                          anchor_x='center', anchor_y='center'),
+        pyglet.text.Label('', font_size=100, x=400, y=300, batch=batch,
+                          anchor_x='center', anchor_y='center'),
+    )
+    labels[1].color = GRAY + (0,)
+    keys = [None, None]
+    shown = 0
+    start = time.perf_counter()
+    for frame in range(frames):
+        score = frame // rate
+        key = score, score
+        if key != keys[shown]:
+            keys[shown] = key
+            labels[shown].text = '{}   {}'.format(*key)
+    return time.perf_counter() - start
+
+
+def main(argv):
+    frames = int(argv[1]) if len(argv) > 1 else 6000
+    rate = int(argv[2]) if len(argv) > 2 else 600
+
+    # labels need a GL context around
+    window = pyglet.window.Window(800, 600, visible=False)
+
+    print('{:>12} {:>14}'.format('mode', 'us/frame'))
+    for mode, func in (('every frame', every_frame),
+                       ('dirty flag', dirty_flag)):
+        elapsed = func(frames, rate)
+        print('{:>12} {:>14.2f}'.format(mode, 1e6 * elapsed / frames))
+
+    window.close()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_sounds
+~~~~~~~~
+Sound playback start latency and allocations
+
+A short effect is played over and over, the old way (a streaming
+source and a brand new player each time) and on pooled voices with
+a static source. Time spent on each play call and memory allocated
+by it are reported.
+
+The silent audio driver is used unless another one is given, so
+this runs headless as well.
+
+Usage:
+    ASPATH=./assets PYTHONPATH=. python3 benchmarks/bench_sounds.py \
+        [plays] [driver]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import os
+import sys
+import time
+import statistics
+import tracemalloc
+
+import pyglet
+
+SOUND = 'Jingle_Achievement_00.wav'
+
+
+def measure(plays, play):
+    timings = []
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(plays):
+        start = time.perf_counter()
+        play()
+        timings.append(time.perf_counter() - start)
+        pyglet.clock.tick()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return statistics.median(timings), allocated / plays
+
+
+def main(argv):
+    plays = int(argv[1]) if len(argv) > 1 else 200
+    driver = argv[2] if len(argv) > 2 else 'silent'
+    pyglet.options['audio'] = (driver,)
+
+    from uberpong.engine.audio import VoicePool
+
+    file_name = os.path.join(
+        os.getenv('ASPATH', 'assets'), 'sounds', SOUND
+    )
+
+    players = []
+
+    def play_streaming():
+        player = pyglet.media.Player()
+        player.queue(pyglet.media.load(file_name))
+        player.play()
+        players.append(player)
+
+    source = pyglet.media.load(file_name, streaming=False)
+    voices = VoicePool()
+
+    def play_pooled():
+        voices.play('snd', source)
+
+    print('{:>10} {:>12} {:>14}'.format('mode', 'us/play', 'bytes/play'))
+    for mode, play in (('streaming', play_streaming),
+                       ('pooled', play_pooled)):
+        latency, allocated = measure(plays, play)
+        print('{:>10} {:>12.1f} {:>14.0f}'.format(
+            mode, latency * 1e6, allocated))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
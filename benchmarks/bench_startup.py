@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_startup
+~~~~~~~~
+Startup time of the game, from interpreter start to first frame
+
+Two things are reported:
+
+    * The heaviest imports pulled in by the game module, taken
+      out of `python -X importtime` (cumulative microseconds).
+    * Wall time to import the game module, to construct the Game
+      object (window, assets, server and client) and to get its
+      first frame drawn, measured on a fresh interpreter.
+
+The second part needs a display and the game assets, which are
+looked up on ASPATH as the game itself does.
+
+Usage:
+    PYTHONPATH=. ASPATH=assets python3 benchmarks/bench_startup.py [top]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import os
+import subprocess
+import sys
+
+# Run on a fresh interpreter, so nothing is imported beforehand
+CHILD = r'''
+import time
+start = time.perf_counter()
+
+from uberpong.game.game import Game
+imported = time.perf_counter()
+
+game = Game(['--port', '54299'])
+constructed = time.perf_counter()
+
+game.push_state('game_credits')
+window = game._window
+window.switch_to()
+window.dispatch_events()
+window.dispatch_event('on_draw')
+window.flip()
+drawn = time.perf_counter()
+
+game._cleanup()
+print('{:.6f} {:.6f} {:.6f}'.format(
+    imported - start, constructed - imported, drawn - constructed))
+'''
+
+
+def import_times(top):
+    """Get the heaviest imports as (cumulative usecs, module) pairs"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         'import uberpong.game.game'],
+        stderr=subprocess.PIPE, universal_newlines=True, env=os.environ
+    )
+    times = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times.append((int(cumulative), module.strip()))
+    times.sort(reverse=True)
+    return times[:top]
+
+
+def first_frame():
+    """Get import, construction and first frame wall times"""
+    proc = subprocess.run(
+        [sys.executable, '-c', CHILD],
+        stdout=subprocess.PIPE, universal_newlines=True, env=os.environ
+    )
+    if proc.returncode:
+        return None
+    return [float(t) for t in proc.stdout.split()[-3:]]
+
+
+def main():
+    top = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+
+    print('heaviest imports (cumulative):')
+    for usecs, module in import_times(top):
+        print('  {:10.1f} ms  {}'.format(usecs / 1000, module))
+
+    times = first_frame()
+    if times is None:
+        print('first frame: game could not be started '
+              '(is there a display? is ASPATH set?)')
+        return
+
+    imported, constructed, drawn = times
+    print('import:       {:8.1f} ms'.format(imported * 1000))
+    print('construction: {:8.1f} ms'.format(constructed * 1000))
+    print('first frame:  {:8.1f} ms'.format(drawn * 1000))
+    print('total:        {:8.1f} ms'.format(sum(times) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.bench_velocity_rules
+~~~~~~~~
+Tick cost of paddle and ball rules
+
+Paddle and ball rules are applied either the legacy way (Python
+loops on each tick plus a once per second ball rule) or by pymunk
+itself through velocity callbacks on every step.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/bench_velocity_rules.py [ticks] [balls]
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import sys
+import time
+
+from uberpong.engine.spot import spot_set
+from uberpong.engine.cvar import cvar_set
+from uberpong.game.cvars import register_cvars
+from uberpong.engine.entity import EntityManager
+from uberpong.game.entities import Ball, Board, PlayerPaddle
+
+WIDTH, HEIGHT = 800, 600
+TICKRATE = 66
+FRICTION = 0.80
+
+
+def spot_init(callbacks):
+    """Server SPOT values needed by entities"""
+    register_cvars()
+    cvar_set('tickrate', TICKRATE)
+    cvar_set('sv_velocity_callbacks', callbacks)
+    cvar_set('sv_paddle_friction', FRICTION)
+    spot_set('paddle_size', (32, 64))
+    spot_set('ball_size', (32, 32))
+
+
+def build(balls):
+    mgr = EntityManager()
+    Board(WIDTH, HEIGHT, mgr)
+    mgr.register_class('ent_player', PlayerPaddle)
+    mgr.register_class('ent_ball', Ball)
+    players = mgr.create_entities(
+        'ent_player', 2, positions=[(32, 300), (WIDTH - 32, 300)]
+    )
+    for p in players:
+        p.apply_impulse((0, 3200))
+    ents = mgr.create_entities(
+        'ent_ball', balls,
+        positions=[(100 + (i * 41) % 600, 40 + (i * 29) % 520)
+                   for i in range(balls)]
+    )
+    for i, b in enumerate(ents):
+        b.apply_impulse((1500 if i % 2 else -1500, 300))
+    return mgr, players, ents
+
+
+def legacy_rules(tick, players, balls):
+    """What Scene used to do in Python"""
+    for player in players:
+        player.velocity = 0, player.velocity.y
+        player.apply_impulse((0, - FRICTION * player.velocity.y))
+
+    if tick % TICKRATE == 0:
+        for ball in balls:
+            ball.velocity = (1.02 * ball.velocity.x, 1.02 * ball.velocity.y)
+            if abs(ball.velocity.x) < 200.0:
+                if ball.velocity.x > 0:
+                    ball.apply_impulse((200, ball.velocity.y))
+                elif ball.velocity.x < 0:
+                    ball.apply_impulse((-200, ball.velocity.y))
+
+
+def measure(callbacks, ticks, balls):
+    """Mean tick time in milliseconds"""
+    spot_init(callbacks)
+    mgr, players, ents = build(balls)
+    dt = 1.0 / TICKRATE
+
+    start = time.perf_counter()
+    for tick in range(ticks):
+        if not callbacks:
+            legacy_rules(tick, players, ents)
+        mgr.step(dt)
+    return (time.perf_counter() - start) * 1000 / ticks
+
+
+def main(argv):
+    ticks = int(argv[0]) if len(argv) > 0 else 2000
+    balls = int(argv[1]) if len(argv) > 1 else 1
+
+    for callbacks in (False, True):
+        print('{:>9}: {:.4f} ms/tick'.format(
+            'callbacks' if callbacks else 'legacy',
+            measure(callbacks, ticks, balls)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
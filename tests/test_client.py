@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from uberpong.game.net import Response
+from uberpong.game.net.client import GameClient
+from uberpong.ming.loopback import LoopbackNetwork
+
+
+def snapshot(sequence, timestamp, hold_time):
+    response = Response()
+    response.status = Response.STATUS_OK
+    response.reason = Response.REASON_UPDATE
+    response.sequence = sequence
+    response.timestamp = timestamp
+    response.hold_time = hold_time
+    return list(response.data)
+
+
+def test_rtt_sampled_once_per_timestamp():
+    now = [10.0]
+    client = GameClient(port=5000, sock=LoopbackNetwork().socket(),
+                        clock=lambda: now[0])
+
+    # request stamped at 9.95 s, held 10 ms on the server
+    client.on_data_received(snapshot(1, 9950, 10), '127.0.0.1', 5000)
+    assert client.rtt == pytest.approx(40)
+
+    # the same timestamp keeps being echoed while the client sends
+    # nothing, which is no round trip at all
+    for i in range(2, 20):
+        now[0] += 0.015
+        client.on_data_received(
+            snapshot(i, 9950, 10 + (i - 1) * 15), '127.0.0.1', 5000)
+    assert client.rtt == pytest.approx(40)
+
+    # a new request, 80 ms ago and held 20 ms on the server
+    client.on_data_received(
+        snapshot(20, now[0] * 1000 - 80, 20), '127.0.0.1', 5000)
+    assert client.rtt == pytest.approx(40 + (60 - 40) / 8)
+
+
+def test_snapshots_numbered_anew_on_new_session():
+    client = GameClient(port=5000, sock=LoopbackNetwork().socket())
+    for i in range(100, 103):
+        client.on_data_received(snapshot(i, None, None), '127.0.0.1', 5000)
+
+    # a restarted server starts over, granting a new session
+    grant = Response()
+    grant.status = Response.STATUS_OK
+    grant.reason = Response.REASON_CONN_GRANTED
+    grant.player_id = 1234
+    client.on_data_received(list(grant.data), '127.0.0.1', 5000)
+
+    client.on_data_received(snapshot(0, None, None), '127.0.0.1', 5000)
+    client.on_data_received(snapshot(1, None, None), '127.0.0.1', 5000)
+    assert client.stale_snapshots == 0
+
+    # ... and so does reconnecting
+    client.connect()
+    client.on_data_received(snapshot(0, None, None), '127.0.0.1', 5000)
+    assert client.stale_snapshots == 0
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+from pytest import approx
+
+from uberpong.engine.clock import ManualClock
+
+
+def test_intervals_and_once():
+    clock = ManualClock()
+    calls = []
+    clock.schedule_interval(lambda dt: calls.append(('i', dt)), 0.25)
+    clock.schedule_once(lambda dt, tag: calls.append((tag, dt)), 0.6, 'o')
+
+    assert clock.advance(0.2) == 0
+    assert clock.advance(0.8) == 5
+    assert [c[0] for c in calls] == ['i', 'i', 'o', 'i', 'i']
+    assert calls[2][1] == approx(0.6)
+    assert all(dt == approx(0.25) for tag, dt in calls if tag == 'i')
+    assert clock.time == approx(1.0)
+
+
+def test_unschedule():
+    clock = ManualClock()
+    calls = []
+
+    def tick(dt):
+        calls.append(dt)
+        if len(calls) == 2:
+            clock.unschedule(tick)
+
+    clock.schedule_interval(tick, 0.1)
+    clock.advance(1.0)
+    assert len(calls) == 2
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from uberpong.engine.cvar import (
+    CVar,
+    CVarError,
+    ConfigWatcher,
+    cvar_assign,
+    cvar_get,
+    cvar_parse_args,
+    cvar_register
+)
+
+
+def test_values_are_typed_and_ranged():
+    cvar = CVar('sv_test', 10, min_value=1, max_value=100)
+    assert cvar.set('42') == 42
+    with pytest.raises(CVarError):
+        cvar.set('lots')
+    with pytest.raises(CVarError):
+        cvar.set(0)
+    with pytest.raises(CVarError):
+        cvar.set(1.5)
+    assert cvar.value == 42
+
+
+def test_strings_are_parsed():
+    flag = CVar('cl_test', True)
+    assert flag.set('off') is False
+    assert flag.set('yes') is True
+
+    vector = CVar('sv_test', (0.0, 0.0))
+    assert vector.set('1, -9.8') == (1.0, -9.8)
+    with pytest.raises(CVarError):
+        vector.set('1')
+
+    ratio = CVar('sv_test', 0.5)
+    assert ratio.set(1) == 1.0
+
+
+def test_watchers_are_called_on_changes_only():
+    changes = []
+    cvar = CVar('sv_test', 10)
+    cvar.watch(lambda c: changes.append(c.value))
+    cvar.set(10)
+    cvar.set(20)
+    cvar.set('20')
+    cvar.reset()
+    assert changes == [20, 10]
+
+
+def test_assignments():
+    cvar_register('test_assign_a', 1)
+    cvar_register('test_assign_b', 'json')
+    changed = cvar_assign(cvar_parse_args([
+        'test_assign_a=2', 'test_assign_b=bson', 'test_assign_none=1'
+    ]))
+    assert changed == ['test_assign_a', 'test_assign_b']
+    assert cvar_get('test_assign_a') == 2
+    with pytest.raises(CVarError):
+        cvar_parse_args(['test_assign_a'])
+
+
+def test_config_reload(tmpdir):
+    cvar_register('sv_test_reload', 1, reloadable=True)
+    cvar_register('sv_test_latched', 1)
+    config = tmpdir.join('server.cfg')
+    config.write('sv_test_reload 1\n')
+    watcher = ConfigWatcher(str(config), prefix='sv_')
+    assert watcher.check() == []
+
+    config.write('# comment\nsv_test_reload 5\nsv_test_latched 5\n')
+    config.setmtime(config.mtime() + 10)
+    assert watcher.check() == ['sv_test_reload']
+    assert cvar_get('sv_test_reload') == 5
+    assert cvar_get('sv_test_latched') == 1
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+from uberpong.ming import Client, Server
+from uberpong.ming.loopback import LoopbackNetwork
+
+
+class EchoServer(Server):
+    def on_data_received(self, data, host, port):
+        self.send(data, host, port)
+
+
+class RecordingClient(Client):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.received = []
+
+    def on_data_received(self, data, host, port):
+        self.received.append(data)
+
+
+def test_echo_over_loopback():
+    network = LoopbackNetwork()
+    server = EchoServer(port=5000, sock=network.socket())
+    client = RecordingClient(port=5000, sock=network.socket())
+
+    client.send([1, 30, '+connect'])
+    client.send({'a': 1})
+    assert server.sock.pending == 2
+    server.pump()
+    server.pump()
+    client.pump()
+    client.pump()
+    assert client.received == [[1, 30, '+connect'], {'a': 1}]
+
+    # nothing left to receive
+    client.pump()
+    assert len(client.received) == 2
+    assert client.packets_in == 2 and server.packets_out == 2
+
+
+def test_datagrams_to_nowhere_are_dropped():
+    network = LoopbackNetwork()
+    client = RecordingClient(port=5001, sock=network.socket())
+    client.send([1])
+    assert network.dropped == 1
+    client.close()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from uberpong.engine.message import MessageBus, message_type
+
+Hit = message_type('Hit', ('force',))
+Ping = message_type('Ping')
+
+
+class Recipient:
+    def __init__(self):
+        self.received = []
+        self.batches = 0
+
+    def on_messages(self, messages):
+        self.batches += 1
+        self.received.extend(messages)
+
+
+def test_fifo_order():
+    bus = MessageBus()
+    r = Recipient()
+    for i in range(5):
+        bus.post(Hit(('a', 'r', i)))
+    eq = bus.dispatch({'r': r}.get)
+    assert eq == 5
+    assert [m.force for m in r.received] == [0, 1, 2, 3, 4]
+    assert r.batches == 1
+
+
+def test_handlers_get_runs_per_type():
+    bus = MessageBus()
+    r = Recipient()
+    calls = []
+    bus.register_handler(Hit, lambda rcpt, msgs: calls.append(list(msgs)))
+    bus.post(Hit(('a', 'r', 1)))
+    bus.post(Hit(('a', 'r', 2)))
+    bus.post(Ping(('a', 'r')))
+    bus.post(Hit(('a', 'r', 3)))
+    bus.dispatch({'r': r}.get)
+    assert [[m.force for m in c] for c in calls] == [[1, 2], [3]]
+    assert r.received == [Ping(('a', 'r'))]
+
+
+def test_unknown_recipients_are_dropped():
+    bus = MessageBus()
+    bus.post(Ping(('a', 'gone')))
+    assert bus.dispatch({}.get) == 0
+    assert len(bus) == 0
+
+
+def test_messages_posted_while_dispatching():
+    bus = MessageBus()
+    r = Recipient()
+
+    def reply(rcpt, msgs):
+        for m in msgs:
+            if m.force:
+                bus.post(Hit(('r', 'r', m.force - 1)))
+        rcpt.received.extend(msgs)
+
+    bus.register_handler(Hit, reply)
+    bus.post(Hit(('a', 'r', 2)))
+    bus.dispatch({'r': r}.get)
+    assert [m.force for m in r.received] == [2, 1, 0]
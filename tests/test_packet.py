@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from uberpong.game.net import Request, Response
+
+
+def test_data_copied_onto_buffer():
+    request = Request.acquire()
+    buffer = request.data
+    incoming = [1, 30, '+move', 1234]
+    request.data = incoming
+    assert request.data is buffer
+    assert request.command == '+move' and request.player_id == 1234
+    assert request.timestamp is None
+    assert len(request.data) == Request.SIZE
+
+    # the incoming list is left alone
+    assert incoming == [1, 30, '+move', 1234]
+    request.release()
+
+
+@pytest.mark.parametrize('data', [
+    {'x': 1},
+    'garbage',
+    [1, 30, '+move', 1234, 5678] + [None] * 8,
+])
+def test_malformed_data_rejected(data):
+    request = Request.acquire()
+    with pytest.raises(ValueError):
+        request.data = data
+
+    # still a blank, usable packet
+    assert request.data == Request._blank
+    request.release()
+
+    response = Response.acquire()
+    with pytest.raises(ValueError):
+        response.data = data
+    response.release()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+from pytest import approx
+
+from uberpong.game.predict import BallPredictor
+
+# (left, bottom, right, top) of an 800x600 board (see Board.extents)
+EXTENTS = (0, 0, 799, 599)
+
+
+def predictor():
+    return BallPredictor(EXTENTS, ball_size=(32, 32), paddle_size=(32, 64))
+
+
+def test_straight_line():
+    p = predictor()
+    p.reset((400, 300), (100, 50), time=10.0)
+    assert p.position(10.0) == approx((400, 300))
+    assert p.position(11.0) == approx((500, 350))
+    assert p.segments == 1
+
+
+def test_bounces_off_walls():
+    p = predictor()
+    p.reset((400, 500), (0, 200), time=0.0)
+
+    # center bounces 16 pixels off the top edge (599 - 16 = 583)
+    assert p.position(83 / 200) == approx((400, 583))
+    assert p.position(1.0) == approx((400, 583 - (200 - 83)))
+
+    p.reset((400, 100), (0, -200), time=0.0)
+    assert p.position(1.0) == approx((400, 16 + (200 - 84)))
+
+
+def test_bounces_off_paddles():
+    p = predictor()
+
+    # paddle at x=32 has its face at x=48, so the center of
+    # the ball turns back at x=64
+    p.reset((400, 300), (-200, 0), time=0.0,
+            paddles=[(32, 300, 0), (768, 300, 0)])
+    assert p.position(336 / 200) == approx((64, 300))
+    assert p.position(336 / 200 + 1.0) == approx((264, 300))
+
+    # ... and off the other one
+    assert p.position(336 / 200 + 3.52) == approx((736 - 32, 300))
+
+
+def test_moving_paddle():
+    p = predictor()
+
+    # paddle gets in the way just in time
+    p.reset((400, 300), (-200, 0), time=0.0,
+            paddles=[(32, 500, -100)])
+    assert p.position(2.68) == approx((64 + 200, 300))
+
+    # paddle moves away
+    p.reset((400, 300), (-200, 0), time=0.0,
+            paddles=[(32, 400, 100)])
+    assert p.position(10.0) == approx((16, 300))
+
+
+def test_halts_at_boundaries():
+    p = predictor()
+    p.reset((400, 300), (-200, 0), time=0.0)
+    assert p.position(384 / 200) == approx((16, 300))
+    assert p.position(100.0) == approx((16, 300))
+
+
+def test_segments_are_cached():
+    p = predictor()
+    p.reset((400, 300), (0, 1000), time=0.0)
+    p.position(5.0)
+    segments = p.segments
+    assert segments > 5
+    assert p.position(0.1) == approx((400, 400))
+    assert p.segments == segments
+    assert p.position(0.3) == approx((400, 583 - (300 - 283)))
+
+
+def test_segment_limit_starts_over_on_reset():
+    p = predictor()
+    p.reset((400, 300), (0, 1000), time=0.0)
+    p.position(100.0)
+    assert p.segments == BallPredictor.MAX_SEGMENTS
+
+    # a full chain of segments doesn't carry over to the next reset
+    p.reset((400, 300), (0, -300), time=0.0)
+    assert p.position(2.0) == approx((400, 16 + (600 - 284)))
+    assert p.segments == 2
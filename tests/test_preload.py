@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+from uberpong.engine.preload import Preloader
+
+
+class Resources:
+    """Decodes resources, the atlas only once let go"""
+
+    def __init__(self):
+        self.atlas_started = threading.Event()
+        self.atlas_go = threading.Event()
+        self.decoded = []
+        self.finished = []
+
+    def decode(self, kind, file_name):
+        if kind == 'atlases':
+            self.atlas_started.set()
+            assert self.atlas_go.wait(5)
+        elif kind == 'broken':
+            raise IOError(file_name)
+        self.decoded.append(file_name)
+        return file_name.upper()
+
+    def finish(self, kind, key, data):
+        self.finished.append((key, data))
+
+
+ITEMS = [
+    ('fonts', 'font', 'font.ttf'),
+    ('atlases', 'atlas', 'atlas.json'),
+    ('images', 'image', 'image.png'),
+    ('sounds', 'snd_credits', 'credits.wav'),
+]
+
+
+def test_waiting_for_a_sound_skips_the_atlas():
+    res = Resources()
+    preloader = Preloader(res.decode, res.finish)
+    preloader.start(ITEMS)
+    assert res.atlas_started.wait(5)
+
+    # the sound is decoded right away, the atlas is left alone
+    preloader.wait_for('snd_credits')
+    assert ('snd_credits', 'CREDITS.WAV') in res.finished
+    assert 'atlas' not in [key for key, data in res.finished]
+    assert preloader.pending('atlases') == ['atlas']
+    assert not preloader.loaded
+
+    res.atlas_go.set()
+    preloader.wait_for('atlas')
+    preloader.wait_for('image')
+    preloader.poll()
+    assert preloader.loaded and preloader.progress == 1.0
+    assert sorted(key for key, data in res.finished) == \
+        ['atlas', 'font', 'image', 'snd_credits']
+    assert res.decoded.count('credits.wav') == 1
+
+
+def test_errors_raised_when_finished():
+    res = Resources()
+    preloader = Preloader(res.decode, res.finish)
+    preloader.start([('broken', 'oops', 'oops.bin')])
+    with pytest.raises(IOError):
+        preloader.wait_for('oops')
+    assert preloader.loaded
+
+    # nothing to wait for on resources never queued
+    preloader.wait_for('nothing')
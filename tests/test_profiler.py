@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+from uberpong.engine.profiler import Histogram, TickProfiler
+
+
+def test_small_values_are_exact():
+    h = Histogram()
+    for v in range(1, 11):
+        h.record(v)
+    assert h.percentile(50) == 5
+    assert h.percentile(100) == 10
+    assert h.max == 10
+    assert h.count == 10
+
+
+def test_relative_error_is_bounded():
+    h = Histogram()
+    for v in (1000, 20000, 300000, 4000000):
+        h.reset()
+        h.record(v)
+        h.record(v * 2)
+        assert v <= h.percentile(50) <= v * 1.04
+
+
+def test_huge_values_are_clamped():
+    h = Histogram(max_bits=10)
+    h.record(10 ** 9)
+    assert h.percentile(99) == 10 ** 9
+    assert h.max == 10 ** 9
+
+
+def test_profiler_phases():
+    prof = TickProfiler(('pump', 'step'))
+    for i in range(3):
+        prof.begin()
+        prof.mark('pump')
+        prof.mark('step')
+        prof.end()
+    stats = prof.stats()
+    assert list(stats) == ['pump', 'step', 'tick']
+    assert stats['tick']['count'] == 3
+    prof.reset()
+    assert prof.stats()['pump']['count'] == 0
+
+
+def test_merge():
+    a, b = Histogram(), Histogram()
+    for v in range(1, 6):
+        a.record(v)
+    for v in range(6, 11):
+        b.record(v)
+    a.merge(b)
+    assert a.count == 10
+    assert a.total == 55
+    assert a.max == 10
+    assert a.percentile(50) == 5
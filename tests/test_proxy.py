@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+from uberpong.ming.loopback import LoopbackNetwork
+from uberpong.ming.proxy import Conditions, Link, Proxy
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_proxy(**kwargs):
+    network = LoopbackNetwork()
+    clock = Clock()
+    server = network.socket()
+    server.bind(('', 5000))
+    client = network.socket()
+    proxy = Proxy(port=5001, server_address=network.HOST, server_port=5000,
+                  clock=clock, sock_factory=network.socket, **kwargs)
+    return proxy, clock, server, client, network
+
+
+def test_parse_conditions():
+    c = Conditions.parse('latency=80, jitter=10,loss=0.5,limit=20')
+    assert (c.latency, c.jitter, c.loss, c.limit) == (80, 10, 0.5, 20)
+    assert c.rate == 0
+    assert Conditions.parse(None).latency == 0
+    with pytest.raises(ValueError):
+        Conditions.parse('latency')
+    with pytest.raises(ValueError):
+        Conditions.parse('bogus=1')
+    with pytest.raises(ValueError):
+        Conditions.parse('loss=2')
+
+
+def test_latency_both_ways():
+    proxy, clock, server, client, network = make_proxy(
+        up=Conditions(latency=50), down=Conditions(latency=20))
+    client.sendto(b'ping', ('', 5001))
+    proxy.pump()
+    assert not server.pending
+    clock.now = 0.049
+    proxy.pump()
+    assert not server.pending
+    clock.now = 0.05
+    proxy.pump()
+    data, address = server.recvfrom(100)
+    assert data == b'ping'
+
+    # the server sees the proxy, and answers go back to the client
+    assert address != client.address
+    server.sendto(b'pong', address)
+    proxy.pump()
+    assert proxy.next_due() == pytest.approx(0.07)
+    clock.now = 0.07
+    proxy.pump()
+    assert client.recvfrom(100) == (b'pong', ('127.0.0.1', 5001))
+
+
+def test_loss_is_seeded():
+    def fate(seed):
+        link = Link(Conditions(loss=0.25), random.Random(seed))
+        return [bool(link.submit(10, 0.0)) for i in range(1000)]
+
+    assert fate(1) == fate(1)
+    assert fate(1) != fate(2)
+    assert 200 < fate(1).count(False) < 300
+
+
+def test_rate_cap():
+    link = Link(Conditions(rate=1000, limit=3), random.Random(0))
+    assert link.submit(100, 0.0) == [pytest.approx(0.1)]
+    assert link.submit(100, 0.0) == [pytest.approx(0.2)]
+    assert link.submit(100, 0.0) == [pytest.approx(0.3)]
+    assert link.submit(100, 0.0) == []
+    assert link.overflowed == 1
+
+    # room again once the first one is out
+    assert link.submit(100, 0.1) == [pytest.approx(0.4)]
+
+
+def test_duplicate_and_reorder():
+    link = Link(Conditions(latency=100, duplicate=1), random.Random(0))
+    assert link.submit(10, 0.0) == [0.1, 0.1]
+    link = Link(Conditions(latency=100, reorder=1), random.Random(0))
+    assert link.submit(10, 0.0) == [0.0]
+    assert link.reordered == 1
+
+
+def test_clients_kept_apart():
+    proxy, clock, server, client, network = make_proxy()
+    other = network.socket()
+    client.sendto(b'a', ('', 5001))
+    other.sendto(b'b', ('', 5001))
+    proxy.pump()
+    (a, address_a), (b, address_b) = server.recvfrom(9), server.recvfrom(9)
+    assert (a, b) == (b'a', b'b') and address_a != address_b
+    server.sendto(b'to b', address_b)
+    proxy.pump()
+    assert other.recvfrom(9)[0] == b'to b'
+    assert not client.pending
+
+
+def test_quiet_clients_expire():
+    proxy, clock, server, client, network = make_proxy(idle_timeout=10)
+    other = network.socket()
+    client.sendto(b'a', ('', 5001))
+    other.sendto(b'b', ('', 5001))
+    proxy.pump()
+    address_a = server.recvfrom(9)[1]
+    server.recvfrom(9)
+
+    # the server talking back keeps a client around
+    clock.now = 8
+    server.sendto(b'to a', address_a)
+    proxy.pump()
+    clock.now = 12
+    proxy.expire()
+    assert proxy.expired == 1
+    assert len(proxy.sockets) == 2
+
+    # a forgotten client starts over on a new socket
+    other.sendto(b'b', ('', 5001))
+    proxy.pump()
+    assert len(proxy.sockets) == 3
+    clock.now = 30
+    proxy.expire()
+    assert proxy.sockets == [proxy.sock]
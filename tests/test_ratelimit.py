@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+from uberpong.game.net import Request
+from uberpong.ming import Client, Server
+from uberpong.ming.loopback import LoopbackNetwork
+from uberpong.ming.ratelimit import RateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+A = ('127.0.0.1', 1000)
+B = ('127.0.0.1', 1001)
+
+
+def test_burst_then_rate():
+    clock = Clock()
+    limiter = RateLimiter({'move': (10, 3)}, clock=clock)
+    assert [limiter.allow(A, 'move') for i in range(4)] == \
+        [True, True, True, False]
+    assert limiter.rejected == {'move': 1}
+
+    # other addresses and unlimited classes are left alone
+    assert limiter.allow(B, 'move')
+    assert all(limiter.allow(A, 'other') for i in range(100))
+
+    # a token every 100 ms, never over the burst
+    clock.now = 0.1
+    assert limiter.allow(A, 'move')
+    assert not limiter.allow(A, 'move')
+    clock.now = 10
+    assert [limiter.allow(A, 'move') for i in range(4)] == \
+        [True, True, True, False]
+
+
+def test_set_limit():
+    limiter = RateLimiter({'move': (10, 1)}, clock=Clock())
+    assert limiter.allow(A, 'move')
+    assert not limiter.allow(A, 'move')
+    limiter.set_limit('move', 0, 1)
+    assert limiter.allow(A, 'move')
+
+
+def test_least_recently_used_evicted():
+    limiter = RateLimiter({'c': (1, 1)}, max_buckets=2, clock=Clock())
+    assert limiter.allow(A, 'c')
+    assert limiter.allow(B, 'c')
+    assert not limiter.allow(A, 'c')
+
+    # B goes away to make room, A stays empty
+    assert limiter.allow(('127.0.0.1', 1002), 'c')
+    assert limiter.buckets == 2 and limiter.evictions == 1
+    assert not limiter.allow(A, 'c')
+
+
+class RecordingServer(Server):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.received = []
+
+    def on_data_received(self, data, host, port):
+        self.received.append(data)
+
+
+def test_server_skips_rejected():
+    network = LoopbackNetwork()
+    server = RecordingServer(port=5000, sock=network.socket(),
+                             limits={'datagram': (1, 2)})
+    flood = Client(port=5000, sock=network.socket())
+    player = Client(port=5000, sock=network.socket())
+
+    for i in range(10):
+        flood.send([i])
+    player.send(['hello'])
+
+    # one datagram taken in per pump, rejected ones in between skipped
+    server.pump()
+    server.pump()
+    server.pump()
+    assert server.received == [[0], [1], ['hello']]
+    assert server.packets_rejected == 8
+    assert not server.sock.pending
+
+
+class RequestServer(RecordingServer):
+    def classify(self, data):
+        return Request.rate_class(data)
+
+
+def test_classified_on_decoded_command():
+    network = LoopbackNetwork()
+    server = RequestServer(port=5000, sock=network.socket(),
+                           limits={'connect': (1, 1), 'move': (100, 100)})
+    client = Client(port=5000, sock=network.socket())
+
+    # connects dressed up as moves are still connects
+    crafted = [1, 30, '+connect', None, 'move']
+    assert Request.rate_class(crafted) == 'connect'
+    assert Request.rate_class([1, 30, '+move']) == 'move'
+    assert Request.rate_class({'+move': 1}) == 'other'
+    assert Request.rate_class([1, 30, ['+move']]) == 'other'
+
+    for i in range(5):
+        client.send(crafted)
+    client.send([1, 30, '+move', 1])
+    server.pump()
+    server.pump()
+    assert server.received == [crafted, [1, 30, '+move', 1]]
+    assert server.limiter.rejected == {'connect': 4}
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import random
+from types import SimpleNamespace
+
+from uberpong.game.net.session import SessionRegistry
+
+
+def make_player(registry, port):
+    player = SimpleNamespace(host='10.0.0.1', port=port,
+                             number=registry.next_number())
+    registry.add(player)
+    return player
+
+
+def test_lookups():
+    registry = SessionRegistry(2, rng=random.Random(1))
+    one = make_player(registry, 1000)
+    two = make_player(registry, 1001)
+    assert (one.number, two.number) == (1, 2)
+    assert registry.full and len(registry) == 2
+    assert registry.next_number() is None
+    assert one.token != two.token
+
+    assert registry.get(one.token) is one
+    assert registry.find('10.0.0.1', 1001) is two
+    assert registry.by_number(1) is one
+    assert list(registry) == [one, two]
+
+
+def test_validate():
+    registry = SessionRegistry(2, rng=random.Random(1))
+    one = make_player(registry, 1000)
+    two = make_player(registry, 1001)
+    assert registry.validate(one.token, '10.0.0.1', 1000) is one
+
+    # someone else's token, or a token of no one
+    assert registry.validate(two.token, '10.0.0.1', 1000) is None
+    assert registry.validate(one.token, '10.0.0.2', 1000) is None
+    assert registry.validate(12345, '10.0.0.1', 1000) is None
+
+    # whatever a hostile client sends in place of a token
+    for token in ([one.token], {'a': 1}, str(one.token), float(one.token),
+                  True, None):
+        assert registry.validate(token, '10.0.0.1', 1000) is None
+
+
+def test_foes_and_numbers_reused():
+    registry = SessionRegistry(4, rng=random.Random(1))
+    one, two, three = [make_player(registry, 1000 + i) for i in range(3)]
+    assert one.foe is two and two.foe is one
+    assert three.foe is None
+
+    four = make_player(registry, 1003)
+    assert three.foe is four and four.foe is three
+
+    registry.remove(one)
+    assert two.foe is None and registry.get(one.token) is None
+    assert registry.find('10.0.0.1', 1000) is None
+    assert registry.next_number() == 1
+
+    again = make_player(registry, 2000)
+    assert again.number == 1 and again.foe is two and two.foe is again
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from uberpong.engine.watchdog import TickWatchdog
+
+BUDGET = 0.015
+
+
+def run_window(watchdog, overruns, ticks=10):
+    for i in range(ticks):
+        elapsed = 2 * BUDGET if i < overruns else BUDGET / 2
+        stage = watchdog.record(elapsed)
+    return stage
+
+
+def test_escalates_one_stage_per_window():
+    watchdog = TickWatchdog(BUDGET, window=10, overload=0.3, recover=0.1)
+    assert watchdog.stage == TickWatchdog.STAGE_NORMAL
+
+    # no transition until a window is over
+    for i in range(9):
+        assert watchdog.record(1.0) == TickWatchdog.STAGE_NORMAL
+    assert watchdog.record(1.0) == TickWatchdog.STAGE_SHED_NONCRITICAL
+
+    assert run_window(watchdog, 3) == TickWatchdog.STAGE_LOW_SNAPSHOT_RATE
+    assert run_window(watchdog, 10) == TickWatchdog.STAGE_LOW_PHYSICS_RATE
+
+    # nowhere to go past the last stage
+    assert run_window(watchdog, 10) == TickWatchdog.STAGE_LOW_PHYSICS_RATE
+    assert watchdog.ticks == 40 and watchdog.overruns == 33
+
+
+def test_late_ticks_are_overruns():
+    watchdog = TickWatchdog(BUDGET, window=2, overload=0.5)
+    watchdog.record(BUDGET / 2, late=2 * BUDGET)
+    assert watchdog.record(BUDGET / 2) == TickWatchdog.STAGE_SHED_NONCRITICAL
+    assert watchdog.overruns == 1
+
+
+def test_hysteresis():
+    watchdog = TickWatchdog(BUDGET, window=10, overload=0.3, recover=0.1)
+    run_window(watchdog, 5)
+    assert watchdog.stage == TickWatchdog.STAGE_SHED_NONCRITICAL
+
+    # in between both ratios the stage is held
+    for i in range(5):
+        assert run_window(watchdog, 2) == \
+            TickWatchdog.STAGE_SHED_NONCRITICAL
+
+
+def test_recovers_one_stage_per_window():
+    watchdog = TickWatchdog(BUDGET, window=10, overload=0.3, recover=0.1)
+    for i in range(3):
+        run_window(watchdog, 10)
+    assert watchdog.stage == TickWatchdog.STAGE_LOW_PHYSICS_RATE
+
+    # a stray overrun still counts as quiet enough
+    assert run_window(watchdog, 1) == TickWatchdog.STAGE_LOW_SNAPSHOT_RATE
+    assert run_window(watchdog, 0) == TickWatchdog.STAGE_SHED_NONCRITICAL
+    assert run_window(watchdog, 0) == TickWatchdog.STAGE_NORMAL
+    assert run_window(watchdog, 0) == TickWatchdog.STAGE_NORMAL
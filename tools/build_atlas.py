@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""
+tools.build_atlas
+~~~~~~~~
+Texture atlas build step
+
+Sprites listed on assets_source/atlas.json (a file and a rectangle
+on it, top-left origin as on any image editor) are packed onto a
+single power-of-two atlas, written as assets/images/atlas.png along
+with assets/images/atlas.json, a manifest of all regions on it in
+pyglet's (bottom-left origin) coordinates, ready for Sorcerer.
+
+Only 8-bit RGBA non-interlaced PNG files are supported, which is
+what the sprite sheet gets exported as, so nothing but the standard
+library is needed.
+
+Usage:
+    python3 tools/build_atlas.py
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import json
+import struct
+import sys
+import zlib
+from os import path
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+SOURCE = path.join(ROOT, 'assets_source', 'atlas.json')
+ATLAS_IMAGE = path.join(ROOT, 'assets', 'images', 'atlas.png')
+ATLAS_MANIFEST = path.join(ROOT, 'assets', 'images', 'atlas.json')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+BPP = 4  # bytes per pixel (RGBA)
+
+
+class Image:
+    """RGBA image as a list of rows (top row first)"""
+
+    def __init__(self, width, height, rows=None):
+        self.width = width
+        self.height = height
+        if rows is None:
+            rows = [bytearray(width * BPP) for y in range(height)]
+        self.rows = rows
+
+    def crop(self, x, y, width, height):
+        return Image(width, height, [
+            bytearray(row[x * BPP:(x + width) * BPP])
+            for row in self.rows[y:y + height]
+        ])
+
+    def paste(self, image, x, y):
+        for i, row in enumerate(image.rows):
+            self.rows[y + i][x * BPP:(x + image.width) * BPP] = row
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    if pb <= pc:
+        return b
+    return c
+
+
+def read_png(file_name):
+    """Decode an 8-bit RGBA non-interlaced PNG file"""
+    with open(file_name, 'rb') as f:
+        data = f.read()
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError('{} is not a PNG file'.format(file_name))
+
+    pos = len(PNG_SIGNATURE)
+    idat = []
+    while pos < len(data):
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        chunk = data[pos + 8:pos + 8 + length]
+        pos += length + 12
+        if kind == b'IHDR':
+            width, height, depth, color, _, _, interlace = \
+                struct.unpack('>IIBBBBB', chunk)
+            if depth != 8 or color != 6 or interlace:
+                raise ValueError(
+                    '{}: only 8-bit RGBA non-interlaced PNG files '
+                    'are supported'.format(file_name)
+                )
+        elif kind == b'IDAT':
+            idat.append(chunk)
+        elif kind == b'IEND':
+            break
+
+    raw = zlib.decompress(b''.join(idat))
+    stride = width * BPP
+    rows = []
+    prev = bytearray(stride)
+    pos = 0
+    for y in range(height):
+        kind = raw[pos]
+        row = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += stride + 1
+        if kind == 1:
+            for x in range(BPP, stride):
+                row[x] = (row[x] + row[x - BPP]) & 0xff
+        elif kind == 2:
+            for x in range(stride):
+                row[x] = (row[x] + prev[x]) & 0xff
+        elif kind == 3:
+            for x in range(stride):
+                left = row[x - BPP] if x >= BPP else 0
+                row[x] = (row[x] + (left + prev[x]) // 2) & 0xff
+        elif kind == 4:
+            for x in range(stride):
+                if x >= BPP:
+                    left, up_left = row[x - BPP], prev[x - BPP]
+                else:
+                    left = up_left = 0
+                row[x] = (row[x] + _paeth(left, prev[x], up_left)) & 0xff
+        rows.append(row)
+        prev = row
+
+    return Image(width, height, rows)
+
+
+def _chunk(kind, data):
+    return (
+        struct.pack('>I', len(data)) + kind + data +
+        struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+    )
+
+
+def write_png(image, file_name):
+    """Encode an image as an 8-bit RGBA PNG file (no filtering)"""
+    raw = b''.join(b'\x00' + bytes(row) for row in image.rows)
+    with open(file_name, 'wb') as f:
+        f.write(PNG_SIGNATURE)
+        f.write(_chunk(b'IHDR', struct.pack(
+            '>IIBBBBB', image.width, image.height, 8, 6, 0, 0, 0
+        )))
+        f.write(_chunk(b'IDAT', zlib.compress(raw, 9)))
+        f.write(_chunk(b'IEND', b''))
+
+
+def _next_pow2(value):
+    return 1 << (value - 1).bit_length()
+
+
+def pack(sizes, padding, width):
+    """Pack rectangles on shelves, tallest ones first
+
+    Args:
+        sizes(list): (width, height) of each rectangle
+        padding(int): room left around every rectangle
+        width(int): atlas width
+    Returns:
+        A list with the (x, y) of each rectangle (top-left origin)
+        and the height taken by all of them
+    """
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    positions = [None] * len(sizes)
+    shelf_y = shelf_height = x = 0
+    for i in order:
+        w, h = sizes[i]
+        w += 2 * padding
+        h += 2 * padding
+        if w > width:
+            raise ValueError('sprite wider than the atlas')
+        if x + w > width:
+            shelf_y += shelf_height
+            x = shelf_height = 0
+        positions[i] = x + padding, shelf_y + padding
+        x += w
+        shelf_height = max(shelf_height, h)
+    return positions, shelf_y + shelf_height
+
+
+def build(source):
+    """Build the atlas out of a source description
+
+    Returns:
+        The atlas image and its region manifest
+    """
+    padding = source.get('padding', 0)
+    sheets = {}
+    sprites = []
+    for sprite in source['sprites']:
+        file_name = path.join(ROOT, sprite['file'])
+        if file_name not in sheets:
+            sheets[file_name] = read_png(file_name)
+        sprites.append(sheets[file_name].crop(*sprite['rect']))
+
+    # Smallest power-of-two atlas (by area) taking all sprites
+    sizes = [(s.width, s.height) for s in sprites]
+    best = None
+    width = _next_pow2(max(w for w, h in sizes) + 2 * padding)
+    while width <= 4096:
+        positions, used = pack(sizes, padding, width)
+        height = _next_pow2(used)
+        if best is None or width * height < best[0] * best[1]:
+            best = width, height, positions
+        width *= 2
+    width, height, positions = best
+
+    atlas = Image(width, height)
+    regions = {}
+    for sprite, image, (x, y) in zip(source['sprites'], sprites, positions):
+        atlas.paste(image, x, y)
+        if sprite.get('anchor') == 'center':
+            anchor = [image.width // 2, image.height // 2]
+        else:
+            anchor = [0, 0]
+        regions[sprite['name']] = {
+            # pyglet regions start from the bottom-left corner
+            'rect': [x, height - y - image.height, image.width, image.height],
+            'anchor': anchor
+        }
+
+    manifest = {
+        'image': path.basename(ATLAS_IMAGE),
+        'size': [width, height],
+        'regions': regions
+    }
+    return atlas, manifest
+
+
+def main(argv):
+    with open(SOURCE) as f:
+        source = json.load(f)
+
+    atlas, manifest = build(source)
+    write_png(atlas, ATLAS_IMAGE)
+    with open(ATLAS_MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+        f.write('\n')
+
+    print('{}x{} atlas with {} regions'.format(
+        atlas.width, atlas.height, len(manifest['regions'])
+    ))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""
+tools.swarm
+~~~~~~~~
+Load testing with a swarm of bot players
+
+A host runs a number of matches with no hosting player, each one a
+Scene of its own on consecutive ports, as there are two players at
+most on a scene. Bots are then spread over as many processes as asked
+for, two bots on each match, every process driving its bots out of a
+single select loop.
+
+Once done, bots report:
+
+    * how many of them got connected, and how long it took
+    * time between snapshots (jitter being how far its 99th
+      percentile goes beyond its median)
+    * command latency, from a command being sent to the server
+      echoing its timestamp back on a snapshot
+
+Usage:
+    swarm.py host [--matches <n>] [--port <port>] [--set <name=value>]...
+    swarm.py bots [--host <ip_address>] [--port <port>] [--bots <n>] [--procs <n>] [--duration <seconds>] [--script <script>] [--set <name=value>]...
+    swarm.py -h | --help
+
+Options:
+  -m --matches <n>            Matches to host [default: 8]
+  -H --host <ip_address>      Server to connect to [default: localhost]
+  -p --port <port>            Port of the first match [default: 54212]
+  -b --bots <n>               Bots to run [default: 16]
+  -j --procs <n>              Processes to run bots on [default: 2]
+  -d --duration <seconds>     Seconds to run bots for [default: 30]
+  -s --script <script>        Bot input script [default: follow:3,idle:0.5,up:0.5,down:0.5]
+  --set <name=value>          Set a cvar
+  -h --help                   Show this screen.
+
+e.g.
+    PYTHONPATH=. python3 tools/swarm.py host --matches 8
+    PYTHONPATH=. python3 tools/swarm.py bots --bots 16 --procs 4
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import multiprocessing
+import select
+import sys
+import time
+
+from docopt import docopt
+
+from uberpong.engine.cvar import cvar_get, cvar_assign, cvar_parse_args
+from uberpong.engine.profiler import Histogram
+from uberpong.engine.spot import spot_set
+from uberpong.game.cvars import register_cvars
+
+WIDTH, HEIGHT = 800, 600
+
+
+def host(options):
+    """Host matches until interrupted"""
+    import pyglet
+    from uberpong.game.net.scene import Scene
+    from uberpong.game.net.host import SceneHost
+
+    # Same geometry the game sets up for its window
+    spot_set('paddle_position_start', (32, HEIGHT // 2))
+    spot_set('paddle_size', (32, 64))
+    spot_set('ball_position_start', (WIDTH // 2, HEIGHT // 2))
+    spot_set('ball_size', (32, 32))
+    spot_set('obstacle_size', (16, 16))
+
+    port = int(options['--port'])
+    hosts = [
+        SceneHost(Scene(port=port + i, width=WIDTH, height=HEIGHT,
+                        codec=cvar_get('net_codec')))
+        for i in range(int(options['--matches']))
+    ]
+    print('hosting {} matches on ports {}-{}'.format(
+        len(hosts), port, port + len(hosts) - 1))
+
+    clock = pyglet.clock.get_default()
+    try:
+        while True:
+            clock.tick()
+            time.sleep(clock.get_sleep_time(True) or 0.001)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print('{} matches played'.format(sum(h.matches for h in hosts)))
+        for h in hosts:
+            h.close()
+
+
+def run_bots(address, ports, script, duration, cmdrate, codec, queue):
+    """Drive a bunch of bots on this process
+
+    Args:
+        address(str): server address
+        ports(list): port each bot connects to
+        script(list): input script steps
+        duration(float): seconds to run for
+        cmdrate(int): commands per second
+        codec(str): codec to talk to the server with
+        queue(multiprocessing.Queue): where results are put
+    """
+    from uberpong.game.net.bot import BotClient
+
+    bots = [
+        BotClient(address=address, port=port, script=script,
+                  cmdrate=cmdrate, codec=codec)
+        for port in ports
+    ]
+    by_socket = {bot.sock: bot for bot in bots}
+    refused = 0
+
+    end = time.perf_counter() + duration
+    while True:
+        now = time.perf_counter()
+        if now >= end:
+            break
+        timeout = min(bot.update() for bot in bots) - now
+        timeout = min(max(timeout, 0), end - now)
+        readable, _, _ = select.select(list(by_socket), [], [], timeout)
+        for sock in readable:
+            bot = by_socket[sock]
+            try:
+                bot.pump()
+            except ConnectionRefusedError:
+                # full match, no need to keep on trying
+                refused += 1
+                bot.close()
+                del by_socket[sock]
+                bots.remove(bot)
+        if not bots:
+            break
+
+    connect_time = Histogram()
+    inter_arrival = Histogram()
+    latency = Histogram()
+    connected = dropped = stale = 0
+    for bot in bots:
+        if bot.connect_time is not None:
+            connected += 1
+            connect_time.record(int(bot.connect_time * 1e6))
+        inter_arrival.merge(bot.inter_arrival)
+        latency.merge(bot.latency)
+        dropped += bot.dropped_snapshots
+        stale += bot.stale_snapshots
+        bot.disconnect()
+        bot.close()
+
+    queue.put((connected, refused, dropped, stale,
+               connect_time, inter_arrival, latency))
+
+
+def report(name, histogram):
+    """Print percentiles (in milliseconds) of a histogram"""
+    if not histogram.count:
+        print('{:<14} no samples'.format(name))
+        return
+    p50, p90, p99 = (histogram.percentile(p) / 1000 for p in (50, 90, 99))
+    print('{:<14} p50 {:8.2f}  p90 {:8.2f}  p99 {:8.2f}  max {:8.2f} ms'
+          .format(name, p50, p90, p99, histogram.max / 1000))
+
+
+def bots(options):
+    """Run bots and report how they did"""
+    from uberpong.game.net.bot import parse_script
+
+    script = parse_script(options['--script'])
+    count = int(options['--bots'])
+    procs = max(1, min(int(options['--procs']), count))
+    port = int(options['--port'])
+    duration = float(options['--duration'])
+
+    # two bots on each match
+    ports = [port + i // 2 for i in range(count)]
+
+    queue = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(
+            target=run_bots,
+            args=(options['--host'], ports[i::procs], script, duration,
+                  cvar_get('cl_cmdrate'), cvar_get('net_codec'), queue)
+        )
+        for i in range(procs)
+    ]
+    for worker in workers:
+        worker.start()
+
+    connected = refused = dropped = stale = 0
+    connect_time = Histogram()
+    inter_arrival = Histogram()
+    latency = Histogram()
+    for worker in workers:
+        results = queue.get()
+        connected += results[0]
+        refused += results[1]
+        dropped += results[2]
+        stale += results[3]
+        connect_time.merge(results[4])
+        inter_arrival.merge(results[5])
+        latency.merge(results[6])
+    for worker in workers:
+        worker.join()
+
+    print('{} bots on {} processes for {:.0f} s'.format(
+        count, procs, duration))
+    print('connected:     {}/{} ({} refused)'.format(
+        connected, count, refused))
+    print('snapshots:     {} dropped, {} stale'.format(dropped, stale))
+    report('connect', connect_time)
+    report('inter-arrival', inter_arrival)
+    if inter_arrival.count:
+        print('{:<14} {:8.2f} ms'.format('jitter', (
+            inter_arrival.percentile(99) - inter_arrival.percentile(50)
+        ) / 1000))
+    report('latency', latency)
+
+
+def main(argv):
+    options = docopt(__doc__, argv=argv)
+    register_cvars()
+    cvar_assign(cvar_parse_args(options['--set']))
+    if options['host']:
+        host(options)
+    else:
+        bots(options)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
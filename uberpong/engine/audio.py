@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+"""
+engine.audio
+~~~~~~~~
+Pooled sound playback
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import time
+import pyglet
+
+
+class VoicePool:
+    """
+    A small pool of reusable media players (voices)
+
+    Players are created as needed up to a maximum, and reused once
+    they are done playing. Each sound can take up to a number of
+    voices at once; going over either limit steals the voice which
+    started playing first.
+    """
+
+    def __init__(self, *, max_voices=8, voices_per_sound=2):
+        """Constructor
+
+        Kwargs:
+            max_voices(int, optional): players on the pool
+            voices_per_sound(int, optional): voices a single sound can take
+        """
+        self._max_voices = max_voices
+        self._voices_per_sound = voices_per_sound
+
+        self._players = []
+        self._keys = {}  # sound being played by each player
+        self._started = {}  # when each player started playing
+
+    def _busy(self, player):
+        return player.source is not None
+
+    def _stop(self, player):
+        """Stop a player and drop anything queued on it"""
+        player.pause()
+        while player.source is not None:
+            player.next_source()
+
+    def _oldest(self, players):
+        return min(players, key=self._started.__getitem__)
+
+    def _get_player(self, key):
+        """Pick a player to play a sound on"""
+        busy = [p for p in self._players if self._busy(p)]
+
+        # Too many voices on this very sound
+        same = [p for p in busy if self._keys.get(p) == key]
+        if len(same) >= self._voices_per_sound:
+            return self._oldest(same)
+
+        # Reuse an idle player
+        for player in self._players:
+            if not self._busy(player):
+                return player
+
+        if len(self._players) < self._max_voices:
+            player = pyglet.media.Player()
+            self._players.append(player)
+            return player
+
+        return self._oldest(busy)
+
+    def play(self, key, source):
+        """Play a (static) source on a voice
+
+        Args:
+            key(str): sound name, for per-sound voice limits
+            source(pyglet.media.Source): source to play
+        Returns:
+            The player the sound is played on
+        """
+        player = self._get_player(key)
+        if self._busy(player):
+            self._stop(player)
+        player.queue(source)
+        player.play()
+        self._keys[player] = key
+        self._started[player] = time.perf_counter()
+        return player
+
+    def playing(self, key):
+        """Whether a sound is being played on any voice"""
+        return any(
+            self._busy(p) and self._keys.get(p) == key
+            for p in self._players
+        )
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+engine.clock
+~~~~~~~~
+A clock driven by hand
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import heapq
+
+
+class ManualClock:
+    """
+    Scheduling clock whose time only moves when told to
+
+    It takes the scheduling calls of pyglet.clock, so it can be
+    handed to anything scheduling on it (e.g. a Scene) to run
+    simulations at full speed and with repeatable timing.
+    Callbacks get the simulated time elapsed since they were
+    scheduled or last called, just like on pyglet.clock.
+    """
+
+    def __init__(self):
+        self.time = 0.0
+        self._queue = []
+        self._seq = 0
+
+    def _schedule(self, func, delay, interval, args, kwargs):
+        # [due, seq, func, interval, args, kwargs, last call, alive]
+        entry = [self.time + delay, self._seq, func, interval,
+                 args, kwargs, self.time, True]
+        self._seq += 1
+        heapq.heappush(self._queue, entry)
+
+    def schedule_once(self, func, delay, *args, **kwargs):
+        """Call func(dt, *args, **kwargs) once, delay seconds from now"""
+        self._schedule(func, delay, None, args, kwargs)
+
+    def schedule_interval(self, func, interval, *args, **kwargs):
+        """Call func(dt, *args, **kwargs) every interval seconds"""
+        self._schedule(func, interval, interval, args, kwargs)
+
+    def unschedule(self, func):
+        """Stop calling func"""
+        for entry in self._queue:
+            if entry[2] == func:
+                entry[7] = False
+
+    def advance(self, dt):
+        """Move time forward, calling everything due on the way
+
+        Args:
+            dt(float): seconds to move forward
+        Returns:
+            Number of calls made
+        """
+        end = self.time + dt
+        queue = self._queue
+        calls = 0
+        while queue and queue[0][0] <= end:
+            entry = heapq.heappop(queue)
+            due, _, func, interval, args, kwargs, last, alive = entry
+            if not alive:
+                continue
+            self.time = due
+            if interval is not None:
+                entry[0] = due + interval
+                entry[6] = due
+                heapq.heappush(queue, entry)
+            func(due - last, *args, **kwargs)
+            calls += 1
+        self.time = end
+        return calls
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+
+"""
+engine.cvar
+~~~~~~~~
+Console variables
+
+A cvar is a named tunable with a type, an optional range and a
+list of callbacks to be called whenever its value changes, so
+consumers can keep its value at hand instead of looking it up
+over and over. Values can be set from code, from config files
+(one 'name value' pair per line) and from the command line
+('name=value' assignments).
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import os
+import logging
+
+log = logging.getLogger(__name__)
+
+# Strings taken as booleans
+_TRUE = ('1', 'true', 'yes', 'on')
+_FALSE = ('0', 'false', 'no', 'off')
+
+
+class CVarError(ValueError):
+    """Raised on unknown cvars and on invalid values"""
+    pass
+
+
+class CVar:
+    """A typed console variable"""
+
+    __slots__ = (
+        'name', 'type', 'default', 'min_value', 'max_value',
+        'reloadable', 'description', '_value', '_callbacks'
+    )
+
+    def __init__(self, name, default, *,
+                 min_value=None,
+                 max_value=None,
+                 reloadable=False,
+                 description=None):
+        """Constructor
+
+        Args:
+            name(str): name of this cvar
+            default: default value, its type is the type of this cvar
+        Kwargs:
+            min_value(optional): lowest value allowed
+            max_value(optional): highest value allowed
+            reloadable(bool): whether it can be changed while running
+            description(str, optional): what this cvar is about
+        """
+        self.name = name
+        self.type = type(default)
+        self.default = default
+        self.min_value = min_value
+        self.max_value = max_value
+        self.reloadable = reloadable
+        self.description = description
+        self._callbacks = []
+        self._value = self.convert(default)
+
+    def __repr__(self):
+        return 'CVar({!r}, {!r})'.format(self.name, self._value)
+
+    @property
+    def value(self):
+        """Get current value"""
+        return self._value
+
+    def convert(self, value):
+        """Convert a value (or a string) to the type of this cvar
+
+        Args:
+            value: value to be converted
+        Returns:
+            The converted value
+        Raises:
+            CVarError: value is not valid for this cvar
+        """
+        try:
+            if isinstance(value, str) and self.type is not str:
+                value = self._parse(value)
+            elif self.type is tuple:
+                value = tuple(value)
+            elif self.type is float and isinstance(value, int):
+                value = float(value)
+        except (TypeError, ValueError):
+            raise CVarError('{}: invalid value {!r}'.format(self.name, value))
+
+        if not isinstance(value, self.type):
+            raise CVarError('{}: expected {}, got {!r}'.format(
+                self.name, self.type.__name__, value
+            ))
+
+        if self.min_value is not None and value < self.min_value \
+                or self.max_value is not None and value > self.max_value:
+            raise CVarError('{}: {!r} out of range [{}, {}]'.format(
+                self.name, value, self.min_value, self.max_value
+            ))
+
+        return value
+
+    def _parse(self, text):
+        """Parse a string into the type of this cvar"""
+        text = text.strip()
+        if self.type is bool:
+            if text.lower() in _TRUE:
+                return True
+            if text.lower() in _FALSE:
+                return False
+            raise ValueError(text)
+        if self.type is tuple:
+            # Items take the type of the items on the default value
+            items = text.replace(',', ' ').split()
+            if len(items) != len(self.default):
+                raise ValueError(text)
+            return tuple(type(d)(i) for d, i in zip(self.default, items))
+        return self.type(text)
+
+    def set(self, value):
+        """Set a new value, notifying watchers if it has changed
+
+        Args:
+            value: new value (or a string to be parsed)
+        Returns:
+            The value set
+        Raises:
+            CVarError: value is not valid for this cvar
+        """
+        value = self.convert(value)
+        if value != self._value:
+            self._value = value
+            for callback in list(self._callbacks):
+                callback(self)
+        return value
+
+    def reset(self):
+        """Set back the default value"""
+        return self.set(self.default)
+
+    def watch(self, callback):
+        """Call callback(cvar) each time the value changes"""
+        self._callbacks.append(callback)
+
+    def unwatch(self, callback):
+        """Stop calling a callback"""
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+
+_cvars = {}
+
+
+def cvar_register(name, default, **kwargs):
+    """Register a cvar
+
+    Registering an existing cvar again leaves it untouched.
+
+    Args:
+        name(str): name of the cvar
+        default: default value
+    Kwargs:
+        kwargs(dict, optional): see CVar
+    Returns:
+        The cvar
+    """
+    cvar = _cvars.get(name)
+    if cvar is None:
+        cvar = _cvars[name] = CVar(name, default, **kwargs)
+    return cvar
+
+
+def cvar_find(name):
+    """Get a cvar object
+
+    Args:
+        name(str): name of the cvar
+    Returns:
+        The cvar
+    Raises:
+        CVarError: no such cvar
+    """
+    try:
+        return _cvars[name]
+    except KeyError:
+        raise CVarError('unknown cvar: {}'.format(name))
+
+
+def cvar_get(name):
+    """Get the value of a cvar
+
+    Args:
+        name(str): name of the cvar
+    Returns:
+        Its current value
+    """
+    return cvar_find(name).value
+
+
+def cvar_set(name, value):
+    """Set the value of a cvar
+
+    Args:
+        name(str): name of the cvar
+        value: new value (or a string to be parsed)
+    Returns:
+        The value set
+    """
+    return cvar_find(name).set(value)
+
+
+def cvar_watch(name, callback):
+    """Call callback(cvar) each time a cvar changes"""
+    cvar_find(name).watch(callback)
+
+
+def cvar_unwatch(name, callback):
+    """Stop calling a callback on changes of a cvar"""
+    cvar_find(name).unwatch(callback)
+
+
+def cvar_list():
+    """Get all registered cvars, sorted by name"""
+    return [_cvars[name] for name in sorted(_cvars)]
+
+
+def cvar_assign(assignments, *, prefix=None, reloading=False):
+    """Set cvars out of (name, value) pairs
+
+    Invalid assignments are logged and skipped.
+
+    Args:
+        assignments(iterable): (name, value) pairs
+    Kwargs:
+        prefix(str, optional): only set cvars with this prefix
+        reloading(bool): only set reloadable cvars
+    Returns:
+        Names of the cvars that have been changed
+    """
+    changed = []
+    for name, value in assignments:
+        if prefix is not None and not name.startswith(prefix):
+            continue
+        try:
+            cvar = cvar_find(name)
+            if reloading and not cvar.reloadable:
+                if cvar.convert(value) != cvar.value:
+                    log.warning('%s cannot be changed while running', name)
+                continue
+            old = cvar.value
+            if cvar.set(value) != old:
+                changed.append(name)
+        except CVarError as e:
+            log.warning('%s', e)
+    return changed
+
+
+def cvar_parse_args(args):
+    """Parse 'name=value' command line assignments
+
+    Args:
+        args(list): assignments
+    Returns:
+        A list of (name, value) pairs
+    Raises:
+        CVarError: an assignment is missing its '='
+    """
+    pairs = []
+    for arg in args:
+        name, sep, value = arg.partition('=')
+        if not sep:
+            raise CVarError('expected name=value, got {!r}'.format(arg))
+        pairs.append((name.strip(), value))
+    return pairs
+
+
+def cvar_parse_file(file_name):
+    """Parse a config file
+
+    Each line holds a cvar name followed by its value, blank lines
+    and everything after a '#' are ignored.
+
+    Args:
+        file_name(str): path to config file
+    Returns:
+        A list of (name, value) pairs
+    """
+    pairs = []
+    with open(file_name, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            name, _, value = line.partition(' ')
+            pairs.append((name, value))
+    return pairs
+
+
+def cvar_load(file_name, **kwargs):
+    """Set cvars out of a config file
+
+    Args:
+        file_name(str): path to config file
+    Kwargs:
+        kwargs(dict, optional): see cvar_assign
+    Returns:
+        Names of the cvars that have been changed
+    """
+    return cvar_assign(cvar_parse_file(file_name), **kwargs)
+
+
+class ConfigWatcher:
+    """Reload reloadable cvars whenever a config file changes"""
+
+    def __init__(self, file_name, *, prefix=None):
+        """Constructor
+
+        Args:
+            file_name(str): path to config file
+        Kwargs:
+            prefix(str, optional): only reload cvars with this prefix
+        """
+        self._file_name = file_name
+        self._prefix = prefix
+        self._mtime = self._stat()
+
+    def _stat(self):
+        try:
+            return os.stat(self._file_name).st_mtime
+        except OSError:
+            return None
+
+    def check(self, dt=None):
+        """Reload the config file if it has been modified
+
+        This is meant to be scheduled on the clock.
+
+        Returns:
+            Names of the cvars that have been changed
+        """
+        mtime = self._stat()
+        if mtime is None or mtime == self._mtime:
+            return []
+        self._mtime = mtime
+
+        try:
+            changed = cvar_load(
+                self._file_name, prefix=self._prefix, reloading=True
+            )
+        except OSError as e:
+            log.warning('could not reload %s: %s', self._file_name, e)
+            return []
+
+        for name in changed:
+            log.info('%s = %r', name, cvar_get(name))
+        return changed
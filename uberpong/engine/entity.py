@@ -9,9 +9,85 @@ A simple entity system
 See LICENSE for more details.
 """
 
-import uuid
+import struct
+from array import array
+from itertools import chain
+from operator import attrgetter
+
 import pymunk
 
+from .message import MessageBus
+
+
+# Attribute getters used on bulk state extraction
+_get_position = attrgetter('position')
+_get_velocity = attrgetter('velocity')
+_get_angle = attrgetter('angle')
+
+
+class EntityState:
+    """
+    Bulk state of a bunch of entities
+
+    Positions and velocities are laid out as flat (x, y) pairs,
+    that is, row i of this state lives at [2 * i] and [2 * i + 1]
+    on both arrays, and its angle at [i]. These arrays are reused
+    by every extraction done on this object.
+    """
+
+    def __init__(self):
+        """Constructor"""
+        self.count = 0
+        self.entities = []
+        self.positions = array('d')
+        self.velocities = array('d')
+        self.angles = array('d')
+
+        # Layouts of pairs and single values for count rows,
+        # packed straight into the arrays
+        self._pairs = struct.Struct('0d')
+        self._singles = self._pairs
+
+    def _resize(self, count):
+        """Resize arrays in place to hold count rows"""
+        for values, size in ((self.positions, 2 * count),
+                             (self.velocities, 2 * count),
+                             (self.angles, count)):
+            if len(values) > size:
+                del values[size:]
+            else:
+                values.frombytes(bytes(8 * (size - len(values))))
+        self._pairs = struct.Struct('{}d'.format(2 * count))
+        self._singles = struct.Struct('{}d'.format(count))
+        self.count = count
+
+    def fill(self, entities):
+        """Take the state of a bunch of entities in
+
+        Args:
+            entities(iterable): entities, in row order
+        """
+        ents = self.entities
+        ents[:] = entities
+        if len(ents) != self.count:
+            self._resize(len(ents))
+
+        self._pairs.pack_into(
+            self.positions, 0, *chain.from_iterable(map(_get_position, ents))
+        )
+        self._pairs.pack_into(
+            self.velocities, 0, *chain.from_iterable(map(_get_velocity, ents))
+        )
+        self._singles.pack_into(self.angles, 0, *map(_get_angle, ents))
+
+    def position(self, i):
+        """Get position on row i as integers"""
+        return int(self.positions[2 * i]), int(self.positions[2 * i + 1])
+
+    def velocity(self, i):
+        """Get velocity on row i as integers"""
+        return int(self.velocities[2 * i]), int(self.velocities[2 * i + 1])
+
 
 class EntityManager(pymunk.Space):
     """
@@ -19,16 +95,104 @@ class EntityManager(pymunk.Space):
 
     #TODO: document this as well
     """
+
+    # Spatial hash defaults (see enable_spatial_hash)
+    DEFAULT_CELL_SIZE = 32
+    DEFAULT_CELL_COUNT = 1000
+
+    # Entity handles layout: the lower bits hold a slot index
+    # and the upper ones the generation of that slot
+    HANDLE_INDEX_BITS = 16
+    HANDLE_INDEX_MASK = (1 << HANDLE_INDEX_BITS) - 1
+    HANDLE_GENERATION_MASK = (1 << 15) - 1
+
     def __init__(self):
         """Constructor"""
         super().__init__()
-        self._ents = {}
         self._classes = {}
-        self._msg_queue = []
 
-    def register_class(self, class_id, cls):
-        """Register an Entity class"""
+        #
+        # Entity storage:
+        # Every entity lives on a slot and is referred to by a handle,
+        # a compact integer made out of its slot index and the
+        # generation of that slot. Each time a slot is freed its
+        # generation goes up, so stale handles never resolve to
+        # whichever entity reuses that slot afterwards.
+        #
+        self._slots = []
+        self._generations = []
+        self._free_slots = []
+        self._count = 0
+
+        # Entities talk to each other through this
+        self._bus = MessageBus()
+
+        # Entities grouped by their class id, so a whole class
+        # can be walked without filtering every entity on the space
+        self._class_ents = {}
+
+        # Destroyed entities waiting to be reused (pooled classes only)
+        self._pools = {}
+
+    def register_class(self, class_id, cls, *, pooled=False):
+        """Register an Entity class
+
+        Args:
+            class_id(str): class id
+            cls(class): the actual Entity class
+        Kwargs:
+            pooled(bool, optional): whether destroyed entities of this
+                class are kept to be reused by further creations
+        """
         self._classes[class_id] = cls
+        self._class_ents.setdefault(class_id, {})
+        if pooled:
+            self._pools.setdefault(class_id, [])
+
+    def _alloc_handle(self):
+        """Take a free slot and make up a handle for it"""
+        if len(self._free_slots):
+            index = self._free_slots.pop()
+        else:
+            index = len(self._slots)
+            if index > self.HANDLE_INDEX_MASK:
+                raise MemoryError('out of entity slots')
+            self._slots.append(None)
+            self._generations.append(0)
+        return (self._generations[index] << self.HANDLE_INDEX_BITS) | index
+
+    def _spawn(self, class_id, **kwargs):
+        """Create and map an entity without putting it into the space"""
+
+        # handle for this new entity
+        handle = self._alloc_handle()
+
+        # reuse a pooled entity if possible, otherwise
+        # create the actual entity
+        pool = self._pools.get(class_id)
+        if pool:
+            entity = pool.pop()
+            entity.reset(handle, **kwargs)
+        else:
+            entity = self._classes[class_id](handle, manager=self, **kwargs)
+        entity.class_id = class_id
+
+        # map the entity
+        self._slots[handle & self.HANDLE_INDEX_MASK] = entity
+        self._class_ents[class_id][handle] = entity
+        self._count += 1
+
+        return entity
+
+    @staticmethod
+    def _physics_objects(entity):
+        """Get the pymunk objects an entity puts into the space
+
+        Static bodies are never added to a space, only their shapes are.
+        """
+        if entity.STATIC:
+            return (entity.box,)
+        return (entity, entity.box)
 
     def create_entity(self, class_id, **kwargs):
         """Create new entity instance
@@ -38,31 +202,183 @@ class EntityManager(pymunk.Space):
         Returns:
             The new created entity
         """
-        # uuid for this new entity
-        new_uuid = uuid.uuid4().hex
-
-        # create the actual entity
-        entity = self._classes[class_id](new_uuid, manager=self, **kwargs)
+        entity = self._spawn(class_id, **kwargs)
 
-        # TODO: document this!
-        self.add(entity, entity.box)
-
-        # map the entity
-        self._ents[new_uuid] = entity
+        # Put both body and boundary box into the space
+        self.add(*self._physics_objects(entity))
 
         # give the new entity back
         return entity
 
+    def create_entities(self, class_id, count, *, positions=None, **kwargs):
+        """Create a bunch of entities of the same class at once
+
+        All new bodies and shapes are put into the space with
+        a single call, which is way cheaper than doing it one by one.
+
+        Args:
+            class_id(str): class id
+            count(int): number of entities to create
+        Kwargs:
+            positions(list, optional): initial position for each entity
+            kwargs(dict, optional): arguments shared by all entities
+        Returns:
+            A list with the new created entities
+        """
+        entities = []
+        objects = []
+        for i in range(count):
+            if positions is not None:
+                kwargs['position'] = positions[i]
+            entity = self._spawn(class_id, **kwargs)
+            entities.append(entity)
+            objects.extend(self._physics_objects(entity))
+
+        if len(objects):
+            self.add(*objects)
+
+        return entities
+
+    def destroy_entity(self, handle):
+        """Remove an entity from the space and forget about it
+
+        This must not be called while the space is being stepped
+        (e.g. from a collision handler).
+
+        Args:
+            handle(int): handle of the entity to be destroyed
+        """
+        self.destroy_entities((handle,))
+
+    def destroy_entities(self, handles):
+        """Remove a bunch of entities from the space at once
+
+        Entities from pooled classes are kept aside to be reused,
+        handles of all of them become invalid right away.
+
+        Args:
+            handles(iterable): handles of the entities to be destroyed
+        """
+        objects = []
+        for handle in handles:
+            entity = self.get_entity(handle)
+            if entity is None:
+                continue
+
+            # free its slot and make older handles stale
+            index = handle & self.HANDLE_INDEX_MASK
+            self._slots[index] = None
+            self._generations[index] = \
+                (self._generations[index] + 1) & self.HANDLE_GENERATION_MASK
+            self._free_slots.append(index)
+            self._count -= 1
+
+            del self._class_ents[entity.class_id][handle]
+            objects.extend(self._physics_objects(entity))
+
+            pool = self._pools.get(entity.class_id)
+            if pool is not None:
+                pool.append(entity)
+
+        if len(objects):
+            self.remove(*objects)
+
+    def get_entity(self, handle):
+        """Get an entity by its handle
+
+        Returns:
+            The entity, None if there is no such entity (anymore)
+        """
+        index = handle & self.HANDLE_INDEX_MASK
+        if index < len(self._slots):
+            entity = self._slots[index]
+            if entity is not None and entity.handle == handle:
+                return entity
+        return None
+
+    def entities(self, class_id=None):
+        """Get all entities, or only those from a given class
+
+        Args:
+            class_id(str, optional): class id
+        Returns:
+            An iterable over the requested entities
+        """
+        if class_id is None:
+            return chain.from_iterable(
+                ents.values() for ents in self._class_ents.values()
+            )
+        return self._class_ents[class_id].values()
+
+    def extract_state(self, class_id, state=None):
+        """Extract positions, velocities and angles of a whole class
+
+        Every attribute is read for all entities in one go, through
+        map and chain rather than a Python loop over entities, and
+        packed straight into the arrays on state. These are only
+        resized (in place) when the count changes.
+
+        Args:
+            class_id(str): class id
+            state(EntityState, optional): state to be filled
+        Returns:
+            The filled EntityState
+        """
+        if state is None:
+            state = EntityState()
+
+        state.fill(self._class_ents[class_id].values())
+
+        return state
+
+    @property
+    def entity_count(self):
+        """Number of entities living on this manager"""
+        return self._count
+
+    def enable_spatial_hash(self, *, cell_size=None, count=None):
+        """Use a spatial hash as broadphase instead of the default tree
+
+        Once there are plenty of similarly sized objects (e.g. lots of
+        balls and obstacles), a spatial hash performs better than the
+        default bounding box tree. As a rule of thumb, cells should be
+        about as big as the objects on the space and the number of
+        cells should be around ten times the number of shapes.
+
+        Kwargs:
+            cell_size(int, optional): cell dimension, by default it is
+                the average size of all entities on this manager
+            count(int, optional): minimum number of cells in the hash
+        """
+        if cell_size is None:
+            sizes = [max(e.width, e.height) for e in self.entities()]
+            if len(sizes):
+                cell_size = sum(sizes) / len(sizes)
+            else:
+                cell_size = self.DEFAULT_CELL_SIZE
+
+        if count is None:
+            count = max(self.DEFAULT_CELL_COUNT, 10 * len(self.shapes))
+
+        self.use_spatial_hash(cell_size, count)
+
+    def register_handler(self, msg_type, handler):
+        """Register a handler for a type of message
+
+        Args:
+            msg_type(type): type of message as made by message_type
+            handler(callable): called as handler(recipient, messages)
+        """
+        self._bus.register_handler(msg_type, handler)
+
     def dispatch_messages(self):
-        """Deliver all pending messages"""
-        while len(self._msg_queue):
-            msg = self._msg_queue.pop()
-            entity_dst = self._ents[msg['to']]
-            entity_dst.on_message(msg)
+        """Deliver all pending messages (in the order they were sent)"""
+        if len(self._bus):
+            self._bus.dispatch(self.get_entity)
 
     def queue_message(self, msg):
         """Queue a new message"""
-        self._msg_queue.append(msg)
+        self._bus.post(msg)
 
 
 class Entity(pymunk.Body):
@@ -70,7 +386,7 @@ class Entity(pymunk.Body):
     Entity unit
 
     A general purpose object which is meant to be put
-    into game scene. This object only holds an UUID,
+    into game scene. This object only holds a handle,
     a boundary box and a series of arbitrary attributes
     (e.g. "cg_color", "glow", etc.).
 
@@ -81,47 +397,90 @@ class Entity(pymunk.Body):
     on its behalf but rather a simple object holding information
     to be used by its manager.
 
+    A static entity (e.g. an obstacle) is built upon a static
+    body which is never simulated, only its boundary box is
+    put into the space.
+
+    Entities can be reused by their manager once destroyed, so
+    everything making up a single life of an entity is (re)set
+    on reset(), which subclasses extend with their own attributes.
     """
-    def __init__(self, uuid, *, manager,
-                 mass=100, position=(0, 0), size=(32, 32), **kwargs):
+
+    __slots__ = (
+        '_manager', '_handle', '_width', '_height',
+        '_box', '_directory', 'class_id'
+    )
+
+    # Whether this entity lives on a static body
+    STATIC = False
+
+    def __init__(self, handle, *, manager,
+                 mass=100, size=(32, 32), **kwargs):
         """Constructor
 
         Args:
-            uuid(str): uuid assigned to this entity
+            handle(int): handle assigned to this entity
         Kwargs:
             position(tuple): Initial position
             size(tuple): Boundary box size for this entity
             manager(EntityManager): this entity's manager
         """
 
-        # Assign manager and UUID for this entity
+        # Assign manager for this entity
         self._manager = manager
-        self._uuid = uuid
 
         # size
         self._width, self._height = size
 
-        # Set moment (inertia) for this body
-        moment = pymunk.moment_for_box(mass, self._width, self._height)
+        if self.STATIC:
+            # Static body
+            super().__init__()
+        else:
+            # Set moment (inertia) for this body
+            moment = pymunk.moment_for_box(mass, self._width, self._height)
 
-        # Call my parent
-        super().__init__(mass, moment)
+            # Call my parent
+            super().__init__(mass, moment)
 
         # boundary box for this body
         self._box = pymunk.Poly.create_box(self, size)
 
-        # position
-        self.position = position
-
         #
         # Contacts directory:
         # In order for entity to be able to communicate with other entities,
         # it will need to posses a directory from which each of its peers
-        # can be referred to by a friendly name instead of its raw UUID, very
-        # much like having a contact list on your smartphone. With this
+        # can be referred to by a friendly name instead of its raw handle,
+        # very much like having a contact list on your smartphone. With this
         # approach, any entity can easily send messages to another one
         self._directory = {}
 
+        # Class id given by the manager
+        self.class_id = None
+
+        # Set up its first life
+        self.reset(handle, **kwargs)
+
+    def reset(self, handle, *, position=(0, 0)):
+        """Set up a new life for this entity
+
+        Args:
+            handle(int): handle assigned to this entity
+        Kwargs:
+            position(tuple): Initial position
+        """
+        self._handle = handle
+        self._directory.clear()
+
+        # position
+        self.position = position
+
+        # Reset physics on it
+        if not self.STATIC:
+            self.velocity = (0, 0)
+            self.angular_velocity = 0
+            self.angle = 0
+            self.reset_forces()
+
     @property
     def manager(self):
         return self._manager
@@ -142,38 +501,45 @@ class Entity(pymunk.Body):
         return self._height
 
     @property
-    def uuid(self):
-        """Get UUID of this entity"""
-        return self._uuid
+    def handle(self):
+        """Get handle of this entity"""
+        return self._handle
 
-    def send_message(self, *, to, data):
+    def send_message(self, msg_type, to, *fields):
         """Send a message to another entity
 
-        Kwargs:
+        Args:
+            msg_type(type): type of message as made by message_type
             to(str): friendly name of the destination entity
-            data(dict): variable data to be sent to the destination entity
+            fields: data fields for this type of message
         """
         self._manager.queue_message(
-            {
-                "from": self._uuid,  # Remitent UUID (this entity's UUID)
-                "to": self._directory[to],  # Destination entity's UUID
-                "data": data  # Arbitrary data to be sent to this entity
-            }
+            msg_type((self._handle, self._directory[to]) + fields)
         )
 
-    def add_to_directory(self, name, uuid):
+    def add_to_directory(self, name, handle):
         """Add an entity to this entity's directory
 
         Args:
-            name: Friendly name to be associated to the UUID
-            uuid: Unique identifier of the entity to be added to the directory
+            name: Friendly name to be associated to the handle
+            handle: Handle of the entity to be added to the directory
+        """
+        self._directory[name] = handle
+
+    def on_messages(self, messages):
+        """This will be invoked with a batch of messages of the same
+        type for which no handler has been registered on the manager
+
+        Args:
+            messages(list): messages in the order they were sent
         """
-        self._directory[name] = uuid
+        for msg in messages:
+            self.on_message(msg)
 
     def on_message(self, msg):
         """This will be invoked anytime this entity receives a message
 
         Args:
-            msg(dict): Message envelope containing all relevant data
+            msg(tuple): Message as made by engine.message.message_type
         """
         pass
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""
+engine.glstats
+~~~~~~~~
+OpenGL call counter
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import sys
+
+
+class GLCallCounter:
+    """
+    Count draw calls and GL state changes made by pyglet
+
+    pyglet modules get all GL functions as module globals
+    (from pyglet.gl import *), so these are wrapped in place
+    on every module using them. Counting is cheap but not free,
+    so this is meant for diagnostics only.
+    """
+
+    # Functions issuing a draw call
+    DRAW_CALLS = (
+        'glBegin',
+        'glDrawArrays',
+        'glDrawElements',
+        'glMultiDrawArrays',
+        'glMultiDrawElements',
+    )
+
+    # Functions changing GL state
+    STATE_CHANGES = (
+        'glBindTexture',
+        'glBindBuffer',
+        'glBlendFunc',
+        'glEnable',
+        'glDisable',
+        'glPushAttrib',
+        'glPopAttrib',
+        'glPushClientAttrib',
+        'glPopClientAttrib',
+        'glUseProgram',
+    )
+
+    # pyglet modules doing any drawing
+    MODULES = (
+        'pyglet.graphics',
+        'pyglet.graphics.vertexattribute',
+        'pyglet.graphics.vertexbuffer',
+        'pyglet.graphics.vertexdomain',
+        'pyglet.image',
+        'pyglet.sprite',
+        'pyglet.text',
+        'pyglet.text.layout',
+    )
+
+    def __init__(self):
+        # calls on the current frame
+        self.draw_calls = 0
+        self.state_changes = 0
+
+        # totals over all finished frames
+        self.frames = 0
+        self.total_draw_calls = 0
+        self.total_state_changes = 0
+
+        # (module, name, original function)
+        self._patched = []
+
+    def install(self):
+        """Start counting"""
+        for mod_name in self.MODULES:
+            module = sys.modules.get(mod_name)
+            if module is None:
+                continue
+            for name in self.DRAW_CALLS:
+                self._wrap(module, name, self._count_draw)
+            for name in self.STATE_CHANGES:
+                self._wrap(module, name, self._count_state)
+
+    def uninstall(self):
+        """Stop counting and restore all wrapped functions"""
+        for module, name, func in self._patched:
+            setattr(module, name, func)
+        self._patched = []
+
+    def _wrap(self, module, name, count):
+        func = getattr(module, name, None)
+        if func is None:
+            return
+
+        def wrapper(*args):
+            count()
+            return func(*args)
+
+        setattr(module, name, wrapper)
+        self._patched.append((module, name, func))
+
+    def _count_draw(self):
+        self.draw_calls += 1
+
+    def _count_state(self):
+        self.state_changes += 1
+
+    def end_frame(self):
+        """Close the current frame
+
+        Returns:
+            A tuple with draw calls and state changes on the frame
+        """
+        frame = self.draw_calls, self.state_changes
+        self.frames += 1
+        self.total_draw_calls += self.draw_calls
+        self.total_state_changes += self.state_changes
+        self.draw_calls = 0
+        self.state_changes = 0
+        return frame
+
+    def reset(self):
+        """Forget about all finished frames"""
+        self.frames = 0
+        self.total_draw_calls = 0
+        self.total_state_changes = 0
+
+    def format_stats(self):
+        """Average calls per frame as a human readable string"""
+        frames = self.frames or 1
+        return '{:.1f} draw calls, {:.1f} state changes per frame'.format(
+            self.total_draw_calls / frames,
+            self.total_state_changes / frames
+        )
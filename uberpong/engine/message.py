@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+engine.message
+~~~~~~~~
+A typed message bus for entities
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+from collections import defaultdict, deque, namedtuple
+from itertools import groupby
+
+
+def message_type(name, fields=()):
+    """Create a new type of message
+
+    A message is a named tuple whose first two fields are always
+    its sender and its recipient (both entity ids), followed by
+    whatever fields are given. Messages are built out of a single
+    tuple holding all of their fields, e.g.:
+
+        Hit = message_type('Hit', ('force',))
+        msg = Hit((sender, recipient, 300))
+
+    which goes straight through tuple.__new__ instead of the
+    (way slower) Python-level constructor of named tuples.
+    No dictionary is built for any message, neither on creation
+    nor on delivery.
+
+    Args:
+        name(str): name for this type of message
+        fields(iterable, optional): names of its data fields
+    Returns:
+        The new message type
+    """
+    base = namedtuple(name, ('sender', 'recipient') + tuple(fields))
+    return type(name, (base,), {'__slots__': (), '__new__': tuple.__new__})
+
+
+class MessageBus:
+    """
+    Message bus
+
+    Messages are delivered in the very same order they were posted
+    (FIFO). On each dispatch, messages are grouped by recipient and
+    every run of messages of the same type is handed over in one
+    batch to the handler registered for that type, so handlers get
+    called once per batch rather than once per message.
+    """
+
+    def __init__(self):
+        """Constructor"""
+        self._queue = deque()
+        self._handlers = {}
+
+    def register_handler(self, msg_type, handler):
+        """Register a handler for a type of message
+
+        Args:
+            msg_type(type): type of message as made by message_type
+            handler(callable): called as handler(recipient, messages)
+        """
+        self._handlers[msg_type] = handler
+
+    def post(self, msg):
+        """Queue a new message"""
+        self._queue.append(msg)
+
+    def __len__(self):
+        """Number of pending messages"""
+        return len(self._queue)
+
+    def dispatch(self, resolve):
+        """Deliver all pending messages
+
+        Messages posted by handlers during delivery are delivered
+        as well before returning. Messages whose recipient can not
+        be resolved (e.g. it has been destroyed) are dropped.
+
+        Args:
+            resolve(callable): get a recipient entity out of its id
+        Returns:
+            Number of messages delivered
+        """
+        delivered = 0
+        while len(self._queue):
+            # Take everything pending at this point, anything
+            # posted from here on goes into the next round
+            queue = self._queue
+            self._queue = deque()
+
+            # Group messages by recipient keeping their order
+            batches = defaultdict(list)
+            for msg in queue:
+                batches[msg[1]].append(msg)
+
+            for recipient_id, batch in batches.items():
+                recipient = resolve(recipient_id)
+                if recipient is None:
+                    continue
+                delivered += len(batch)
+                self._deliver(recipient, batch)
+
+        return delivered
+
+    def _deliver(self, recipient, batch):
+        """Hand over runs of messages of the same type to their handler"""
+        handlers = self._handlers
+
+        # Most of the time a recipient gets a single type of message,
+        # in which case the whole batch goes in one go
+        types = set(map(type, batch))
+        if len(types) == 1:
+            runs = ((types.pop(), batch),)
+        else:
+            runs = ((t, list(run)) for t, run in groupby(batch, type))
+
+        for msg_type, run in runs:
+            handler = handlers.get(msg_type)
+            if handler is None:
+                recipient.on_messages(run)
+            else:
+                handler(recipient, run)
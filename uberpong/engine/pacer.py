@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""
+engine.pacer
+~~~~~~~~
+Frame pacing for the main loop
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import select
+import time
+
+import pyglet
+
+
+class FramePacer:
+    """
+    Frame pacing for a main loop
+
+    Frames are drawn on a fixed period given by an fps cap, and in
+    between the loop sleeps until whatever comes first: the next frame,
+    the next scheduled pyglet.clock function, incoming data on any of
+    the sockets being watched or input events on any window.
+
+    Window input is waited on through the display connection where
+    the platform has one to select() on (X11). Elsewhere sleeps are
+    cut short every INPUT_PERIOD so input is still taken in timely.
+
+    With vsync on, window.flip() already blocks until the next refresh,
+    so frames are paced by the display as long as the cap is above its
+    refresh rate, and no time is spent spinning for precise deadlines.
+    """
+
+    # Sleeping is only good up to a certain precision, so waits
+    # on a frame deadline stop this much early and spin the rest
+    SPIN_MARGIN = 0.0005
+
+    # Longest sleep when window input can't be waited on
+    INPUT_PERIOD = 0.01
+
+    def __init__(self, fps_max, *, vsync=False):
+        """Constructor
+
+        Args:
+            fps_max(int): frames per second cap
+        Kwargs:
+            vsync(bool, optional): whether windows are synced to the display
+        """
+        self._period = 1.0 / fps_max
+        self._vsync = vsync
+        self._deadline = time.perf_counter()
+
+    def set_fps(self, fps):
+        """Change the frame rate, starting on the frame coming next
+
+        Args:
+            fps(int): frames per second
+        """
+        period = 1.0 / fps
+        if period != self._period:
+            self._deadline += period - self._period
+            self._period = period
+
+    def frame_due(self):
+        """Whether it is time to draw a new frame"""
+        return time.perf_counter() >= self._deadline
+
+    def frame_done(self):
+        """Let the pacer know a frame has been drawn"""
+        now = time.perf_counter()
+        self._deadline += self._period
+
+        # Don't try to catch up on frames dropped long ago
+        if self._deadline < now:
+            self._deadline = now + self._period
+
+    def wait(self, socks=()):
+        """Sleep until the next frame, clock function, network data or input
+
+        Args:
+            socks(list, optional): sockets to watch for incoming data
+        """
+        timeout = self._deadline - time.perf_counter()
+
+        # pyglet.clock functions due before next frame
+        clock_timeout = pyglet.clock.get_sleep_time(True)
+        wait_frame = clock_timeout is None or timeout <= clock_timeout
+        if not wait_frame:
+            timeout = clock_timeout
+
+        if wait_frame and not self._vsync:
+            timeout -= self.SPIN_MARGIN
+
+        # Display connections windows get their input from
+        watched = list(socks)
+        for display in set(window.display for window in pyglet.app.windows):
+            if hasattr(display, 'fileno'):
+                # events already read off the connection
+                if display.poll():
+                    return
+                watched.append(display)
+            elif timeout > self.INPUT_PERIOD:
+                timeout = self.INPUT_PERIOD
+                wait_frame = False
+
+        if timeout > 0:
+            if watched:
+                ready, _, _ = select.select(watched, [], [], timeout)
+                if ready:
+                    return
+            else:
+                time.sleep(timeout)
+
+        # Precise wait for frame deadline
+        if wait_frame and not self._vsync:
+            while time.perf_counter() < self._deadline:
+                pass
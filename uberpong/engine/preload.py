@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""
+engine.preload
+~~~~~~~~
+Background resource preloading
+
+Resources are decoded one after another on a worker thread, and then
+finished on the main thread (e.g. uploaded to GL) as they are polled.
+Waiting for a single resource never waits on the ones queued before
+it: if the worker hasn't taken it yet, it is decoded right away on
+the waiting thread, and resources decoded in the meantime are set
+aside to be finished on a later poll.
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import queue
+import threading
+from collections import OrderedDict
+
+
+class Preloader:
+    """Resources decoded in background, finished on the main thread"""
+
+    def __init__(self, decode, finish):
+        """Constructor
+
+        Args:
+            decode(callable): decode(kind, file_name) reads and decodes
+                a resource, on any thread
+            finish(callable): finish(kind, key, data) finishes a decoded
+                resource, on the main thread
+        """
+        self._decode = decode
+        self._finish = finish
+
+        # key -> (kind, file name) not taken by the worker yet
+        self._todo = OrderedDict()
+        self._lock = threading.Lock()
+        self._worker = None
+
+        self._pending = {}  # kinds of resources yet to be finished by key
+        self._decoded = queue.Queue()  # (kind, key, decoded data)
+        self._set_aside = []  # decoded while waiting for something else
+        self._total = 0
+
+    def start(self, items):
+        """Queue resources to be decoded in background
+
+        Args:
+            items(iterable): (kind, key, file name) of each resource,
+                in the order they are to be decoded
+        """
+        with self._lock:
+            for kind, key, file_name in items:
+                if key in self._pending:
+                    continue
+                self._todo[key] = (kind, file_name)
+                self._pending[key] = kind
+                self._total += 1
+
+            if self._worker is None and self._todo:
+                self._worker = threading.Thread(
+                    target=self._decode_all, daemon=True
+                )
+                self._worker.start()
+
+    def _decode_one(self, kind, file_name):
+        """Decode a resource, handing errors over to whoever finishes it"""
+        try:
+            return self._decode(kind, file_name)
+        except Exception as e:
+            return e
+
+    def _decode_all(self):
+        """Decode queued resources (on the worker thread)"""
+        while True:
+            with self._lock:
+                if not self._todo:
+                    self._worker = None
+                    return
+                key, (kind, file_name) = self._todo.popitem(last=False)
+            self._decoded.put((kind, key, self._decode_one(kind, file_name)))
+
+    def _complete(self, kind, key, data):
+        """Finish a decoded resource"""
+        del self._pending[key]
+        if isinstance(data, Exception):
+            raise data
+        self._finish(kind, key, data)
+
+    def wait_for(self, key):
+        """Block until a resource (if queued at all) is finished
+
+        Args:
+            key(str): resource key name
+        """
+        if key not in self._pending:
+            return
+
+        # not taken by the worker yet, so it is decoded right here
+        with self._lock:
+            item = self._todo.pop(key, None)
+        if item is not None:
+            kind, file_name = item
+            self._complete(kind, key, self._decode_one(kind, file_name))
+            return
+
+        # decoded already while waiting for some other resource
+        for item in self._set_aside:
+            if item[1] == key:
+                self._set_aside.remove(item)
+                self._complete(*item)
+                return
+
+        while key in self._pending:
+            item = self._decoded.get()
+            if item[1] == key:
+                self._complete(*item)
+            else:
+                self._set_aside.append(item)
+
+    def pending(self, kind):
+        """Keys of resources of a kind not finished yet"""
+        return [key for key, k in self._pending.items() if k == kind]
+
+    def poll(self):
+        """Finish all resources decoded so far
+
+        Returns:
+            Preloading progress (from 0 to 1)
+        """
+        while self._set_aside:
+            self._complete(*self._set_aside.pop(0))
+        while self._pending:
+            try:
+                item = self._decoded.get_nowait()
+            except queue.Empty:
+                break
+            self._complete(*item)
+        return self.progress
+
+    @property
+    def progress(self):
+        """Preloading progress (from 0 to 1)"""
+        if not self._total:
+            return 1.0
+        return 1.0 - len(self._pending) / self._total
+
+    @property
+    def loaded(self):
+        """Whether all preloaded resources are finished"""
+        return not self._pending
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+engine.profiler
+~~~~~~~~
+A lightweight per-phase tick profiler
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import time
+
+
+class Histogram:
+    """
+    HDR-style histogram
+
+    Values (integers, e.g. microseconds) are counted on log-linear
+    buckets: every power of two is split into the same number of
+    sub-buckets, so the relative error stays bounded (about 3% with
+    the default precision) no matter how big values get, while
+    recording a value is just a couple of integer operations.
+    """
+
+    def __init__(self, *, precision=5, max_bits=32):
+        """Constructor
+
+        Kwargs:
+            precision(int, optional): bits used on each sub-bucket
+            max_bits(int, optional): bits of the largest value to track
+        """
+        self._bits = precision
+        self._half = 1 << (precision - 1)
+        self._size = (max_bits - precision + 2) * self._half
+        self._counts = [0] * self._size
+        self.reset()
+
+    def reset(self):
+        """Forget about all recorded values"""
+        counts = self._counts
+        for i in range(self._size):
+            counts[i] = 0
+        self.count = 0
+        self.max = 0
+        self.total = 0
+
+    def _index(self, value):
+        """Get the bucket for value"""
+        if value < 2 * self._half:
+            return value
+        shift = value.bit_length() - self._bits
+        return min(
+            shift * self._half + (value >> shift),
+            self._size - 1
+        )
+
+    def _value(self, index):
+        """Get the highest value counted on bucket index"""
+        if index < 2 * self._half:
+            return index
+        shift = index // self._half - 1
+        return ((index - shift * self._half + 1) << shift) - 1
+
+    def record(self, value):
+        """Record a new value"""
+        self._counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Add up all values recorded on another histogram
+
+        Args:
+            other(Histogram): histogram with the same precision
+        """
+        counts = self._counts
+        for index, count in enumerate(other._counts):
+            counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.max > self.max:
+            self.max = other.max
+
+    def percentile(self, p):
+        """Get the value at percentile p (0-100)"""
+        if not self.count:
+            return 0
+        target = max(1, int(self.count * p / 100 + 0.5))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                # anything too big for this histogram ends up on
+                # the last bucket, the max is the best guess there
+                if index == self._size - 1:
+                    return self.max
+                return min(self._value(index), self.max)
+        return self.max
+
+
+class TickProfiler:
+    """
+    Per-phase tick profiler
+
+    A tick starts with begin(), and every mark(phase) records
+    the time elapsed since the previous mark (or begin) as the
+    time spent on that phase. end() records the whole tick under
+    the 'tick' phase. Timings are kept in microseconds on a
+    Histogram per phase until reset() is called, which makes
+    every dump a rolling window over the last period.
+    """
+
+    TICK = 'tick'
+
+    def __init__(self, phases=()):
+        """Constructor
+
+        Args:
+            phases(iterable, optional): phases known in advance,
+                so they show up on stats in that order
+        """
+        self._clock = time.perf_counter
+        self._histograms = {}
+        for phase in tuple(phases) + (self.TICK,):
+            self._histograms[phase] = Histogram()
+        self._start = 0.0
+        self._last = 0.0
+
+    def begin(self):
+        """Start timing a tick"""
+        self._start = self._last = self._clock()
+
+    def mark(self, phase):
+        """Record the time since the previous mark under phase"""
+        now = self._clock()
+        histogram = self._histograms.get(phase)
+        if histogram is None:
+            histogram = self._histograms[phase] = Histogram()
+        histogram.record(int((now - self._last) * 1000000))
+        self._last = now
+
+    def end(self):
+        """Finish timing a tick"""
+        now = self._clock()
+        self._histograms[self.TICK].record(int((now - self._start) * 1000000))
+        self._last = now
+
+    def reset(self):
+        """Start a new window"""
+        for histogram in self._histograms.values():
+            histogram.reset()
+
+    def stats(self):
+        """Get timings per phase
+
+        Returns:
+            A dict holding count, p50, p99, max and total (in
+            milliseconds) for each phase
+        """
+        return {
+            phase: {
+                'count': h.count,
+                'p50': h.percentile(50) / 1000,
+                'p99': h.percentile(99) / 1000,
+                'max': h.max / 1000,
+                'total': h.total / 1000,
+            }
+            for phase, h in self._histograms.items()
+        }
+
+    def format_stats(self):
+        """Get stats as a nice human readable table"""
+        lines = ['{:>10} {:>7} {:>9} {:>9} {:>9}'.format(
+            'phase', 'count', 'p50(ms)', 'p99(ms)', 'max(ms)')]
+        for phase, s in self.stats().items():
+            lines.append('{:>10} {:>7} {:>9.3f} {:>9.3f} {:>9.3f}'.format(
+                phase, s['count'], s['p50'], s['p99'], s['max']))
+        return '\n'.join(lines)
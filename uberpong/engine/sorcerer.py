@@ -10,12 +10,33 @@ See LICENSE for more details.
 """
 
 
+import io
+import json
 from os import path
 import pyglet
 
+from .audio import VoicePool
+from .preload import Preloader
+
 
 class Sorcerer:
-    """ A slightly useful resource manager """
+    """ A slightly useful resource manager
+
+    Resources listed on a manifest can be preloaded in background:
+    files are read and decoded on a worker thread, and then finished
+    on the main thread (fonts registered, images uploaded as textures)
+    by poll. Asking for a resource still being preloaded gets it
+    finished first, without waiting on the ones listed before it.
+
+    Texture atlases (see tools/build_atlas.py) are loaded once, and
+    their regions are handed out by name.
+
+    Sounds are loaded as static (pre-decoded) sources, and played on
+    a pool of reusable players.
+    """
+
+    # Kinds of resources, in the order they are preloaded
+    KINDS = ('fonts', 'atlases', 'images', 'sounds')
 
     def __init__(self, *, root_dir):
         """Constructor
@@ -38,12 +59,22 @@ class Sorcerer:
         # images root directory
         self._root_images = path.join(self._root, 'images')
 
+        # Texture regions on atlases by name
+        self._regions = {}
+
+        # Players for sounds (built on first use)
+        self._voices = None
+
+        # Preloading bits
+        self._preloader = Preloader(self._decode, self._finish)
+
     def get_resource(self, key):
         """Get a resource
 
         Args:
             key(str): logical name for this resource
         """
+        self._wait_for(key)
         if key in self._resources:
             return self._resources[key]
         return None
@@ -53,6 +84,143 @@ class Sorcerer:
             self._resources[key] = r
         return r
 
+    def preload(self, file_name='manifest.json'):
+        """Start preloading all resources listed on a manifest
+
+        The manifest is a JSON file on the root directory, listing
+        [key, file name] pairs for each kind of resource.
+
+        Kwargs:
+            file_name(str, optional): manifest file
+        """
+        with open(path.join(self._root, file_name)) as f:
+            manifest = json.load(f)
+
+        self._preloader.start(
+            (kind, key, file_name)
+            for kind in self.KINDS
+            for key, file_name in manifest.get(kind, [])
+            if key not in self._resources
+        )
+
+    def _decode(self, kind, file_name):
+        """Read and decode a resource (on any thread)"""
+        if kind == 'fonts':
+            with open(path.join(self._root_fonts, file_name), 'rb') as f:
+                return io.BytesIO(f.read())
+        if kind == 'atlases':
+            return self._load_atlas(file_name)
+        if kind == 'images':
+            return pyglet.image.load(path.join(self._root_images, file_name))
+        return pyglet.media.load(
+            path.join(self._root_sounds, file_name), streaming=False
+        )
+
+    def _finish(self, kind, key, data):
+        """Finish a decoded resource (on the main thread)"""
+        if kind == 'fonts':
+            pyglet.font.add_file(data)
+            data = pyglet.font.load(key)
+        elif kind == 'atlases':
+            data = self._add_regions(*data)
+        elif kind == 'images':
+            data = data.get_texture()
+        self._push_resource(key, data)
+
+    def _wait_for(self, key):
+        """Block until a resource being preloaded is finished"""
+        self._preloader.wait_for(key)
+
+    def poll(self):
+        """Finish all resources decoded so far
+
+        This is meant to be called on every frame.
+
+        Returns:
+            Preloading progress (from 0 to 1)
+        """
+        return self._preloader.poll()
+
+    @property
+    def progress(self):
+        """Preloading progress (from 0 to 1)"""
+        return self._preloader.progress
+
+    @property
+    def loaded(self):
+        """Whether all preloaded resources are finished"""
+        return self._preloader.loaded
+
+    def _load_atlas(self, file_name):
+        """Read an atlas manifest and decode its image"""
+        with open(path.join(self._root_images, file_name)) as f:
+            manifest = json.load(f)
+        image = pyglet.image.load(
+            path.join(self._root_images, manifest['image'])
+        )
+        return manifest, image
+
+    def _add_regions(self, manifest, image):
+        """Upload an atlas and set up all of its regions
+
+        Returns:
+            The atlas texture
+        """
+        texture = image.get_texture()
+        for name, info in manifest['regions'].items():
+            region = texture.get_region(*info['rect'])
+            region.anchor_x, region.anchor_y = info['anchor']
+            self._regions[name] = region
+        return texture
+
+    def create_atlas(self, key, *, file_name):
+        """Load a texture atlas
+
+        Kwargs:
+            key(str): resource key name
+            file_name(str): atlas manifest (as built by tools/build_atlas.py)
+
+        Returns:
+            A new (if not existent) pyglet Texture
+        """
+        self._wait_for(key)
+        if key in self._resources:
+            return self._resources[key]
+        return self._push_resource(
+            key, self._add_regions(*self._load_atlas(file_name))
+        )
+
+    def get_region(self, name):
+        """Get a region on any loaded atlas
+
+        Regions are shared, so they are not to be modified.
+
+        Args:
+            name(str): region name
+        Returns:
+            A pyglet TextureRegion, None if there is no such region
+        """
+        if name not in self._regions:
+            for key in self._preloader.pending('atlases'):
+                self._wait_for(key)
+        return self._regions.get(name)
+
+    def play_sound(self, key):
+        """Play a sound created (or preloaded) beforehand
+
+        Args:
+            key(str): resource key name
+        Returns:
+            The pyglet Player the sound is played on
+        """
+        if self._voices is None:
+            self._voices = VoicePool()
+        return self._voices.play(key, self.get_resource(key))
+
+    def sound_playing(self, key):
+        """Whether a sound is being played"""
+        return self._voices is not None and self._voices.playing(key)
+
     def create_font(self, key, *, file_name):
         """Create a pyglet font
 
@@ -65,20 +233,25 @@ class Sorcerer:
         """
         # don't even bother to load if it's
         # already present on this sorcerer
+        self._wait_for(key)
         if key not in self._resources:
             pyglet.font.add_file('{}/{}'.format(self._root_fonts, file_name))
             self._push_resource(key, pyglet.font.load(key))
+        return self._resources[key]
 
     def create_image(self, key, *, file_name):
-        """Create a pyglet font
+        """Create a pyglet image
 
         Kwargs:
             key(str): resource key name
-            file_name(str): font file to use
+            file_name(str): image file to use
 
         Returns:
-            A new (if not existent) pyglet Image
+            A new (if not existent) pyglet Texture
         """
+        self._wait_for(key)
+        if key in self._resources:
+            return self._resources[key]
 
         return self._push_resource(
             key,
@@ -86,7 +259,7 @@ class Sorcerer:
                 '{}/{}'.format(
                     self._root_images, file_name
                 )
-            )
+            ).get_texture()
         )
 
     def create_sound(self, key, *, file_name):
@@ -99,6 +272,9 @@ class Sorcerer:
         Returns:
             A new (if not existent) pyglet Sound
         """
+        self._wait_for(key)
+        if key in self._resources:
+            return self._resources[key]
 
         return self._push_resource(
             key,
@@ -106,6 +282,7 @@ class Sorcerer:
                 '{}/{}'.format(
                     self._root_sounds,
                     file_name
-                )
+                ),
+                streaming=False
             )
         )
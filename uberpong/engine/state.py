@@ -10,11 +10,18 @@ See LICENSE for more details.
 """
 
 
+import importlib
 import pyglet
 
 
 class State:
     """State implementation"""
+
+    # Frames per second needed while on top of the stack, None for as
+    # many as the frame cap allows. States hardly animating anything
+    # lower it, so the main loop idles on them instead.
+    FPS = None
+
     def __init__(self, *, machine):
         """Constructor
 
@@ -27,6 +34,15 @@ class State:
     def window(self):
         return self._machine.window
 
+    @property
+    def machine(self):
+        return self._machine
+
+    @property
+    def fps(self):
+        """Frames per second needed right now (None for no limit)"""
+        return self.FPS
+
     #
     # Operations done on parent machine
     #
@@ -44,8 +60,10 @@ class State:
     #
     def on_begin(self):
         """
-        This is going to be called after this state has been created
-        and pushed onto its parent machine's stack
+        This is going to be called after this state has been pushed
+        onto its parent machine's stack, and each time it gets back
+        on top of it. Cached states are pushed over and over on the
+        same instance, so this is where they start over.
         """
         pass
 
@@ -101,15 +119,26 @@ class StateMachine(pyglet.event.EventDispatcher):
         self.register_event_type('on_update')
         self.register_event_type('on_exit')
 
-        # State stack
+        # State stack (its top is at the end)
         self._stack = []
 
         # Registered state classes
         self._states = {}
 
+        # Class ids whose instances are built once and reused,
+        # and those instances once built
+        self._cached = set()
+        self._instances = {}
+
+        # Number of pushes and pops so far
+        self.transitions = 0
+
         # window
         self._window = window
 
+        # Drawn on top of any state (see set_overlay)
+        self._overlay = None
+
         # Set keyboard+mouse callbacks
         self._state_on_key_press = None
         self._state_on_key_release = None
@@ -132,14 +161,52 @@ class StateMachine(pyglet.event.EventDispatcher):
     def window(self):
         return self._window
 
-    def register_state(self, class_id, cls):
+    def register_state(self, class_id, cls, *, cached=False):
         """Register State class
 
+        A class can be given by name as 'package.module:Class', in
+        which case its module is only imported once the state is
+        pushed for the first time.
+
+        A cached state is built once (on its first push or on
+        preload_states) and that very instance is reused on every
+        push afterwards, so it must not be on the stack twice at once.
+
         Args:
             class_id(str): key name for this State class
-            cls(class): The actual State class
+            cls(class): The actual State class (or its name)
+        Kwargs:
+            cached(bool): whether to reuse a single instance
         """
         self._states[class_id] = cls
+        if cached:
+            self._cached.add(class_id)
+        else:
+            self._cached.discard(class_id)
+        self._instances.pop(class_id, None)
+
+    def preload_states(self):
+        """Build all cached states not built yet"""
+        for class_id in self._cached:
+            self._create_state(class_id)
+
+    def _create_state(self, class_id):
+        """Get a state ready to be pushed"""
+        state = self._instances.get(class_id)
+        if state is None:
+            state = self._get_state_class(class_id)(machine=self)
+            if class_id in self._cached:
+                self._instances[class_id] = state
+        return state
+
+    def _get_state_class(self, class_id):
+        """Get a registered State class, importing it if needed"""
+        cls = self._states[class_id]
+        if isinstance(cls, str):
+            module, _, name = cls.partition(':')
+            cls = getattr(importlib.import_module(module), name)
+            self._states[class_id] = cls
+        return cls
 
     def get_current_state(self):
         """Return current state on top of stack
@@ -147,17 +214,27 @@ class StateMachine(pyglet.event.EventDispatcher):
         Returns:
             A State, if the stack is empty it will return None
         """
-        if len(self._stack):
-            return self._stack[0]
+        if self._stack:
+            return self._stack[-1]
         return None
 
+    def set_overlay(self, overlay):
+        """Set something to be drawn on top of any state
+
+        Args:
+            overlay: any object with a draw() method, or None
+        """
+        self._overlay = overlay
+
     def update_state(self):
         """Raise on_update event on the state currently active"""
         self.dispatch_event('on_update')
+        if self._overlay is not None:
+            self._overlay.draw()
 
     def purge_stack(self):
         """Pop all states from the stack"""
-        while len(self._stack):
+        while self._stack:
             self.pop_state()
 
     def pop_until(self, class_id):
@@ -167,19 +244,20 @@ class StateMachine(pyglet.event.EventDispatcher):
         if class_id not in self._states:
             return
 
-        while len(self._states) \
+        while self._stack \
             and not isinstance(
                 self.get_current_state(),
-                self._states[class_id]
+                self._get_state_class(class_id)
             ):
             self.pop_state()
 
     def pop_state(self):
         """Pop the state on top of the stack"""
-        if len(self._stack):
+        if self._stack:
             self.dispatch_event('on_exit')
-            self._stack.pop(0)
+            self._stack.pop()
             self._attach_events(self.get_current_state())
+            self.transitions += 1
 
         # Trigger an on_begin event on new state
         self.dispatch_event('on_begin')
@@ -221,13 +299,14 @@ class StateMachine(pyglet.event.EventDispatcher):
         if state is not None:
             self.dispatch_event('on_exit')
 
-        # Create a new state
-        state = self._states[class_id](machine=self)
+        # Create a new state (or reuse a cached one)
+        state = self._create_state(class_id)
 
         # Push this new state onto the stack and attach
         # events onto it
-        self._stack.insert(0, state)
+        self._stack.append(state)
         self._attach_events(state)
+        self.transitions += 1
 
         # Trigger an on_begin event on new state
         self.dispatch_event('on_begin')
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+"""
+engine.watchdog
+~~~~~~~~
+Tick budget watchdog
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class TickWatchdog:
+    """
+    Tick budget watchdog
+
+    Each tick is compared against its time budget, and any tick
+    going over it counts as an overrun. Overruns are looked at on
+    fixed windows of ticks: when too many of them happened on a
+    window the watchdog steps one stage down into degradation,
+    and when (almost) none happened it steps one stage back up.
+    Since there is at most one transition per window, the stage
+    doesn't flap around on short bursts.
+
+    What each stage means is up to whoever runs the ticks.
+    """
+
+    # Degradation stages
+    STAGE_NORMAL = 0
+    STAGE_SHED_NONCRITICAL = 1
+    STAGE_LOW_SNAPSHOT_RATE = 2
+    STAGE_LOW_PHYSICS_RATE = 3
+
+    STAGE_NAMES = (
+        'normal',
+        'skipping non-critical snapshots',
+        'lower snapshot rate',
+        'lower physics step rate',
+    )
+
+    def __init__(self, budget, *, window=66, overload=0.25, recover=0.02):
+        """Constructor
+
+        Args:
+            budget(float): time budget for a tick (in seconds)
+        Kwargs:
+            window(int, optional): ticks on each window
+            overload(float, optional): ratio of overruns on a window
+                from which the next degradation stage is entered
+            recover(float, optional): ratio of overruns on a window
+                under which the previous stage is restored
+        """
+        self._budget = budget
+        self._window = window
+        self._overload = overload
+        self._recover = recover
+
+        # current window
+        self._window_ticks = 0
+        self._window_overruns = 0
+
+        # totals
+        self.ticks = 0
+        self.overruns = 0
+
+        # current stage
+        self.stage = self.STAGE_NORMAL
+
+    def record(self, elapsed, late=0.0):
+        """Record a tick
+
+        Args:
+            elapsed(float): time spent on the tick (in seconds)
+            late(float, optional): how late the tick started
+        Returns:
+            The current stage
+        """
+        self.ticks += 1
+        self._window_ticks += 1
+        if elapsed > self._budget or late > self._budget:
+            self.overruns += 1
+            self._window_overruns += 1
+
+        if self._window_ticks >= self._window:
+            ratio = self._window_overruns / self._window_ticks
+            if ratio >= self._overload \
+                    and self.stage < self.STAGE_LOW_PHYSICS_RATE:
+                self._set_stage(self.stage + 1, ratio)
+            elif ratio <= self._recover and self.stage > self.STAGE_NORMAL:
+                self._set_stage(self.stage - 1, ratio)
+            self._window_ticks = 0
+            self._window_overruns = 0
+
+        return self.stage
+
+    def _set_stage(self, stage, ratio):
+        log.warning(
+            'tick budget overruns at %d%%: %s -> %s',
+            int(ratio * 100),
+            self.STAGE_NAMES[self.stage],
+            self.STAGE_NAMES[stage]
+        )
+        self.stage = stage
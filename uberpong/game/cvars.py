@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+game.cvars
+~~~~~~~~
+Console variables of the game
+
+Server variables (sv_*) marked as reloadable can be changed on a
+running server through its config file, the rest of them are only
+read once at startup.
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+from uberpong.engine.cvar import cvar_register
+
+
+def register_cvars():
+    """Register all game cvars along their defaults"""
+
+    #
+    # Common
+    #
+
+    # Network protocol codec to be used
+    cvar_register('net_codec', 'json')
+
+    # The server simulates the game in discrete time steps called ticks.
+    # By default, the timestep is 15ms, so 66.666... ticks
+    # per second are simulated
+    cvar_register('tickrate', 66, min_value=1, max_value=1000)
+
+    # Default server port for either server or client
+    cvar_register('sv_port', 54212, min_value=1, max_value=65535)
+
+    #
+    # Client
+    #
+
+    # The rate at which a client sends requests to the server per second
+    cvar_register('cl_cmdrate', 30, min_value=1, max_value=1000)
+
+    # The client can request a certain snapshot rate
+    cvar_register('cl_updaterate', 20, min_value=1, max_value=1000)
+
+    # Frames per second cap, the main loop sleeps in between
+    # frames (0 means no cap and no sleeping at all)
+    cvar_register('cl_fps_max', 120, min_value=0)
+
+    # Sync frames to the display refresh
+    cvar_register('cl_vsync', True)
+
+    # Show the performance HUD at start (toggled with F3)
+    cvar_register('cl_showperf', False)
+
+    # Count draw calls and GL state changes, and how often
+    # (in seconds) their averages per frame are dumped (0 means never)
+    cvar_register('cl_gl_stats', 0, min_value=0)
+
+    #
+    # Server
+    #
+    cvar_register('sv_cheats', False)
+    cvar_register('sv_gravity', (0.0, 0.0), reloadable=True)
+    cvar_register('sv_paddle_impulse', 3200, min_value=0, reloadable=True)
+    cvar_register('sv_paddle_mass', 100, min_value=1)
+    cvar_register('sv_paddle_friction', 0.80, min_value=0.0,
+                  reloadable=True)
+    cvar_register('sv_paddle_max_velocity', 1600, min_value=0,
+                  reloadable=True)
+    cvar_register('sv_ball_mass', 10, min_value=1)
+    cvar_register('sv_ball_max_velocity', 800, min_value=0,
+                  reloadable=True)
+    cvar_register('sv_score_max', 10, min_value=1, reloadable=True)
+
+    # Party mode: extra balls and obstacles on the board
+    cvar_register('sv_party_balls', 0, min_value=0)
+    cvar_register('sv_party_obstacles', 0, min_value=0)
+
+    # Use a spatial hash as broadphase (good for party mode)
+    cvar_register('sv_spatial_hash', False)
+
+    # Physics steps per tick
+    cvar_register('sv_substeps', 1, min_value=1, max_value=16)
+
+    # Apply paddle and ball rules on every physics step
+    cvar_register('sv_velocity_callbacks', True)
+
+    # Per-phase tick profiler, and how often (in seconds)
+    # its timings are dumped (0 means never)
+    cvar_register('sv_profile', False)
+    cvar_register('sv_profile_dump', 10, min_value=0)
+
+    # Degrade gracefully when ticks go over their time budget
+    cvar_register('sv_watchdog', True)
+
+    # Flood protection: requests per second each client address is
+    # allowed for each kind of request (0 means no limit), and how
+    # many of them can be sent in a row. Datagrams of any kind are
+    # limited all together before they're even decoded
+    cvar_register('sv_ratelimit_datagram', 200, min_value=0,
+                  reloadable=True)
+    cvar_register('sv_ratelimit_datagram_burst', 60, min_value=1,
+                  reloadable=True)
+    cvar_register('sv_ratelimit_connect', 2, min_value=0, reloadable=True)
+    cvar_register('sv_ratelimit_connect_burst', 5, min_value=1,
+                  reloadable=True)
+    cvar_register('sv_ratelimit_move', 120, min_value=0, reloadable=True)
+    cvar_register('sv_ratelimit_move_burst', 30, min_value=1,
+                  reloadable=True)
+    cvar_register('sv_ratelimit_other', 60, min_value=0, reloadable=True)
+    cvar_register('sv_ratelimit_other_burst', 30, min_value=1,
+                  reloadable=True)
+
+    # Client addresses kept track of by flood protection
+    cvar_register('sv_ratelimit_clients', 4096, min_value=1)
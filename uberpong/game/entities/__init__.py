@@ -2,4 +2,5 @@
 
 from .ball import Ball
 from .board import Board
+from .obstacle import Obstacle
 from .player import PlayerPaddle
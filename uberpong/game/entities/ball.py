@@ -9,25 +9,85 @@ Ball as an entity
 See LICENSE for more details.
 """
 
+import math
+import pymunk
+
 from uberpong.engine.spot import spot_get
+from uberpong.engine.cvar import cvar_get
 from uberpong.engine.entity import Entity
 
 
 class Ball(Entity):
     """Ball as an entity"""
 
+    __slots__ = ()
+
     CTYPE = 40  # collision type
 
-    def __init__(self, uuid, **kwargs):
+    # In order to have a decent/pleasurable gameplay the ball needs
+    # to maintain a certain pace, so it gets 2% faster every second
+    # until it reaches its top speed
+    SPEEDUP = 1.02
+
+    # Very much like table hockey games the ball gets pushed until
+    # it gains its minimum horizontal speed, with this horizontal
+    # impulse per second plus as much as its own vertical velocity
+    # on the vertical axis
+    PUSH_IMPULSE = 200
+    MIN_SPEED_X = 200.0
+
+    def __init__(self, handle, **kwargs):
         # call my parent
-        super().__init__(uuid, mass=spot_get('sv_ball_mass'),
+        super().__init__(handle, mass=cvar_get('sv_ball_mass'),
                          size=spot_get('ball_size'), **kwargs)
 
         # pymunk.Body elasticity for this paddle
         self.box.elasticity = 1.0
 
-        # Ball top speed
-        self.velocity_limit = spot_get('sv_ball_max_velocity')
-
         # Collision type for this body
         self.box.collision_type = self.CTYPE
+
+        # Speed rules are applied by pymunk on every step
+        if cvar_get('sv_velocity_callbacks'):
+            self.velocity_func = Ball.update_velocity
+
+    def reset(self, handle, **kwargs):
+        """Set up a new life for this ball
+
+        Args:
+            handle(int): handle assigned to this entity
+        Kwargs:
+            kwargs(dict, optional): see Entity.reset
+        """
+        super().reset(handle, **kwargs)
+
+        # Ball top speed, taken on each life in
+        # case it has been changed in the meantime
+        self.velocity_limit = cvar_get('sv_ball_max_velocity')
+
+    @staticmethod
+    def update_velocity(body, gravity, damping, dt):
+        """Integrate velocity and apply the ball speed rules
+
+        This is meant to be used as velocity_func on a pymunk.Body
+        """
+        pymunk.Body.update_velocity(body, gravity, damping, dt)
+
+        vx, vy = body.velocity
+        speedup = Ball.SPEEDUP ** dt
+        vx *= speedup
+        vy *= speedup
+
+        # push it until it reaches its minimum speed
+        if 0 < abs(vx) < Ball.MIN_SPEED_X:
+            push = dt / body.mass
+            vx = math.copysign(abs(vx) + Ball.PUSH_IMPULSE * push, vx)
+            vy += vy * push
+
+        # never go beyond top speed
+        speed = math.hypot(vx, vy)
+        if speed > body.velocity_limit:
+            vx *= body.velocity_limit / speed
+            vy *= body.velocity_limit / speed
+
+        body.velocity = vx, vy
@@ -40,10 +40,7 @@ class Board:
         self._body.position = 0, 0
 
         # Coordinates used to create segments
-        left = 0
-        top = height - 1
-        right = width - 1
-        bottom = 0
+        left, bottom, right, top = self.extents(width, height)
         thick = 200  # thickness of walls
 
         # Create the actual static boundaries
@@ -102,3 +99,15 @@ class Board:
 
             # Put them in the space
             self._space.add(boundary)
+
+    @staticmethod
+    def extents(width, height):
+        """Get the inner edges of the boundaries of a board
+
+        Args:
+            width(int): board width in pixels
+            height(int): board height in pixels
+        Returns:
+            A (left, bottom, right, top) tuple
+        """
+        return 0, 0, width - 1, height - 1
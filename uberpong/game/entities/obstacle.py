@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+"""
+game.entities.obstacle
+~~~~~~~~
+Obstacle as an entity
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+from uberpong.engine.spot import spot_get
+from uberpong.engine.entity import Entity
+
+
+class Obstacle(Entity):
+    """Static obstacle standing on the board"""
+
+    __slots__ = ()
+
+    CTYPE = 60  # collision type
+    STATIC = True
+
+    def __init__(self, handle, **kwargs):
+        # call my parent
+        super().__init__(handle, size=spot_get('obstacle_size'), **kwargs)
+
+        # pymunk.Body elasticity for this obstacle
+        self.box.elasticity = 1.0
+
+        # Collision type for this body
+        self.box.collision_type = self.CTYPE
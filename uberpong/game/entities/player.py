@@ -8,33 +8,34 @@ game.entities.player
 See LICENSE for more details.
 """
 
+import pymunk
+
 from uberpong.engine.spot import spot_get
+from uberpong.engine.cvar import cvar_get
 from uberpong.engine.entity import Entity
 
 
 class PlayerPaddle(Entity):
     """Paddle as an entity"""
 
+    __slots__ = (
+        'host', 'port', 'number', 'token', 'foe', 'ready', 'score',
+        'decay', 'timestamp', 'timestamp_received'
+    )
+
     CTYPE = 50  # collision type
 
-    def __init__(self,
-                 uuid,
-                 host=None,
-                 port=None,
-                 number=None,
-                 foe=None,
-                 **kwargs):
+    def __init__(self, handle, **kwargs):
         """Constructor
 
+        Args:
+            handle(int): handle assigned to this entity
         Kwargs:
-            host(str): Client address associated with this player
-            port(str): Source port of client address
-            number(int): Player number
-            foe(str): Opponent UUID
+            kwargs(dict, optional): see reset
         """
 
         # call my parent
-        super().__init__(uuid, mass=spot_get('sv_paddle_mass'),
+        super().__init__(handle, mass=cvar_get('sv_paddle_mass'),
                          size=spot_get('paddle_size'), **kwargs)
 
         # pymunk.Body elasticity for this paddle
@@ -43,19 +44,77 @@ class PlayerPaddle(Entity):
         # collision type for this body
         self.box.collision_type = self.CTYPE
 
-        # paddle top speed
-        self.velocity_limit = spot_get('sv_paddle_max_velocity')
+        # Paddle rules are applied by pymunk on every step
+        if cvar_get('sv_velocity_callbacks'):
+            self.velocity_func = PlayerPaddle.update_velocity
+
+    def set_friction(self, friction):
+        """Set artificial friction on this paddle
+
+        A paddle loses this fraction (over its mass) of its velocity
+        on every tick, here it is turned into a decay factor per
+        second so it holds no matter the step size.
+
+        Args:
+            friction(float): friction per tick
+        """
+        self.decay = (1 - friction / self.mass) ** cvar_get('tickrate')
+
+    @staticmethod
+    def update_velocity(body, gravity, damping, dt):
+        """Integrate velocity and apply the paddle rules
+
+        This is meant to be used as velocity_func on a pymunk.Body
+        """
+        pymunk.Body.update_velocity(body, gravity, damping, dt)
+
+        # it won't move sideways no matter what,
+        # and it is slowed down by some friction
+        body.velocity = 0, body.velocity.y * body.decay ** dt
+
+    def reset(self, handle, *,
+              host=None,
+              port=None,
+              number=None,
+              foe=None,
+              **kwargs):
+        """Set up a new life for this paddle
+
+        Args:
+            handle(int): handle assigned to this entity
+        Kwargs:
+            host(str): Client address associated with this player
+            port(str): Source port of client address
+            number(int): Player number
+            foe(PlayerPaddle): Opponent
+        """
+
+        # call my parent
+        super().reset(handle, **kwargs)
 
         # Networking information for this player
         self.host = host
         self.port = port
 
+        # Latest client timestamp, echoed back on updates,
+        # and when it was received (server time)
+        self.timestamp = None
+        self.timestamp_received = None
+
         # Player number
         self.number = number
 
+        # Session token, given by the scene (see SessionRegistry)
+        self.token = None
+
         # This player's opponent
         self.foe = foe
 
         # Initial flags for this player
         self.ready = False
         self.score = 0
+
+        # Paddle top speed and friction, taken on each
+        # life in case they have been changed in the meantime
+        self.velocity_limit = cvar_get('sv_paddle_max_velocity')
+        self.set_friction(cvar_get('sv_paddle_friction'))
@@ -11,6 +11,7 @@ See LICENSE for more details.
 
 
 import traceback
+import logging
 import os
 import sys
 import pyglet
@@ -19,31 +20,42 @@ from docopt import docopt
 from os import path
 from uberpong.engine.state import State, StateMachine
 from uberpong.engine.spot import spot_set, spot_get
+from uberpong.engine.cvar import (
+    cvar_get,
+    cvar_set,
+    cvar_load,
+    cvar_assign,
+    cvar_parse_args,
+    ConfigWatcher
+)
 from uberpong.engine.sorcerer import Sorcerer
+from uberpong.engine.glstats import GLCallCounter
+from uberpong.engine.pacer import FramePacer
 from uberpong import (
     __name__ as pkg_name,
     __author__ as pkg_author,
     __version__ as pkg_version,
 )
 
-from .net import PlayerClient, Scene
-
-from .states import (
-    CreditsState,
-    SplashState,
-    RoundState,
-    LoadState,
-    BeginState,
-    ScoreState,
-    GameSetState,
-    WaitState
-)
+from .net.player import PlayerClient
+from .net.scene import Scene
+from .hud import PerfHUD
+from .cvars import register_cvars
+from .utils import FONT_PRIMARY, FONT_SECONDARY
+
+log = logging.getLogger(__name__)
 
 
 class Game(StateMachine):
     """Game class"""
 
     def __init__(self, argv):
+        # Diagnostics (e.g. profiler dumps) go to stderr
+        logging.basicConfig(
+            level=logging.INFO,
+            format='[%(name)s] %(message)s'
+        )
+
         # Parse command line arguments
         self._parse_args(argv)
 
@@ -53,12 +65,16 @@ class Game(StateMachine):
         # Populate SPOT with a bunch of defaults
         self._spot_init()
 
+        # Tunables
+        self._cvar_init()
+
         #
         # Set up window
         #
         self._window = pyglet.window.Window(
             800, 600,
             style=pyglet.window.Window.WINDOW_STYLE_DIALOG,
+            vsync=cvar_get('cl_vsync'),
             caption="{name} - {version}"
             .format(name=spot_get('game_name'),
                     version=spot_get('game_version'))
@@ -71,15 +87,22 @@ class Game(StateMachine):
         # Call the parent
         super().__init__(window=self._window)
 
-        # Register states
-        self.register_state('game_credits', CreditsState)
-        self.register_state('game_splash', SplashState)
-        self.register_state('game_round', RoundState)
-        self.register_state('game_load', LoadState)
-        self.register_state('game_begin', BeginState)
-        self.register_state('game_wait', WaitState)
-        self.register_state('game_score', ScoreState)
-        self.register_state('game_set', GameSetState)
+        # Register states, these are imported as they are needed.
+        # States pushed over and over during a match are built once
+        # (see LoadState) so going from one to another takes no time
+        states = 'uberpong.game.states'
+        self.register_state('game_credits', states + '.credits:CreditsState')
+        self.register_state('game_splash', states + '.splash:SplashState')
+        self.register_state('game_load', states + '.load:LoadState')
+        self.register_state('game_wait', states + '.wait:WaitState')
+        self.register_state('game_begin', states + '.begin:BeginState',
+                            cached=True)
+        self.register_state('game_round', states + '.round:RoundState',
+                            cached=True)
+        self.register_state('game_score', states + '.score:ScoreState',
+                            cached=True)
+        self.register_state('game_set', states + '.set:GameSetState',
+                            cached=True)
 
         # Shutdown flag
         self._shutdown = False
@@ -95,6 +118,7 @@ class Game(StateMachine):
             (self._window.width // 2, self._window.height // 2)
         )
         spot_set('ball_size', (32, 32))
+        spot_set('obstacle_size', (16, 16))
         spot_set(
             'cl_scores_position',
             (self._window.width // 2, self._window.height - 32)
@@ -113,6 +137,19 @@ class Game(StateMachine):
         # sourcerer a.k.a. resource manager
         self._sorcerer = Sorcerer(root_dir=path.join(assets_path))
 
+        # All assets are read and decoded on background from now on
+        self._sorcerer.preload()
+
+        # create the base fonts used throughout the entire game
+        self._sorcerer.create_font(
+            FONT_SECONDARY,
+            file_name='8bitOperatorPlus8-Regular.ttf'
+        )
+        self._sorcerer.create_font(
+            FONT_PRIMARY,
+            file_name='8bitOperatorPlus-Regular.ttf'
+        )
+
         #
         # Create server and client
         #
@@ -120,55 +157,53 @@ class Game(StateMachine):
         self._server = None
         self.create_client(self.create_server())
 
+        # Server cvars are reloaded as the config file changes
+        config = self._options['--config']
+        if config is not None and self._server is not None:
+            self._config_watcher = ConfigWatcher(config, prefix='sv_')
+            pyglet.clock.schedule_interval(self._config_watcher.check, 1.0)
+
+        # Performance HUD, drawn on top of any state
+        self._hud = PerfHUD(
+            window=self._window,
+            machine=self,
+            client=self._client,
+            visible=cvar_get('cl_showperf')
+        )
+        self.set_overlay(self._hud)
+
+        # Draw call counter (None when disabled)
+        self._gl_stats = None
+        if cvar_get('cl_gl_stats'):
+            self._gl_stats = GLCallCounter()
+            self._gl_stats.install()
+            pyglet.clock.schedule_interval(
+                self.dump_gl_stats, cvar_get('cl_gl_stats')
+            )
+
     def _spot_init(self):
         """Set initial SPOT values"""
-
-        #
-        # Common
-        #
         spot_set('game_name', "Uber Pong!")
         spot_set('game_version', pkg_version)
 
-        # Network protocol codec to be used
-        spot_set('net_codec', 'json')
-
-        # The server simulates the game in discrete time steps called ticks.
-        # By default, the timestep is 15ms, so 66.666... ticks
-        # per second are simulated
-        spot_set('tickrate', 66)
-
-        #
-        # Client
-        #
-
-        # The rate at which a client sends requests to the server per second
-        spot_set('cl_cmdrate', 30)
-
-        # The client can request a certain snapshot rate
-        spot_set('cl_updaterate', 20)
-
-        #
-        # Server
-        #
-        if self._options['--host'] is None:
-            spot_set('sv_cheats', False)
-            spot_set('sv_gravity', (0, 0))
-            spot_set('sv_paddle_impulse', 3200)
-            spot_set('sv_paddle_mass', 100)
-            spot_set('sv_paddle_friction', 0.80)
-            spot_set('sv_paddle_max_velocity', 1600)
-            spot_set('sv_ball_mass', 10)
-            spot_set('sv_ball_max_velocity', 800)
-            spot_set('sv_score_max', 10)
+    def _cvar_init(self):
+        """Register cvars and set them from config file and command line"""
+        register_cvars()
 
         # Default server port for either server or client
-        spot_set('sv_port', int(self._options['--port']))
+        cvar_set('sv_port', self._options['--port'])
+
+        # Config file first, then command line assignments on top
+        config = self._options['--config']
+        if config is not None:
+            cvar_load(config)
+        cvar_assign(cvar_parse_args(self._options['--set']))
 
     def _parse_args(self, argv):
         """pong
 
         Usage:
-            pong [-H <ip_address> | --host <ip_address>] [--port <port> | -p <port>] [--lz4 | -z]
+            pong [-H <ip_address> | --host <ip_address>] [--port <port> | -p <port>] [--lz4 | -z] [--config <file> | -c <file>] [--set <name=value>]...
             pong -h | --help
             pong --version
 
@@ -176,6 +211,8 @@ class Game(StateMachine):
           -z --lz4                    Use LZ4 compression algorithm
           -H --host <ip_address>      Server to connect to
           -p --port <port>            Port to connect to [default: 54212]
+          -c --config <file>          Read cvars from a config file
+          --set <name=value>          Set a cvar
           -h --help                   Show this screen.
           --version                   Show version.
         """
@@ -205,10 +242,10 @@ class Game(StateMachine):
             server_addr = 'localhost'
 
             # Create the actual server
-            self._server = Scene(port=spot_get('sv_port'),
+            self._server = Scene(port=cvar_get('sv_port'),
                                  width=self._window.width,
                                  height=self._window.height,
-                                 codec=spot_get('net_codec'))
+                                 codec=cvar_get('net_codec'))
 
             # Activate LZ4 compression on client
             if options['--lz4']:
@@ -238,8 +275,8 @@ class Game(StateMachine):
             window=self._window,
             ball_position=spot_get('ball_position_start'),
             address=server_addr,
-            port=spot_get('sv_port'),
-            codec=spot_get('net_codec')
+            port=cvar_get('sv_port'),
+            codec=cvar_get('net_codec')
         )
 
         #
@@ -252,14 +289,28 @@ class Game(StateMachine):
         spot_set('game_client', self._client)
 
     def on_draw(self):
+        # Finish assets decoded on background so far
+        self._sorcerer.poll()
+
         self._window.clear()
         self.update_state()
+        if self._gl_stats is not None:
+            self._gl_stats.end_frame()
+
+    def dump_gl_stats(self, dt=None):
+        """Log average GL calls per frame and start over"""
+        log.info('gl: %s', self._gl_stats.format_stats())
+        self._gl_stats.reset()
 
     def on_key_press(self, sym, mod):
         """Exit the game if F12 has been pressed"""
         if sym == pyglet.window.key.F12:
             self.exit()
 
+        # Toggle the performance HUD
+        elif sym == pyglet.window.key.F3:
+            self._hud.toggle()
+
     def _handle_except(self, e):
         """Exception handler"""
         exc_type, exc_obj, exc_tb = sys.exc_info()
@@ -279,6 +330,17 @@ class Game(StateMachine):
             # Push first State
             self.push_state('game_credits')
 
+            # Frame pacing (None when frames are uncapped)
+            pacer = None
+            fps_max = cvar_get('cl_fps_max')
+            if fps_max:
+                pacer = FramePacer(fps_max, vsync=cvar_get('cl_vsync'))
+
+            # The loop wakes up early on data sent to the client
+            socks = []
+            if self._client is not None:
+                socks.append(self._client.sock)
+
             # Run the thing!
             while not self._shutdown:
                 #
@@ -288,12 +350,27 @@ class Game(StateMachine):
                 if self._client is not None:
                     self._client.pump()
 
+                # States not animating much are drawn less often
+                if pacer is not None:
+                    state = self.get_current_state()
+                    fps = state.fps if state is not None else None
+                    pacer.set_fps(fps_max if fps is None
+                                  else min(fps, fps_max))
+
                 # pyglet.window bit
+                draw = pacer is None or pacer.frame_due()
                 for window in pyglet.app.windows:
                     window.switch_to()
                     window.dispatch_events()
-                    window.dispatch_event('on_draw')
-                    window.flip()
+                    if draw:
+                        window.dispatch_event('on_draw')
+                        window.flip()
+
+                # Sleep until there's something to do
+                if pacer is not None:
+                    if draw:
+                        pacer.frame_done()
+                    pacer.wait(socks)
 
         except Exception as e:
             self._handle_except(e)
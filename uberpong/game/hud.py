@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""
+game.hud
+~~~~~~~~
+Performance HUD
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import time
+import pyglet
+
+from uberpong.engine.profiler import Histogram
+
+from . import colors
+
+
+class PerfHUD:
+    """
+    Performance overlay
+
+    Shows fps, frame time percentiles and network stats as seen by
+    the player client. Frame times are recorded on every frame, but
+    text is only laid out again a couple of times per second, on a
+    batch of its own, so it costs next to nothing to have it shown.
+    """
+
+    # Seconds between text updates
+    UPDATE_INTERVAL = 0.5
+
+    def __init__(self, *, window, client, machine=None, visible=False):
+        """Constructor
+
+        Kwargs:
+            window(pyglet.window): game window
+            client(PlayerClient): client to show network stats from
+            machine(StateMachine, optional): machine whose state
+                transitions are to be timed
+            visible(bool, optional): whether to show it at first
+        """
+        self._client = client
+        self._batch = pyglet.graphics.Batch()
+        self._label = pyglet.text.Label(
+            '', font_size=10, x=8, y=window.height - 8,
+            width=window.width // 2, multiline=True,
+            anchor_x='left', anchor_y='top',
+            color=colors.GRAY1 + (255,),
+            batch=self._batch
+        )
+
+        # frame times (in microseconds)
+        self._frame_times = Histogram()
+        self._last_frame = None
+
+        # worst time taken by a frame with a state transition on it
+        self._machine = machine
+        self._transitions = None
+        self._worst_transition = 0.0
+
+        # counters on last text update
+        self._last_update = None
+        self._last_counters = None
+
+        self.visible = visible
+
+    @property
+    def visible(self):
+        return self._visible
+
+    @visible.setter
+    def visible(self, value):
+        """Show or hide the HUD, starting over when shown"""
+        self._visible = value
+        self._frame_times.reset()
+        self._last_frame = None
+        self._last_update = None
+        self._transitions = None
+        self._worst_transition = 0.0
+
+    def toggle(self):
+        """Show the HUD if hidden, hide it otherwise"""
+        self.visible = not self._visible
+
+    def _counters(self):
+        client = self._client
+        return (
+            client.packets_in, client.bytes_in,
+            client.packets_out, client.bytes_out
+        )
+
+    def draw(self):
+        """Record frame time and draw the HUD"""
+        if not self._visible:
+            return
+
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            frame_time = now - self._last_frame
+            self._frame_times.record(int(frame_time * 1e6))
+            if self._machine is not None \
+                    and self._machine.transitions != self._transitions:
+                self._worst_transition = max(
+                    self._worst_transition, frame_time
+                )
+        self._last_frame = now
+        if self._machine is not None:
+            self._transitions = self._machine.transitions
+
+        if self._last_update is None:
+            self._last_update = now
+            self._last_counters = self._counters()
+        elif now - self._last_update >= self.UPDATE_INTERVAL:
+            self._update_text(now)
+
+        self._batch.draw()
+
+    def _update_text(self, now):
+        """Lay out text with stats since the last update"""
+        elapsed = now - self._last_update
+        counters = self._counters()
+        pkt_in, bytes_in, pkt_out, bytes_out = (
+            (new - old) / elapsed
+            for new, old in zip(counters, self._last_counters)
+        )
+        self._last_update = now
+        self._last_counters = counters
+
+        frames = self._frame_times
+        client = self._client
+        age = client.snapshot_age
+        rtt = client.rtt
+
+        self._label.text = '\n'.join((
+            'fps {:.0f}  frame p50 {:.1f} p99 {:.1f} ms'.format(
+                frames.count / elapsed,
+                frames.percentile(50) / 1000,
+                frames.percentile(99) / 1000
+            ),
+            'snapshot age {} ms  rtt {} ms'.format(
+                '-' if age is None else int(age * 1000),
+                '-' if rtt is None else int(rtt)
+            ),
+            'in {:.0f} pkt/s {:.1f} kB/s  out {:.0f} pkt/s {:.1f} kB/s'.format(
+                pkt_in, bytes_in / 1024, pkt_out, bytes_out / 1024
+            ),
+            'dropped {}  stale {}'.format(
+                client.dropped_snapshots, client.stale_snapshots
+            ),
+            'worst state transition {:.1f} ms'.format(
+                self._worst_transition * 1000
+            ),
+        ))
+        frames.reset()
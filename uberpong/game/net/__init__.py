@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
 
+# Only the protocol is brought in here, clients and the scene are
+# imported from their own modules (they need pyglet and pymunk)
 from .packet import Packet, Request, Response
-from .player import PlayerClient
-from .scene import Scene
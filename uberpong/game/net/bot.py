@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+"""
+game.net.bot
+~~~~~~~~
+Headless players driven by an input script
+
+An input script is a comma separated list of steps, each one being
+an action and the seconds it lasts, taken over and over while
+playing. Actions are:
+
+    up        move the paddle up
+    down      move the paddle down
+    idle      do nothing
+    follow    move the paddle towards the ball
+
+e.g. 'follow:3,idle:0.5' follows the ball for three seconds and
+then stays put for half a second. A step with no time lasts one
+second.
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import time
+
+from uberpong.engine.profiler import Histogram
+
+from .client import GameClient
+from .scene import Scene
+from . import Request
+
+ACTIONS = ('up', 'down', 'idle', 'follow')
+
+
+def parse_script(script):
+    """Parse an input script
+
+    Args:
+        script(str): input script
+    Returns:
+        A list of (action, seconds) steps
+    Raises:
+        ValueError: the script is not valid
+    """
+    steps = []
+    for step in script.split(','):
+        action, _, seconds = step.strip().partition(':')
+        if action not in ACTIONS:
+            raise ValueError('unknown action: {!r}'.format(action))
+        seconds = float(seconds) if seconds else 1.0
+        if seconds <= 0:
+            raise ValueError('steps must last some time: {!r}'.format(step))
+        steps.append((action, seconds))
+    if not steps:
+        raise ValueError('empty script')
+    return steps
+
+
+class BotClient(GameClient):
+    """
+    A bot player
+
+    It connects, gets ready and plays following an input script,
+    keeping track of how its connection goes along the way:
+
+        connect_time       seconds taken to get connected (or None)
+        inter_arrival      time between snapshots (microseconds)
+        latency            time from sending a command to getting a
+                           snapshot with its timestamp echoed back
+                           (microseconds)
+    """
+
+    # Seconds between connection attempts
+    CONNECT_INTERVAL = 1.0
+
+    # Distance to the ball within which a following paddle stays put
+    FOLLOW_DEAD_ZONE = 8
+
+    def __init__(self, *, script, cmdrate=30, clock=time.perf_counter,
+                 **kwargs):
+        """Constructor
+
+        Kwargs:
+            script(list): input script steps (see parse_script)
+            cmdrate(int): commands per second
+            clock(callable): current time in seconds, commands are
+                sent, stamped and measured on it alike
+            kwargs(dict, optional): see GameClient
+        """
+        super().__init__(clock=clock, **kwargs)
+        self._script = script
+        self._script_length = sum(seconds for _, seconds in script)
+        self._cmd_interval = 1.0 / cmdrate
+
+        # When to send the next command (or connection attempt)
+        self._next_command = 0.0
+
+        # When the first connection attempt was made
+        self._connect_start = None
+        self.connect_time = None
+
+        # Metrics
+        self.inter_arrival = Histogram()
+        self.latency = Histogram()
+        self._last_arrival = None
+        self._last_echo = None
+
+        # When playing started
+        self._play_start = None
+
+    def _action(self, now):
+        """Action the script says for the time being"""
+        elapsed = (now - self._play_start) % self._script_length
+        for action, seconds in self._script:
+            if elapsed < seconds:
+                return action
+            elapsed -= seconds
+        return self._script[-1][0]
+
+    def update(self):
+        """Send whatever commands are due
+
+        Returns:
+            Time at which this should be called next
+        """
+        now = self._clock()
+        if now < self._next_command:
+            return self._next_command
+
+        if not self._me_connected:
+            if self._connect_start is None:
+                self._connect_start = now
+            self.connect()
+            self._next_command = now + self.CONNECT_INTERVAL
+            return self._next_command
+
+        self._next_command = now + self._cmd_interval
+        state = self._server_state
+        if state == Scene.ST_BEGIN:
+            self._play_start = None
+            self.send_command(Request.CMD_READY)
+
+        elif state == Scene.ST_PLAYING:
+            if self._play_start is None:
+                self._play_start = now
+
+            action = self._action(now)
+            if action == 'follow':
+                if self._ball_y > self._paddle_me_y + self.FOLLOW_DEAD_ZONE:
+                    action = 'up'
+                elif self._ball_y < self._paddle_me_y - self.FOLLOW_DEAD_ZONE:
+                    action = 'down'
+
+            if action == 'up':
+                self.send_command(Request.CMD_MV_UP)
+            elif action == 'down':
+                self.send_command(Request.CMD_MV_DN)
+
+        return self._next_command
+
+    def on_snapshot(self, response):
+        """Keep track of connection metrics"""
+        now = self._clock()
+
+        if self._me_connected and self.connect_time is None \
+                and self._connect_start is not None:
+            self.connect_time = now - self._connect_start
+
+        if response.sequence is None:
+            return
+
+        if self._last_arrival is not None:
+            self.inter_arrival.record(int((now - self._last_arrival) * 1e6))
+        self._last_arrival = now
+
+        # every command is stamped, and the server echoes back the
+        # latest one it has seen
+        echo = response.timestamp
+        if echo is not None and echo != self._last_echo:
+            self._last_echo = echo
+            self.latency.record(
+                max(int((now * 1000 - echo) * 1000), 0)
+            )
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+
+"""
+game.net.client
+~~~~~~~~
+Headless game client
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import time
+
+import uberpong.ming as ming
+
+from . import (
+    Request,
+    Response
+)
+
+
+class GameClient(ming.Client):
+    """
+    Game client core
+
+    This speaks the whole game protocol with a server and keeps the
+    latest known state of the game out of its snapshots, with no
+    rendering nor input handling whatsoever, so it can be driven by
+    a player (see PlayerClient) as well as by a bot.
+    """
+
+    def __init__(self, *, clock=time.perf_counter, **kwargs):
+        """Constructor
+
+        Kwargs:
+            clock(callable, optional): current time in seconds, which
+                requests are stamped and round trips measured on
+            kwargs(dict, optional): see ming.Client
+        """
+
+        # Call the parent
+        super().__init__(**kwargs)
+
+        self._clock = clock
+
+        # This will hold the player id assigned by a server
+        # and used on further requests
+        self._id = None
+
+        # paddles initial position
+        self._paddle_me_x = 0
+        self._paddle_me_y = 0
+        self._paddle_foe_x = 0
+        self._paddle_foe_y = 0
+
+        # ball position
+        self._ball_x = 0
+        self._ball_y = 0
+
+        # paddles initial velocity
+        self._paddle_me_vx = 0
+        self._paddle_me_vy = 0
+        self._paddle_foe_vx = 0
+        self._paddle_foe_vy = 0
+
+        # ball velocity
+        self._ball_vx = 0
+        self._ball_vy = 0
+
+        # Extra entities (party mode) as a flat list,
+        # see Response.set_entities_info
+        self._entities = []
+
+        # Whether the client has succesfully connected to a server
+        self._me_connected = False
+
+        # Whether a foe player is present in the game
+        self._foe_connected = False
+
+        # Initial state on server
+        self._server_state = None
+
+        # Snapshot bookkeeping
+        self._snapshot_seq = None
+        self._snapshot_time = None
+        self.dropped_snapshots = 0
+        self.stale_snapshots = 0
+
+        # Smoothed round trip time (in milliseconds), sampled once
+        # for each timestamp echoed back by the server
+        self._rtt = None
+        self._echoed_timestamp = None
+
+        # players numbers and scores
+        self._number_me = None
+        self._number_foe = None
+        self._score_me = 0
+        self._score_foe = 0
+
+    @property
+    def connected(self):
+        return self._me_connected
+
+    @property
+    def server_state(self):
+        """Get current state in server"""
+        return self._server_state
+
+    @property
+    def rtt(self):
+        """Smoothed round trip time in milliseconds (None if unknown)"""
+        return self._rtt
+
+    @property
+    def snapshot_age(self):
+        """Seconds since latest snapshot arrived (None if none yet)"""
+        if self._snapshot_time is None:
+            return None
+        return self._clock() - self._snapshot_time
+
+    @property
+    def paddle_position(self):
+        """Latest known position of this player's paddle"""
+        return self._paddle_me_x, self._paddle_me_y
+
+    @property
+    def ball_position(self):
+        """Latest known position of the ball"""
+        return self._ball_x, self._ball_y
+
+    def connect(self):
+        """Connect to server
+
+        Send a connect request to start handshaking with the server
+        """
+        self._reset_snapshots()
+        self.send_command(Request.CMD_CONNECT)
+
+    def disconnect(self):
+        """Disconnect from server
+
+        Send a connect request to start handshaking with the server
+        """
+        self.send_command(Request.CMD_DISCONNECT)
+        self._reset_snapshots()
+
+    def send(self, request):
+        """Send a regular request to server
+
+        Args:
+            request(Request): A regular request object
+        """
+
+        # Set player id upon request
+        if self._me_connected:
+            request.player_id = self._id
+
+        # Stamp it, the server echoes this back on updates
+        request.timestamp = int(self._clock() * 1000)
+
+        # Send request to server
+        super().send(request.data)
+
+    def send_command(self, command):
+        """Send a command to server on a pooled request
+
+        Args:
+            command(str): one of Request.CMD_*
+        """
+        request = Request.acquire()
+        request.command = command
+        self.send(request)
+        request.release()
+
+    def _accept_update(self):
+        """Whether to take in the snapshot just arrived
+
+        Snapshots are tracked either way, this is for subclasses
+        to take in fewer of them.
+        """
+        return True
+
+    def on_snapshot(self, response):
+        """Called after a snapshot has been taken in
+
+        Args:
+            response(Response): the snapshot, only valid within this call
+        """
+        pass
+
+    def on_data_received(self, data, host, port):
+        """Response pump for this client"""
+
+        # Get raw data and get a proper Response from it
+        response = Response.acquire()
+        try:
+            response.data = data
+        except ValueError:
+            # not a response at all
+            response.release()
+            return
+
+        # Every snapshot is accounted for, but those arriving
+        # after a newer one are left out
+        if response.status == Response.STATUS_OK \
+                and not self._track_snapshot(response):
+            response.release()
+            return
+
+        if not self._accept_update():
+            response.release()
+            return
+
+        ########################################
+        # The actual pump
+        ########################################
+
+        #
+        # Request has been denied
+        #
+        if response.status == Response.STATUS_UNAUTHORIZED:
+            if response.reason == Response.REASON_CONN_REFUSED:
+                response.release()
+
+                #
+                # Connection has been refused from the server
+                #
+                raise ConnectionRefusedError(
+                    "Connection to {}:{} refused!".format(
+                        self._server_addr,
+                        self._server_port
+                    )
+                )
+
+        #
+        # A request has been accepted by the server
+        #
+        if response.status == Response.STATUS_OK:
+            if response.reason == Response.REASON_CONN_GRANTED:
+                # This player knows he has connected succesfully
+                # to the server
+
+                # Assume player id
+                self._id = response.player_id
+
+                # Snapshots on a new session are numbered anew
+                # (e.g. by a server which has been restarted)
+                self._reset_snapshots()
+
+                # Let it be known that this player has hereby connected
+                # to a server
+                self._me_connected = True
+
+            # Set state found on server
+            self._server_state = response.state
+
+            # if 'players' in response.data:
+            me = response.get_player_info(name='you')
+            if me is not None:
+                #
+                # Update data used to update the paddle sprite
+                #
+
+                # position
+                self._paddle_me_x, self._paddle_me_y = me['position']
+
+                # velocity
+                self._paddle_me_vx, self._paddle_me_vy = me['velocity']
+
+                # score
+                self._score_me = me['score']
+
+                # number
+                self._number_me = me['number']
+
+            #
+            # Set all information regarding the opponent (foe)
+            #
+            foe = response.get_player_info(name='foe')
+            if foe is not None:
+
+                # Let it be known hereby that the opponent has entered
+                # the arena!
+                self._foe_connected = True
+
+                # position
+                self._paddle_foe_x, self._paddle_foe_y = foe['position']
+
+                # velocity
+                self._paddle_foe_vx, self._paddle_foe_vy = foe['velocity']
+
+                # score
+                self._score_foe = foe['score']
+
+                # number
+                self._number_foe = foe['number']
+
+            else:
+                # Oh!, foe is not present in the game
+                self._foe_connected = False
+
+            #
+            # The actual ball information
+            #
+            ball = response.get_ball_info()
+            if ball is not None:
+
+                # position and current velocity of the ball
+                self._ball_x, self._ball_y = ball['position']
+                self._ball_vx, self._ball_vy = ball['velocity']
+
+            #
+            # Extra balls and obstacles
+            #
+            entities = response.get_entities_info()
+            if entities is not None:
+                self._entities = entities
+            else:
+                self._entities = []
+
+            self.on_snapshot(response)
+
+        response.release()
+
+    def _reset_snapshots(self):
+        """Start over tracking snapshots, as on a new session"""
+        self._snapshot_seq = None
+        self._echoed_timestamp = None
+
+    def _track_snapshot(self, response):
+        """Keep track of snapshots and round trip times
+
+        Args:
+            response(Response): incoming response
+        Returns:
+            False if this is a stale snapshot, True otherwise
+        """
+        seq = response.sequence
+        if seq is None:
+            return True
+
+        last = self._snapshot_seq
+        if last is not None:
+            if seq <= last:
+                self.stale_snapshots += 1
+                return False
+            self.dropped_snapshots += seq - last - 1
+        self._snapshot_seq = seq
+
+        now = self._clock()
+        self._snapshot_time = now
+
+        # Round trip time, smoothed out as TCP does. The server echoes
+        # the latest timestamp on every snapshot until a newer one
+        # arrives, so only the first snapshot echoing a timestamp is
+        # taken, minus the time it's been held on the server
+        timestamp = response.timestamp
+        if timestamp is not None and timestamp != self._echoed_timestamp:
+            self._echoed_timestamp = timestamp
+            rtt = now * 1000 - timestamp - (response.hold_time or 0)
+            if self._rtt is None:
+                self._rtt = rtt
+            else:
+                self._rtt += (rtt - self._rtt) / 8
+
+        return True
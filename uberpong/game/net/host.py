@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+game.net.host
+~~~~~~~~
+Scenes with no hosting player
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import pyglet
+
+from uberpong.engine.cvar import cvar_get
+
+from .scene import Scene
+
+
+class SceneHost:
+    """
+    Run a Scene on its own
+
+    On the game, the states of the hosting player take care of
+    resetting the board as a match goes (see BeginState and
+    RoundState) and of getting the scene back to begin state after
+    a game set (see GameSetState). This does the very same, so a
+    scene can be played by remote players (or bots) only.
+    """
+
+    # Seconds a game set is shown before a new match begins
+    GAME_SET_DELAY = 3
+
+    def __init__(self, scene, *, clock=None, restart=True):
+        """Constructor
+
+        Args:
+            scene(Scene): scene to host
+        Kwargs:
+            clock(optional): clock the scene is scheduled on
+            restart(bool): begin a new match after each game set
+        """
+        if clock is None:
+            clock = pyglet.clock
+        self._clock = clock
+        self._scene = scene
+        self._restart = restart
+        self._state = scene.state
+
+        # Matches played to the end so far
+        self.matches = 0
+
+        self._clock.schedule_interval(
+            self.update, 1.0 / cvar_get('tickrate')
+        )
+
+    @property
+    def scene(self):
+        return self._scene
+
+    def update(self, dt=None):
+        """Follow state changes on the scene"""
+        scene = self._scene
+        state = scene.state
+        if state == self._state:
+            return
+
+        if state == Scene.ST_BEGIN \
+                or self._state == Scene.ST_SCORE \
+                and state == Scene.ST_PLAYING:
+            scene.reset_players()
+            scene.reset_ball()
+
+        elif state == Scene.ST_GAME_SET:
+            self.matches += 1
+            if self._restart:
+                self._clock.schedule_once(
+                    self._begin_again, self.GAME_SET_DELAY
+                )
+
+        self._state = state
+
+    def _begin_again(self, dt):
+        if self._scene.state == Scene.ST_GAME_SET:
+            self._scene.restart()
+
+    def close(self):
+        """Stop hosting and close the scene"""
+        self._clock.unschedule(self.update)
+        self._clock.unschedule(self._begin_again)
+        self._scene.close()
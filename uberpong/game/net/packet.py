@@ -72,7 +72,7 @@ a client must first handshake with a server, like so:
             1, # Protocol version
             33, # Type of message
             20, # Status
-            '25aee061a5f34977bf672d4ff59fdc36' # Player UUID
+            65537 # Player id
         ]
 
 Once the server has acknowledged a client, the latter receives a valid
@@ -85,7 +85,8 @@ update responses:
             1,
             30,
             '+move',
-            '25aee061a5f34977bf672d4ff59fdc36'
+            65537,
+            912345 # client timestamp (ms)
         ]
 
     <~~ (server)
@@ -100,13 +101,42 @@ update responses:
                 [1, 1, 0, 14, -20], # player info
                 [1, 24, 0, 23, 40]  # foe player info (could be null)
             ],
-            [12, 4, 223, 140] # ball info
+            [12, 4, 223, 140], # ball info
+            [40, 300, 200, -80, 12, 60, 500, 100, 0, 0], # entities info
+            4312, # snapshot sequence number
+            912345, # latest client timestamp seen by the server
+            12 # time (ms) the server has held that timestamp
         ]
+
+The entities info carries a variable number of extra entities (e.g. in
+party mode), each one taking five consecutive items on a flat list:
+its type (collision type), position and velocity.
+
+Snapshots are numbered, so clients can tell dropped and stale ones,
+and carry back the latest timestamp sent by the client, so it can
+measure round trip times on its own clock, along with how long that
+timestamp has been held on the server (clients only send requests
+every now and then, while snapshots keep coming), which is left out
+of round trip times.
+
+Packets always take the same number of items for a given type of
+message, with unset items put on the wire as nulls.
 """
 
+from itertools import repeat
+
 
 class Packet:
-    """Basic network packet implementation"""
+    """Basic network packet implementation
+
+    A packet is a view over a fixed-size buffer holding the actual data
+    to be put on the wire, so all of its fields are read and written
+    in place. Packets can be acquired from and released back to a pool
+    of their own type, so their buffers get reused instead of built
+    over and over.
+    """
+
+    __slots__ = ('_data',)
 
     ############################################
     # Protocol version
@@ -120,6 +150,7 @@ class Packet:
     PI_TOM = 1  # type of message
     PI_STATUS = 2  # status
     PI_COMMAND = 2  # command
+    PI_PLAYER_ID = None  # varies among types of message
 
     ############################################
     # Types of message
@@ -129,44 +160,77 @@ class Packet:
     TOM_CONNECT = 32
     TOM_REPLY = 33
 
-    def __init__(self, *,
-                 data=None,
-                 pi_playerid=None):
-        """Constructor
+    # Number of items on the buffer
+    SIZE = 2
 
-        Args:
-            data(dict): Initial data for this packet
-        """
+    # Type of message set on blank packets
+    TOM = None
+
+    # Maximum number of released packets kept on a pool
+    POOL_SIZE = 64
 
-        # In order for the data to conserve its
-        # random access, an initial None-filled
-        # array is assigned as the initial data
-        if data is None:
-            data = [None for i in range(10)]
-        self._data = data
+    # Contents of a blank packet
+    _blank = [PROTO_VERSION, TOM]
+    _pool = []
+
+    def __init__(self, *, data=None):
+        """Constructor
 
-        # Set protocol version
-        self._data[self.PI_VERSION] = self.PROTO_VERSION
+        Kwargs:
+            data(list, optional): Initial data for this packet
+        """
+        self._data = self._blank.copy()
+        if data is not None:
+            self.data = data
+
+    @classmethod
+    def acquire(cls):
+        """Get a blank packet, reusing a released one if possible"""
+        pool = cls._pool
+        if pool:
+            return pool.pop()
+        return cls()
+
+    def release(self):
+        """Blank this packet and give it back to its pool
+
+        Neither the packet nor its data are to be used afterwards.
+        """
+        self.clear()
+        pool = self._pool
+        if len(pool) < self.POOL_SIZE:
+            pool.append(self)
 
-        # Protocol index for player id varies among
-        # types of message
-        self._pi_player_id = pi_playerid
+    def clear(self):
+        """Blank all fields on this packet"""
+        self._data[:] = self._blank
 
     @property
     def data(self):
-        """Raw data"""
+        """Raw data
 
-        # Return a None-stripped copy of data
-        d = self._data.copy()
-        if len(d):
-            while d[-1] is None:
-                d.pop()
-        return d
+        This is the packet buffer itself, not a copy of it.
+        """
+        return self._data
 
     @data.setter
     def data(self, value):
-        """Set raw data"""
-        self._data = value
+        """Set raw data
+
+        Items are copied onto the packet buffer, and fields
+        missing at the end are left blank.
+
+        Raises:
+            ValueError: value is not a list of SIZE items at most
+                (e.g. a malformed datagram)
+        """
+        if type(value) is not list or len(value) > self.SIZE:
+            raise ValueError('malformed packet')
+        data = self._data
+        size = len(value)
+        data[:size] = value
+        if size < self.SIZE:
+            data[size:] = self._blank[size:]
 
     @property
     def tom(self):
@@ -184,20 +248,20 @@ class Packet:
 
     @property
     def player_id(self):
-        """Get player uuid"""
-        if self._pi_player_id in range(len(self._data)):
-            return self._data[self._pi_player_id]
-        return None
+        """Get player id"""
+        return self._data[self.PI_PLAYER_ID]
 
     @player_id.setter
     def player_id(self, player_id):
-        """Set player uuid"""
-        self._data[self._pi_player_id] = player_id
+        """Set player id"""
+        self._data[self.PI_PLAYER_ID] = player_id
 
 
 class Request(Packet):
     """Request packet implementation"""
 
+    __slots__ = ()
+
     ############################################
     # Commands included in the request protocol
     ############################################
@@ -211,33 +275,72 @@ class Request(Packet):
     # Protocol indexes
     ############################################
     PI_PLAYER_ID = 3
+    PI_TIMESTAMP = 4
 
-    def __init__(self, *, command=None, **kwargs):
-        super().__init__(pi_playerid=self.PI_PLAYER_ID, **kwargs)
+    SIZE = 5
+    TOM = Packet.TOM_COMMAND
+
+    _blank = [Packet.PROTO_VERSION, TOM, None, None, None]
+    _pool = []
+
+    # Rate limiting class of each command (see Scene.classify)
+    RATE_CLASSES = {
+        CMD_CONNECT: 'connect',
+        CMD_MV_UP: 'move',
+        CMD_MV_DN: 'move',
+    }
+    RATE_CLASS_OTHER = 'other'
 
-        # Type of message
-        self.tom = Packet.TOM_COMMAND
+    def __init__(self, *, command=None, **kwargs):
+        super().__init__(**kwargs)
 
         # Set command
         if command is not None:
             self.command = command
 
+    @classmethod
+    def rate_class(cls, data):
+        """Rate limiting class of a request out of its decoded data
+
+        Only the command field is looked at, anything not being
+        a known command (or not a request at all) falls on the
+        RATE_CLASS_OTHER class.
+
+        Args:
+            data(dict|list): decoded request
+        """
+        if type(data) is list and len(data) > Packet.PI_COMMAND:
+            command = data[Packet.PI_COMMAND]
+            if type(command) is str:
+                return cls.RATE_CLASSES.get(command, cls.RATE_CLASS_OTHER)
+        return cls.RATE_CLASS_OTHER
+
     @property
     def command(self):
         """Get command"""
-        if Packet.PI_COMMAND in range(len(self.data)):
-            return self._data[Packet.PI_COMMAND]
-        return None
+        return self._data[Packet.PI_COMMAND]
 
     @command.setter
     def command(self, value):
         """Set command"""
         self._data[Packet.PI_COMMAND] = value
 
+    @property
+    def timestamp(self):
+        """Get client timestamp"""
+        return self._data[self.PI_TIMESTAMP]
+
+    @timestamp.setter
+    def timestamp(self, value):
+        """Set client timestamp"""
+        self._data[self.PI_TIMESTAMP] = value
+
 
 class Response(Packet):
     """Response packet implementation"""
 
+    __slots__ = ('_player_info', '_rows', '_ball_info', '_entities')
+
     ############################################
     # Status codes
     ############################################
@@ -261,19 +364,40 @@ class Response(Packet):
     PI_REASON = 3
     PI_PLAYER_INFO = 5
     PI_BALL_INFO = 6
+    PI_ENTITIES_INFO = 7
+    PI_SEQUENCE = 8
+    PI_TIMESTAMP = 9
+    PI_HOLD_TIME = 10
+
+    # Number of items each entity takes on the entities info
+    ENTITY_STRIDE = 5
+
+    SIZE = 11
+    TOM = Packet.TOM_UPDATE
+
+    _blank = [Packet.PROTO_VERSION, TOM] + [None] * 9
+    _pool = []
 
     def __init__(self, **kwargs):
-        super().__init__(pi_playerid=self.PI_PLAYER_ID, **kwargs)
+        super().__init__(**kwargs)
+
+        # Nested lists are set in place on the buffer
+        # whenever their fields are set
+        self._player_info = [None, None]
+        self._rows = ([None] * 6, [None] * 6)
+        self._ball_info = [None] * 4
+        self._entities = []
 
-        # not necessarily
-        self.tom = Packet.TOM_UPDATE
+    def clear(self):
+        """Blank all fields on this packet"""
+        self._data[:] = self._blank
+        self._player_info[0] = self._player_info[1] = None
+        del self._entities[:]
 
     @property
     def status(self):
         """Get status"""
-        if Packet.PI_STATUS in range(len(self._data)):
-            return self._data[Packet.PI_STATUS]
-        return None
+        return self._data[Packet.PI_STATUS]
 
     @status.setter
     def status(self, value):
@@ -283,9 +407,7 @@ class Response(Packet):
     @property
     def state(self):
         """Get state"""
-        if self.PI_STATE in range(len(self._data)):
-            return self._data[self.PI_STATE]
-        return None
+        return self._data[self.PI_STATE]
 
     @state.setter
     def state(self, value):
@@ -295,15 +417,43 @@ class Response(Packet):
     @property
     def reason(self):
         """Set reason"""
-        if self.PI_REASON in range(len(self._data)):
-            return self._data[self.PI_REASON]
-        return None
+        return self._data[self.PI_REASON]
 
     @reason.setter
     def reason(self, value):
         """Get reason"""
         self._data[self.PI_REASON] = value
 
+    @property
+    def sequence(self):
+        """Get snapshot sequence number"""
+        return self._data[self.PI_SEQUENCE]
+
+    @sequence.setter
+    def sequence(self, value):
+        """Set snapshot sequence number"""
+        self._data[self.PI_SEQUENCE] = value
+
+    @property
+    def timestamp(self):
+        """Get echoed client timestamp"""
+        return self._data[self.PI_TIMESTAMP]
+
+    @timestamp.setter
+    def timestamp(self, value):
+        """Set echoed client timestamp"""
+        self._data[self.PI_TIMESTAMP] = value
+
+    @property
+    def hold_time(self):
+        """Get time (ms) the echoed timestamp has been held on server"""
+        return self._data[self.PI_HOLD_TIME]
+
+    @hold_time.setter
+    def hold_time(self, value):
+        """Set time (ms) the echoed timestamp has been held on server"""
+        self._data[self.PI_HOLD_TIME] = value
+
     def set_player_info(self, *, name, number, score, position, velocity):
         """Set player information
 
@@ -315,9 +465,6 @@ class Response(Packet):
             velocity(int, int): Player's paddle current velocity
         """
 
-        if self._data[self.PI_PLAYER_INFO] is None:
-            self._data[self.PI_PLAYER_INFO] = [None, None]
-
         if name == 'you':
             player_index = 0
         else:
@@ -325,14 +472,18 @@ class Response(Packet):
 
         # In this part, player information is set linearly
         # in the array
-        self._data[self.PI_PLAYER_INFO][player_index] = [number, score]
-        self._data[self.PI_PLAYER_INFO][player_index].extend(list(position))
-        self._data[self.PI_PLAYER_INFO][player_index].extend(list(velocity))
+        row = self._rows[player_index]
+        row[0] = number
+        row[1] = score
+        row[2], row[3] = position
+        row[4], row[5] = velocity
+
+        self._player_info[player_index] = row
+        self._data[self.PI_PLAYER_INFO] = self._player_info
 
     def get_ball_info(self):
-        try:
-            ball_info = self._data[self.PI_BALL_INFO]
-        except IndexError:
+        ball_info = self._data[self.PI_BALL_INFO]
+        if ball_info is None:
             return None
 
         return {
@@ -341,18 +492,64 @@ class Response(Packet):
         }
 
     def set_ball_info(self, *, position, velocity):
-        self._data[self.PI_BALL_INFO] = list(position)
-        self._data[self.PI_BALL_INFO].extend(list(velocity))
+        ball_info = self._ball_info
+        ball_info[0], ball_info[1] = position
+        ball_info[2], ball_info[3] = velocity
+        self._data[self.PI_BALL_INFO] = ball_info
+
+    def set_entities_info(self, entities):
+        """Set information regarding a variable number of entities
+
+        Args:
+            entities(list): flat list holding ENTITY_STRIDE items
+                (type, x, y, vx, vy) per entity
+        """
+        self._data[self.PI_ENTITIES_INFO] = entities
+
+    def add_entities_state(self, ctype, state):
+        """Append a whole class of entities to the entities info
+
+        Records are written column by column out of an EntityState,
+        so there is no per-entity work done in here.
+
+        Args:
+            ctype(int): entity type shared by all entities on state
+            state(EntityState): bulk state of the entities
+        """
+        count = state.count
+        if not count:
+            return
+
+        records = self._data[self.PI_ENTITIES_INFO]
+        if records is None:
+            records = self._data[self.PI_ENTITIES_INFO] = self._entities
+
+        stride = self.ENTITY_STRIDE
+        base = len(records)
+        records.extend(repeat(ctype, stride * count))
+        end = base + stride * count
+        records[base + 1:end:stride] = map(int, state.positions[0::2])
+        records[base + 2:end:stride] = map(int, state.positions[1::2])
+        records[base + 3:end:stride] = map(int, state.velocities[0::2])
+        records[base + 4:end:stride] = map(int, state.velocities[1::2])
+
+    def get_entities_info(self):
+        """Get the flat list of entities info, if any"""
+        return self._data[self.PI_ENTITIES_INFO]
 
     def get_player_info(self, *, name):
         """Get information regarding a specific player"""
 
-        try:
-            if name == 'you':
-                player_info = self._data[self.PI_PLAYER_INFO][0]
-            else:
-                player_info = self._data[self.PI_PLAYER_INFO][1]
-        except IndexError:
+        player_info = self._data[self.PI_PLAYER_INFO]
+        if player_info is None:
+            return None
+
+        if name == 'you':
+            player_info = player_info[0]
+        else:
+            player_info = player_info[1]
+
+        if player_info is None:
             return None
 
         return {
@@ -12,21 +12,28 @@ See LICENSE for more details.
 import time
 import pyglet
 
-import uberpong.ming as ming
 from uberpong.engine.spot import spot_get
+from uberpong.engine.cvar import cvar_get
 
 from .scene import Scene
+from .client import GameClient
 from . import (
     Request,
     Response
 )
+from ..entities import Board, Obstacle
+from ..predict import BallPredictor
 from .. import utils
 from .. import colors
 
 
-class PlayerClient(ming.Client):
+class PlayerClient(GameClient):
     """
     Player client implementation
+
+    On top of the client core, this renders the game state out of
+    snapshots, predicting it in between, and turns player input
+    into commands.
     """
 
     def __init__(self, *, window, ball_position, **kwargs):
@@ -40,82 +47,28 @@ class PlayerClient(ming.Client):
         # Call the parent
         super().__init__(**kwargs)
 
-        # This will hold the UUID assigned by a server
-        # and used on further requests
-        self._id = None
-
         # get the sorcerer to use resources
         self._sorcerer = spot_get('game_object').sorcerer
 
-        # sprite sheet is allocated at this point
-        self._img = self._sorcerer.create_image(
-            'sprite_sheet',
-            file_name='sprites.png'
-        )
-
-        # paddle image region
-        paddle_width, paddle_height = spot_get('paddle_size')
-        self._paddle_region = self._img.get_region(
-            0, 0, paddle_width, paddle_height
-        )
-
-        # centered anchor as required by pymunk bodies at the server side
-        self._paddle_region.anchor_x = self._paddle_region.width // 2
-        self._paddle_region.anchor_y = self._paddle_region.height // 2
-
-        # board image region
-        self._board_region = self._img.get_region(0, 256, 800, 600)
-        self._board_region.anchor_x = 0
-        self._board_region.anchor_y = 0
-
-        # board sprite
-        self._board_sprite = pyglet.sprite.Sprite(self._board_region)
-        self._board_sprite.set_position(0, 0)
-
-        # ball image region
-        ball_width, ball_height = spot_get('ball_size')
-        self._ball_region = self._img.get_region(
-            32, 0, ball_width, ball_height
-        )
-
-        # centered anchor as required by pymunk bodies at the server side
-        self._ball_region.anchor_x = self._ball_region.width // 2
-        self._ball_region.anchor_y = self._ball_region.height // 2
-
-        # sprites
-        self._paddle_me_sprite = pyglet.sprite.Sprite(self._paddle_region)
-        self._paddle_foe_sprite = pyglet.sprite.Sprite(self._paddle_region)
-        self._ball_sprite = pyglet.sprite.Sprite(self._ball_region)
-
-        # Sprites are invisible at first
-        self._paddle_me_sprite.visible = False
-        self._paddle_foe_sprite.visible = False
-        self._ball_sprite.visible = False
-
-        # paddles initial position
-        self._paddle_me_x = 0
-        self._paddle_me_y = 0
-        self._paddle_foe_x = 0
-        self._paddle_foe_y = 0
+        # Sprites and labels are built on first draw, since
+        # assets might be still loading at this point
+        self._batch = None
 
         # ball position
         self._ball_x, self._ball_y = ball_position
 
-        # paddles initial velocity
-        self._paddle_me_vx = 0
-        self._paddle_me_vy = 0
-        self._paddle_foe_vx = 0
-        self._paddle_foe_vy = 0
-
-        # ball velocity
-        self._ball_vx = 0
-        self._ball_vy = 0
-
-        # Whether the client has succesfully connected to a server
-        self._me_connected = False
+        # Ball path in between snapshots, bouncing
+        # off walls and paddles on the very same board
+        self._ball_predictor = BallPredictor(
+            Board.extents(window.width, window.height),
+            ball_size=spot_get('ball_size'),
+            paddle_size=spot_get('paddle_size')
+        )
 
-        # Whether a foe player is present in the game
-        self._foe_connected = False
+        # Sprites for extra entities, these are reused across updates
+        # and hidden while not needed
+        self._entity_sprites = []
+        self._entity_sprites_shown = 0
 
         # Whether the client is currently pressing up or down keys
         self._key_move_up = False
@@ -127,7 +80,7 @@ class PlayerClient(ming.Client):
 
         # Command rate
         # How much command is this client going to send per second?
-        self._cmdrate = 1.0 / spot_get('cl_cmdrate')
+        self._cmdrate = 1.0 / cvar_get('cl_cmdrate')
         pyglet.clock.schedule_interval(self.send_commands, self._cmdrate)
 
         ###################################
@@ -137,91 +90,139 @@ class PlayerClient(ming.Client):
         # if True, this client will ignore any incoming data
         self._update_lock = False
         # Updates frequence
-        self._update_rate = 1.0 / spot_get('cl_updaterate')
+        self._update_rate = 1.0 / cvar_get('cl_updaterate')
         pyglet.clock.schedule_interval(
             self.update_from_server,
             self._update_rate
         )
 
-        # Initial state on server
-        self._server_state = None
-
         # Ready the player?
         self._key_ready = False
 
         # game window
         self._window = window
 
-        # scores label
-        scores_x, scores_y = spot_get('cl_scores_position')
-        self._scores_label = utils.create_label(
-            window=self._window,
-            x=scores_x, y=scores_y, font_size=48,
-        )
-        self._scores_label.set_style('color', colors.GRAY1 + (255,))
-        # scores themselves
-        self._score_me = 0
-        self._score_foe = 0
+    def _build_batch(self):
+        """Build all sprites and labels on the board batch"""
 
-    def draw_board(self):
-        """ Draw the board sprite """
-        self._board_sprite.draw()
+        # all sprites come from the atlas, their regions are
+        # centered as required by pymunk bodies at the server side
+        self._paddle_region = self._sorcerer.get_region('paddle')
+        self._board_region = self._sorcerer.get_region('board')
+        self._ball_region = self._sorcerer.get_region('ball')
+        self._obstacle_region = self._sorcerer.get_region('obstacle')
 
-    @property
-    def connected(self):
-        return self._me_connected
+        # All sprites and labels are rendered at once on a single batch,
+        # with groups drawn in the following order
+        self._batch = pyglet.graphics.Batch()
+        self._board_group = pyglet.graphics.OrderedGroup(0)
+        self._scores_group = pyglet.graphics.OrderedGroup(1)
+        self._paddles_group = pyglet.graphics.OrderedGroup(2)
+        self._balls_group = pyglet.graphics.OrderedGroup(3)
 
-    @property
-    def server_state(self):
-        """Get current state in server"""
-        return self._server_state
+        # board sprite
+        self._board_sprite = pyglet.sprite.Sprite(
+            self._board_region, batch=self._batch, group=self._board_group
+        )
+        self._board_sprite.set_position(0, 0)
 
-    def reset_input(self):
-        """ reset flags generated by keyboard input """
+        # sprites
+        self._paddle_me_sprite = pyglet.sprite.Sprite(
+            self._paddle_region, batch=self._batch, group=self._paddles_group
+        )
+        self._paddle_foe_sprite = pyglet.sprite.Sprite(
+            self._paddle_region, batch=self._batch, group=self._paddles_group
+        )
+        self._ball_sprite = pyglet.sprite.Sprite(
+            self._ball_region, batch=self._batch, group=self._balls_group
+        )
 
-        self._key_move_down = False
-        self._key_move_up = False
+        # Sprites are invisible at first
+        self._paddle_me_sprite.visible = False
+        self._paddle_foe_sprite.visible = False
+        self._ball_sprite.visible = False
+
+        # scores labels, one for the normal view on top of the board
+        # and a large one for the score screen, both laid out up front
+        scores_x, scores_y = spot_get('cl_scores_position')
+        self._scores_labels = (
+            utils.create_label(
+                window=self._window,
+                x=scores_x, y=scores_y, font_size=48,
+                batch=self._batch, group=self._scores_group
+            ),
+            utils.create_label(
+                window=self._window,
+                x=scores_x, y=self._window.height // 2, font_size=100,
+                batch=self._batch, group=self._scores_group
+            ),
+        )
+        for label in self._scores_labels:
+            label.set_style('color', colors.GRAY1 + (0,))
 
-    def connect(self):
-        """Connect to server
+        # index of the label being shown (None if hidden)
+        self._scores_shown = None
 
-        Send a connect request to start handshaking with the server
-        """
-        self.send(Request(command=Request.CMD_CONNECT))
+        # scores each label was last laid out with
+        self._scores_keys = [None, None]
+
+    def draw(self, *,
+             board=True, scores=True, paddles=True, ball=True, entities=True):
+        """Render the whole board in one batched draw
 
-    def disconnect(self):
-        """Disconnect from server
+        Things not to be shown are hidden rather than left out of
+        the batch, so nothing gets rebuilt when they come back.
 
-        Send a connect request to start handshaking with the server
+        Kwargs:
+            board(bool, optional): show the board
+            scores(bool, optional): show the scores label
+            paddles(bool, optional): show paddles (once connected)
+            ball(bool, optional): show the ball (once connected)
+            entities(bool, optional): show extra balls and obstacles
         """
-        self.send(Request(command=Request.CMD_DISCONNECT))
+        if self._batch is None:
+            self._build_batch()
+
+        # Sprites are set where predicted by tick
+        self._ball_sprite.set_position(self._ball_x, self._ball_y)
+        self._paddle_me_sprite.set_position(
+            self._paddle_me_x, self._paddle_me_y
+        )
+        self._paddle_foe_sprite.set_position(
+            self._paddle_foe_x, self._paddle_foe_y
+        )
 
-    def send(self, request):
-        """Send a regular request to server
+        self._show(self._board_sprite, board)
+        self._show(self._paddle_me_sprite, paddles and self._me_connected)
+        self._show(self._paddle_foe_sprite, paddles and self._foe_connected)
+        self._show(self._ball_sprite, ball and self._me_connected)
+        self._update_entities(entities)
+        self._update_scores(scores)
+        self._batch.draw()
 
-        Args:
-            request(Request): A regular request object
-        """
+    def _show(self, sprite, visible):
+        """Show or hide a sprite, touching it only on changes"""
+        if sprite.visible != visible:
+            sprite.visible = visible
 
-        # Set player uuid upon request
-        if self._me_connected:
-            request.player_id = self._id
+    def reset_input(self):
+        """ reset flags generated by keyboard input """
 
-        # Send request to server
-        super().send(request.data)
+        self._key_move_down = False
+        self._key_move_up = False
 
     def send_commands(self, dt):
         """Send commands to the server"""
 
         if self.server_state == Scene.ST_PLAYING:
             if self._key_move_up:
-                self.send(Request(command=Request.CMD_MV_UP))
+                self.send_command(Request.CMD_MV_UP)
 
             if self._key_move_down:
-                self.send(Request(command=Request.CMD_MV_DN))
+                self.send_command(Request.CMD_MV_DN)
 
         if self.server_state == Scene.ST_BEGIN and self._key_ready:
-            self.send(Request(command=Request.CMD_READY))
+            self.send_command(Request.CMD_READY)
             self._key_ready = False
 
     def update_from_server(self, dt):
@@ -247,21 +248,20 @@ class PlayerClient(ming.Client):
 
             # predict ball position on the plane
             if self.server_state != Scene.ST_BEGIN:
-                self._ball_x += self._ball_vx * self._dt
-                self._ball_y += self._ball_vy * self._dt
+                position = self._ball_predictor.position(now)
+                if position is not None:
+                    self._ball_x, self._ball_y = position
 
-            # Set ball position
-            self._ball_sprite.set_position(self._ball_x, self._ball_y)
+            # predict extra entities positions on the plane
+            if self.server_state != Scene.ST_BEGIN:
+                ents = self._entities
+                for i in range(0, len(ents), Response.ENTITY_STRIDE):
+                    ents[i + 1] += ents[i + 3] * self._dt
+                    ents[i + 2] += ents[i + 4] * self._dt
 
             # predict paddle and ball positions on the plane
             self._paddle_me_y += self._paddle_me_vy * self._dt
 
-            # Set paddle position
-            self._paddle_me_sprite.set_position(
-                self._paddle_me_x,
-                self._paddle_me_y
-            )
-
         #
         # Do all stuff for foe player if connected
         #
@@ -269,200 +269,107 @@ class PlayerClient(ming.Client):
             # Calculate/predict foe paddle position
             self._paddle_foe_y += self._paddle_foe_vy * self._dt
 
-            # Set paddle position
-            self._paddle_foe_sprite.set_position(
-                self._paddle_foe_x,
-                self._paddle_foe_y
-            )
+    def _update_scores(self, visible):
+        """Update the scores label
 
-    def draw_scores(self):
-        """Draw scores"""
+        Labels are only laid out again when scores actually change,
+        and switching between them is just a matter of color.
+        """
+
+        # Pick the label to show
+        shown = None
+        if visible:
+            if self._server_state == Scene.ST_SCORE:
+                shown = 1
+            else:
+                shown = 0
+
+        # a hidden label is just a transparent one
+        if shown != self._scores_shown:
+            if self._scores_shown is not None:
+                self._scores_labels[self._scores_shown].color = \
+                    colors.GRAY1 + (0,)
+            if shown is not None:
+                self._scores_labels[shown].color = colors.GRAY1 + (255,)
+            self._scores_shown = shown
+        if shown is None:
+            return
 
         # the scores are shown according to players
-        base_str_format = "{}   {}"
         if self._number_me == 1:
-            scores_label_format = base_str_format.format(
-                self._score_me,
-                self._score_foe
-            )
+            key = self._score_me, self._score_foe
         else:
-            scores_label_format = base_str_format.format(
-                self._score_foe,
-                self._score_me
+            key = self._score_foe, self._score_me
+        if key != self._scores_keys[shown]:
+            self._scores_keys[shown] = key
+            self._scores_labels[shown].text = "{}   {}".format(*key)
+
+    def _update_entities(self, visible):
+        """Update sprites for extra balls and obstacles (if any)"""
+
+        ents = self._entities
+        stride = Response.ENTITY_STRIDE
+        count = len(ents) // stride if visible else 0
+
+        # Grow the sprite pool as needed
+        while len(self._entity_sprites) < count:
+            self._entity_sprites.append(
+                pyglet.sprite.Sprite(
+                    self._ball_region,
+                    batch=self._batch, group=self._balls_group
+                )
             )
 
-        # Set up size and position of scores label
-        if self._server_state == Scene.ST_SCORE:
-            font_size = 100
-            scores_y = self._window.height // 2
-        else:
-            font_size = 48
-            scores_y = spot_get('cl_scores_position')[1]
-
-        # set properties on label
-        self._scores_label.y = scores_y
-        self._scores_label.font_size = font_size
-        self._scores_label.text = scores_label_format
-
-        # draw the scores label
-        self._scores_label.draw()
-
-    def _get_rect(self, sprite):
-        sw = sprite.width // 2
-        sh = sprite.height // 2
-        return (sprite.x - sw, sprite.y - sh, sprite.x + sw, sprite.y + sh)
-
-    def _rect_intersect(self, rect0, rect1):
-        return not (
-            rect0[2] < rect1[0] or
-            rect1[2] < rect0[0] or
-            rect0[3] < rect1[1] or
-            rect1[3] < rect0[1]
-        )
-
-    def _ball_out_of_bounds(self):
-        return False
-
-    def _ball_collided(self):
-        rect_paddle_me = self._get_rect(self._paddle_me_sprite)
-        rect_paddle_foe = self._get_rect(self._paddle_foe_sprite)
-        rect_ball = self._get_rect(self._ball_sprite)
-        return self._rect_intersect(rect_ball, rect_paddle_me) \
-            or self._rect_intersect(rect_ball, rect_paddle_foe)
-
-    def draw_ball(self):
-        """Render the ball"""
+        # Hide sprites no longer needed
+        for sprite in self._entity_sprites[count:self._entity_sprites_shown]:
+            sprite.visible = False
+        self._entity_sprites_shown = count
 
-        # Draw the thing onto the screen
-        self._ball_sprite.draw()
+        for i in range(count):
+            ctype, x, y = ents[i * stride:i * stride + 3]
+            sprite = self._entity_sprites[i]
 
-    def draw_paddles(self):
-        """Render paddles"""
-
-        # draw sprites
-        self._paddle_me_sprite.draw()
-
-        #
-        # Do all stuff for foe player if connected
-        #
-        if self._foe_connected:
-
-            # A foe has connected to the game, so it's time
-            # to draw him
-            if not self._paddle_foe_sprite.visible:
-                self._paddle_foe_sprite.visible = True
+            # sprites can change their image when reused
+            if ctype == Obstacle.CTYPE:
+                image = self._obstacle_region
+            else:
+                image = self._ball_region
+            if sprite.image is not image:
+                sprite.image = image
 
-            # Draw foe sprite
-            self._paddle_foe_sprite.draw()
+            sprite.set_position(x, y)
+            if not sprite.visible:
+                sprite.visible = True
 
-    def on_data_received(self, data, host, port):
-        """Response pump for this client"""
+    def _accept_update(self):
+        """Take in snapshots no faster than cl_updaterate"""
 
         # The kraken is on a leash! :(
         if self._update_lock:
-            return
+            return False
 
         # The kraken is on the wild!
         self._update_lock = True
+        return True
 
-        # Get raw data and get a proper Response from it
-        response = Response(data=data)
-
-        ########################################
-        # The actual pump
-        ########################################
-
-        #
-        # Request has been denied
-        #
-        if response.status == Response.STATUS_UNAUTHORIZED:
-            if response.reason == Response.REASON_CONN_REFUSED:
-                #
-                # Connection has been refused from the server
-                #
-                raise ConnectionRefusedError(
-                    "Connection to {}:{} refused!".format(
-                        self._server_addr,
-                        self._server_port
-                    )
-                )
-
-        #
-        # A request has been accepted by the server
-        #
-        if response.status == Response.STATUS_OK:
-            if response.reason == Response.REASON_CONN_GRANTED:
-                # This player knows he has connected succesfully
-                # to the server
-
-                # Assume player id
-                self._id = response.player_id
-
-                # Let it be known that this player has hereby connected
-                # to a server
-                self._me_connected = True
-
-                # Start drawing the ball and this player's paddle
-                self._paddle_me_sprite.visible = True
-                self._ball_sprite.visible = True
-
-            # Set state found on server
-            self._server_state = response.state
-
-            # if 'players' in response.data:
-            me = response.get_player_info(name='you')
-            if me is not None:
-                #
-                # Update data used to update the paddle sprite
-                #
-
-                # position
-                self._paddle_me_x, self._paddle_me_y = me['position']
-
-                # velocity
-                self._paddle_me_vx, self._paddle_me_vy = me['velocity']
-
-                # score
-                self._score_me = me['score']
-
-                # number
-                self._number_me = me['number']
-
-            #
-            # Set all information regarding the opponent (foe)
-            #
-            foe = response.get_player_info(name='foe')
-            if foe is not None:
-
-                # Let it be known hereby that the opponent has entered
-                # the arena!
-                self._foe_connected = True
-
-                # position
-                self._paddle_foe_x, self._paddle_foe_y = foe['position']
-
-                # velocity
-                self._paddle_foe_vx, self._paddle_foe_vy = foe['velocity']
-
-                # score
-                self._score_foe = foe['score']
-
-                # number
-                self._number_foe = foe['number']
-
-            else:
-                # Oh!, foe is not present in the game
-                self._foe_connected = False
-
-            #
-            # The actual ball information
-            #
-            ball = response.get_ball_info()
-            if ball is not None:
+    def on_snapshot(self, response):
+        """The ball path starts over on every snapshot"""
+        ball = response.get_ball_info()
+        if ball is None:
+            return
 
-                # position and current velocity of the ball
-                self._ball_x, self._ball_y = ball['position']
-                self._ball_vx, self._ball_vy = ball['velocity']
+        paddles = [(
+            self._paddle_me_x, self._paddle_me_y, self._paddle_me_vy
+        )]
+        if self._foe_connected:
+            paddles.append((
+                self._paddle_foe_x, self._paddle_foe_y,
+                self._paddle_foe_vy
+            ))
+        self._ball_predictor.reset(
+            ball['position'], ball['velocity'],
+            time=time.time(), paddles=paddles
+        )
 
     def on_key_press(self, symbol, modifiers):
         """Send packets to the server as the player hits buttons"""
@@ -9,23 +9,33 @@ Client implementation for a player
 See LICENSE for more details.
 """
 
+import random
+import logging
+import time
 import pyglet
 
 import uberpong.ming as ming
 from uberpong.engine.spot import spot_get
-from uberpong.engine.entity import EntityManager
+from uberpong.engine.cvar import cvar_get, cvar_watch, cvar_unwatch
+from uberpong.engine.entity import EntityManager, EntityState
+from uberpong.engine.profiler import TickProfiler
+from uberpong.engine.watchdog import TickWatchdog
 
 from . import (
     Request,
     Response
 )
+from .session import SessionRegistry
 
 from ..entities import (
     PlayerPaddle,
     Board,
-    Ball
+    Ball,
+    Obstacle
 )
 
+log = logging.getLogger(__name__)
+
 
 class Scene(ming.Server):
     """
@@ -39,6 +49,32 @@ class Scene(ming.Server):
     # Maximum number of players (clients) allowed to join the game
     MAX_PLAYERS = 2
 
+    # Simulated time owed on the heaviest degradation stage
+    # is never let grow past this many ticks
+    MAX_PHYSICS_LAG = 4
+
+    # Server cvars that can change while running
+    RELOADABLE_CVARS = (
+        'sv_gravity',
+        'sv_paddle_impulse',
+        'sv_paddle_friction',
+        'sv_paddle_max_velocity',
+        'sv_ball_max_velocity',
+        'sv_score_max',
+        'sv_ratelimit_datagram',
+        'sv_ratelimit_datagram_burst',
+        'sv_ratelimit_connect',
+        'sv_ratelimit_connect_burst',
+        'sv_ratelimit_move',
+        'sv_ratelimit_move_burst',
+        'sv_ratelimit_other',
+        'sv_ratelimit_other_burst'
+    )
+
+    # Kinds of requests rate limited on their own (see classify),
+    # all datagrams from an address being limited together first
+    RATE_LIMITED = ('datagram', 'connect', 'move', 'other')
+
     # States
     ST_WAITING_FOR_PLAYER = 100
     ST_BEGIN = 101
@@ -46,15 +82,26 @@ class Scene(ming.Server):
     ST_SCORE = 103
     ST_GAME_SET = 104
 
-    def __init__(self, *, width, height, **kwargs):
+    def __init__(self, *, width, height, clock=None, **kwargs):
         """Constructor
 
         Kwargs:
             width(int): width of the scene in pixels
             height(int): height of the scene in pixels
+            clock(optional): clock to schedule ticks and timers on,
+                pyglet.clock by default (see engine.clock.ManualClock)
             kwargs(dict, optional): Arbitrary keyword arguments
         """
-        super().__init__(**kwargs)
+        super().__init__(
+            limits={cls: self._rate_limit(cls) for cls in self.RATE_LIMITED},
+            max_buckets=cvar_get('sv_ratelimit_clients'),
+            **kwargs
+        )
+
+        # Everything on this scene is scheduled on this clock
+        if clock is None:
+            clock = pyglet.clock
+        self._clock = clock
 
         # Set scene dimensions
         self._window_width = width
@@ -64,32 +111,101 @@ class Scene(ming.Server):
         self._ent_mgr = EntityManager()
 
         # set gravity
-        self._ent_mgr.gravity = spot_get('sv_gravity')
+        self._ent_mgr.gravity = cvar_get('sv_gravity')
 
         # Board
         self._board = Board(width, height, self._ent_mgr)
 
         # Players (and their related information) will be held in here
-        self._players = {}
+        self._players = SessionRegistry(self.MAX_PLAYERS)
 
         # Register entities
-        self._ent_mgr.register_class('ent_player', PlayerPaddle)
-        self._ent_mgr.register_class('ent_ball', Ball)
+        self._ent_mgr.register_class('ent_player', PlayerPaddle, pooled=True)
+        self._ent_mgr.register_class('ent_ball', Ball, pooled=True)
+        self._ent_mgr.register_class('ent_party_ball', Ball, pooled=True)
+        self._ent_mgr.register_class('ent_obstacle', Obstacle)
+
+        # Bulk state of every replicated entity class, these
+        # are refilled in place each time a snapshot is built
+        self._states = {
+            class_id: EntityState()
+            for class_id in (
+                'ent_player', 'ent_ball', 'ent_party_ball', 'ent_obstacle'
+            )
+        }
+
+        # Paddle impulse and artificial friction
+        self._paddle_impulse = cvar_get('sv_paddle_impulse')
+        self._paddle_friction = cvar_get('sv_paddle_friction')
+
+        # Score to be reached for a game set
+        self._score_max = cvar_get('sv_score_max')
+
+        # Starting positions
+        self._paddle_position_start = spot_get('paddle_position_start')
+        self._ball_position_start = spot_get('ball_position_start')
+
+        # Whether paddle and ball rules are applied by
+        # entities themselves on every physics step
+        self._velocity_callbacks = cvar_get('sv_velocity_callbacks')
+
+        # Current state
+        self._state = self.ST_WAITING_FOR_PLAYER
+
+        # Physics steps per tick
+        self._tickrate = 1.0 / cvar_get('tickrate')
+        self._substeps = cvar_get('sv_substeps')
+        self._substep = self._tickrate / self._substeps
 
-        # Paddle impulse, top speed and artificial friction
-        self._paddle_impulse = spot_get('sv_paddle_impulse')
-        self._paddle_max_velocity = spot_get('sv_paddle_max_velocity')
-        self._paddle_friction = spot_get('sv_paddle_friction')
+        # Extra balls and obstacles (party mode)
+        self._party_balls = []
+        self._obstacles = []
 
         # Create the actual ball
         self.create_ball()
 
-        # Current state
-        self._state = self.ST_WAITING_FOR_PLAYER
+        # Put extra balls and obstacles on the board
+        self.create_party(
+            balls=cvar_get('sv_party_balls'),
+            obstacles=cvar_get('sv_party_obstacles')
+        )
+
+        # Lots of similarly sized entities do better on a spatial hash
+        if cvar_get('sv_spatial_hash'):
+            self._ent_mgr.enable_spatial_hash()
 
         # Set up tick interval on server
-        self._tickrate = 1.0 / spot_get('tickrate')
-        pyglet.clock.schedule_interval(self.tick, self._tickrate)
+        self._clock.schedule_interval(self.tick, self._tickrate)
+        self._ticks = 0
+
+        # Snapshots are numbered as they are broadcast
+        self._snapshot_seq = 0
+
+        # Ticks going over budget put the server into degradation
+        # stages instead of letting it fall further and further behind
+        self._watchdog = None
+        if cvar_get('sv_watchdog'):
+            self._watchdog = TickWatchdog(self._tickrate)
+
+        # Time not simulated yet while physics run at a lower rate
+        self._physics_lag = 0.0
+
+        # Per-phase tick profiler (None when disabled)
+        self._profiler = None
+        if cvar_get('sv_profile'):
+            self._profiler = TickProfiler(
+                ('pump', 'step', 'dispatch', 'broadcast')
+            )
+
+            # dump timings every once in a while
+            if cvar_get('sv_profile_dump'):
+                self._clock.schedule_interval(
+                    self.dump_stats, cvar_get('sv_profile_dump')
+                )
+
+        # Values above are kept up to date as their cvars change
+        for name in self.RELOADABLE_CVARS:
+            cvar_watch(name, self._on_cvar_changed)
 
         # this method wis called each time the ball
         # collides with either the left or the right boundary
@@ -105,15 +221,21 @@ class Scene(ming.Server):
 
     def _scored_left(self, space, arbiter, *args, **kwargs):
         """ the ball has collided with the left boundary """
-        player = [p for p in self._players.values() if p.number == 2][0]
-        player.score += 1  # bump the score
+        if self._state != self.ST_PLAYING:
+            return False  # someone has already scored on this step
+        player = self._players.by_number(2)
+        if player is not None:
+            player.score += 1  # bump the score
         self._scored()
         return False  # tell pymunk to ignore the collision
 
     def _scored_right(self, space, arbiter, *args, **kwargs):
         """ the ball has collided with the right boundary """
-        player = [p for p in self._players.values() if p.number == 1][0]
-        player.score += 1  # bump the score
+        if self._state != self.ST_PLAYING:
+            return False  # someone has already scored on this step
+        player = self._players.by_number(1)
+        if player is not None:
+            player.score += 1  # bump the score
         self._scored()
         return False  # tell pymunk to ignore the collision
 
@@ -128,11 +250,56 @@ class Scene(ming.Server):
         # Wait for 3 seconds before unfreezing the board
         # If one of the players has reached max score, then switch
         # to set state, otherwise, go back to round state
-        pyglet.clock.schedule_once(self._round_goback, 3)
+        self._clock.schedule_once(self._round_goback, 3)
+
+    def _on_cvar_changed(self, cvar):
+        """Apply a reloaded server cvar on the running scene"""
+        name, value = cvar.name, cvar.value
+        log.info('%s changed to %r', name, value)
+
+        if name == 'sv_gravity':
+            self._ent_mgr.gravity = value
+        elif name == 'sv_paddle_impulse':
+            self._paddle_impulse = value
+        elif name == 'sv_paddle_friction':
+            self._paddle_friction = value
+            for player in self._players:
+                player.set_friction(value)
+        elif name == 'sv_paddle_max_velocity':
+            for player in self._players:
+                player.velocity_limit = value
+        elif name == 'sv_ball_max_velocity':
+            self._ball.velocity_limit = value
+            for ball in self._party_balls:
+                ball.velocity_limit = value
+        elif name == 'sv_score_max':
+            self._score_max = value
+        elif name.startswith('sv_ratelimit_'):
+            cls = name[len('sv_ratelimit_'):].replace('_burst', '')
+            self.limiter.set_limit(cls, *self._rate_limit(cls))
+
+    @staticmethod
+    def _rate_limit(cls):
+        """(rate, burst) set for a kind of request"""
+        name = 'sv_ratelimit_' + cls
+        return cvar_get(name), cvar_get(name + '_burst')
+
+    def classify(self, data):
+        """Tell the kind of request out of its decoded command"""
+        return Request.rate_class(data)
+
+    def close(self):
+        """Stop ticking, stop watching cvars and close the socket"""
+        for func in (self.tick, self.dump_stats, self._round_goback,
+                     self.increase_ball_velocity):
+            self._clock.unschedule(func)
+        for name in self.RELOADABLE_CVARS:
+            cvar_unwatch(name, self._on_cvar_changed)
+        super().close()
 
     def _round_goback(self, dt):
-        if any([player.score == spot_get('sv_score_max')
-               for player in self._players.values()]):
+        if any([player.score >= self._score_max
+               for player in self._players]):
             self._state = self.ST_GAME_SET
         else:
             self._state = self.ST_PLAYING
@@ -142,12 +309,16 @@ class Scene(ming.Server):
         """Get current state in server"""
         return self._state
 
+    def restart(self):
+        """Get players back to begin state for a new match"""
+        self._state = self.ST_BEGIN
+
     def broadcast_update(self):
         """Send an update to all clients"""
 
         if len(self._players):
             # The actual response
-            response = Response()
+            response = Response.acquire()
 
             # Set the answer as accepted
             response.status = Response.STATUS_OK
@@ -156,7 +327,40 @@ class Scene(ming.Server):
             # Set state
             response.state = self._state
 
-            for player in self._players.values():
+            # Number this snapshot
+            self._snapshot_seq += 1
+            response.sequence = self._snapshot_seq
+
+            if self._state == self.ST_PLAYING \
+            or self.state == self.ST_SCORE \
+            or self.state == self.ST_BEGIN:
+                # Bodies are read all at once, class by class
+                self._extract_states()
+
+                players = self._states['ent_player']
+                ball = self._states['ent_ball']
+
+                # Rows of each player on the players state
+                rows = {p.handle: i for i, p in enumerate(players.entities)}
+
+                # Set ball information
+                response.set_ball_info(
+                    position=ball.position(0),
+                    velocity=ball.velocity(0)
+                )
+
+                # Set extra entities information (if any)
+                response.add_entities_state(
+                    Ball.CTYPE, self._states['ent_party_ball']
+                )
+                response.add_entities_state(
+                    Obstacle.CTYPE, self._states['ent_obstacle']
+                )
+
+            # Echoed timestamps are held until this very moment
+            now = time.perf_counter()
+
+            for player in self._players:
                 # Current player
                 player_me = player
 
@@ -164,51 +368,57 @@ class Scene(ming.Server):
                 host = player.host
                 port = player.port
 
+                # Echo client time back for it to measure its RTT
+                # along how long it's been held here
+                response.timestamp = player.timestamp
+                if player.timestamp is not None:
+                    response.hold_time = int(
+                        (now - player.timestamp_received) * 1000
+                    )
+                else:
+                    response.hold_time = None
+
                 if self._state == self.ST_PLAYING \
                 or self.state == self.ST_SCORE \
                 or self.state == self.ST_BEGIN:
                     # Set player information
+                    row = rows[player_me.handle]
                     response.set_player_info(
                         name='you',
                         score=player_me.score,
                         number=player_me.number,
-                        position=(int(player_me.position.x),
-                                  int(player_me.position.y)),
-                        velocity=(int(player_me.velocity.x),
-                                  int(player_me.velocity.y))
+                        position=players.position(row),
+                        velocity=players.velocity(row)
                     )
 
                     # Set opponent (foe) information
-                    if player.foe is not None:
-
-                        player_foe = self._players[player.foe]
+                    player_foe = player.foe
+                    if player_foe is not None:
 
+                        row = rows[player_foe.handle]
                         response.set_player_info(
                             name='foe',
                             score=player_foe.score,
                             number=player_foe.number,
-                            position=(int(player_foe.position.x),
-                                      int(player_foe.position.y)),
-                            velocity=(int(player_foe.velocity.x),
-                                      int(player_foe.velocity.y))
+                            position=players.position(row),
+                            velocity=players.velocity(row)
                         )
 
-                    # Set ball information
-                    response.set_ball_info(
-                        position=(int(self._ball.position.x),
-                                  int(self._ball.position.y)),
-                        velocity=(int(self._ball.velocity.x),
-                                  int(self._ball.velocity.y))
-                    )
-
                 # Send the packet to the client
                 self.send(response.data, host, port)
 
+            response.release()
+
+    def _extract_states(self):
+        """Extract bulk state of all replicated entity classes"""
+        for class_id, state in self._states.items():
+            self._ent_mgr.extract_state(class_id, state)
+
     def _reset_player(self, player):
         """Reset values on a player"""
 
         # Calculate initial position
-        player_position_x, player_position_y = spot_get('paddle_position_start')
+        player_position_x, player_position_y = self._paddle_position_start
 
         # player 2's position on the other side of the screen
         if player.number == 2:
@@ -231,7 +441,7 @@ class Scene(ming.Server):
     def reset_players(self):
         """Reset values on players"""
 
-        for player in self._players.values():
+        for player in self._players:
             self._reset_player(player)
 
     def reset_ball(self):
@@ -240,12 +450,75 @@ class Scene(ming.Server):
         # Set initial position for this ball
         # self._ball.reset_forces()
         self._ball.velocity = (0, 0)
-        self._ball.position = spot_get('ball_position_start')
+        self._ball.position = self._ball_position_start
 
         # FIXME: do something better
         # Set initial impulse on the ball
         self._ball.apply_impulse((-1500, 0))
 
+        # Extra balls are laid out around the main one and
+        # sent in alternate directions
+        positions = self._ball_layout(len(self._party_balls))
+        for i, ball in enumerate(self._party_balls):
+            ball.velocity = (0, 0)
+            ball.position = positions[i]
+            ball.apply_impulse((
+                -1500 if i % 2 else 1500,
+                (i % 5 - 2) * 300
+            ))
+
+    def _ball_layout(self, count):
+        """Lay out extra balls on a grid around the center of the board
+
+        Args:
+            count(int): number of positions
+        Returns:
+            A list of positions, nearest to the center first
+        """
+        if not count:
+            return []
+
+        center_x, center_y = self._ball_position_start
+        ball_width, ball_height = spot_get('ball_size')
+        spacing_x = ball_width + ball_width // 2
+        spacing_y = ball_height + ball_height // 2
+
+        # keep balls away from the paddles and the walls
+        cols = (self._window_width // 2 - 2 * ball_width) // spacing_x
+        rows = (self._window_height // 2 - ball_height) // spacing_y
+
+        cells = [
+            (col, row)
+            for col in range(-cols, cols + 1)
+            for row in range(-rows, rows + 1)
+            if col or row  # the center belongs to the main ball
+        ]
+        cells.sort(key=lambda c: c[0] * c[0] + c[1] * c[1])
+
+        return [
+            (center_x + col * spacing_x, center_y + row * spacing_y)
+            for col, row in (cells * (count // len(cells) + 1))[:count]
+        ]
+
+    def _obstacle_layout(self, count):
+        """Scatter obstacles on the middle half of the board
+
+        A fixed seed is used so every session gets the very same board.
+
+        Args:
+            count(int): number of positions
+        Returns:
+            A list of positions
+        """
+        rng = random.Random(count)
+        width, height = spot_get('obstacle_size')
+        return [
+            (rng.randint(self._window_width // 4,
+                         3 * self._window_width // 4),
+             rng.randint(height, self._window_height - height))
+            for i in range(count)
+        ]
+
     def create_ball(self):
         """Create a ball to play"""
         # New PlayerPaddle for a client
@@ -254,9 +527,40 @@ class Scene(ming.Server):
         # Reset values on ball
         self.reset_ball()
 
-        # Increase/maintain ball velocity each second
-        # TODO: move this to tick()
-        pyglet.clock.schedule_interval(self.increase_ball_velocity, 1.0)
+        # Increase/maintain ball velocity each second, unless
+        # the ball does it by itself on every physics step
+        if not self._velocity_callbacks:
+            self._clock.schedule_interval(self.increase_ball_velocity, 1.0)
+
+    def create_party(self, *, balls=0, obstacles=0):
+        """Put extra balls and obstacles on the board (party mode)
+
+        Kwargs:
+            balls(int): number of extra balls
+            obstacles(int): number of obstacles
+        """
+        if balls:
+            self._party_balls.extend(
+                self._ent_mgr.create_entities('ent_party_ball', balls)
+            )
+        if obstacles:
+            self._obstacles.extend(
+                self._ent_mgr.create_entities(
+                    'ent_obstacle', obstacles,
+                    positions=self._obstacle_layout(obstacles)
+                )
+            )
+
+        # Reset values on all balls
+        self.reset_ball()
+
+    def clear_party(self):
+        """Take all extra balls and obstacles off the board"""
+        self._ent_mgr.destroy_entities(
+            [e.handle for e in self._party_balls + self._obstacles]
+        )
+        self._party_balls = []
+        self._obstacles = []
 
     def create_player(self, host, port):
         """Create a PlayerPaddle for a client
@@ -271,57 +575,56 @@ class Scene(ming.Server):
             'ent_player',
             host=host,
             port=port,
-            number=len(self._players) + 1,
+            number=self._players.next_number(),
         )
 
-        # Add this player to the server
-        self._players[player.uuid] = player
+        # Add this player to the server, it gets a session token
+        self._players.add(player)
 
         # Reset its values
-        self._reset_player(self._players[player.uuid])
+        self._reset_player(player)
 
         # Return the entity
         return player
 
-    def destroy_player(self, player_id):
-        """Get rid of a player"""
-        del self._players[player_id]
+    def destroy_player(self, player):
+        """Get rid of a player
+
+        Its paddle is taken off the space as well, so it
+        is no longer simulated.
+        """
+        self._players.remove(player)
+        self._ent_mgr.destroy_entity(player.handle)
 
     def update_players(self):
         """Update information on players"""
 
         # Change state depending on the number of players present
-        if len(self._players) < self.MAX_PLAYERS:
+        # (foes are kept up to date on the sessions themselves)
+        if not self._players.full:
             self._state = self.ST_WAITING_FOR_PLAYER
         else:
             self._state = self.ST_BEGIN
 
-        # Update each player's foes
-        for uuid, player in self._players.items():
-            foes = [p.uuid for p in self._players.values() if p.uuid != uuid]
-            if len(foes):
-                player.foe = foes[0]
-            else:
-                player.foe = None
-
     def increase_ball_velocity(self, dt):
         """Increase/maintain a constant velocity for the ball"""
 
         if self._state == self.ST_PLAYING:
-            # In order to have a decent/pleasurable gameplay
-            # the ball needs to maintain a certain pace, so it
-            # becomes "pushed" constantly until it reaches its
-            # top speed
-            self._ball.velocity = (1.02 * self._ball.velocity.x,
-                                   1.02 * self._ball.velocity.y)
-
-            # Very much like table hockey games the ball gets
-            # pushed until it gains its minimun speed of 200.0
-            if abs(self._ball.velocity.x) < 200.0:
-                if self._ball.velocity.x > 0:
-                    self._ball.apply_impulse((200, self._ball.velocity.y))
-                elif self._ball.velocity.x < 0:
-                    self._ball.apply_impulse((-200, self._ball.velocity.y))
+            for ball in [self._ball] + self._party_balls:
+                # In order to have a decent/pleasurable gameplay
+                # the ball needs to maintain a certain pace, so it
+                # becomes "pushed" constantly until it reaches its
+                # top speed
+                ball.velocity = (1.02 * ball.velocity.x,
+                                 1.02 * ball.velocity.y)
+
+                # Very much like table hockey games the ball gets
+                # pushed until it gains its minimun speed of 200.0
+                if abs(ball.velocity.x) < 200.0:
+                    if ball.velocity.x > 0:
+                        ball.apply_impulse((200, ball.velocity.y))
+                    elif ball.velocity.x < 0:
+                        ball.apply_impulse((-200, ball.velocity.y))
 
     def tick(self, dt):
         """Run simulation on server and broadcast an update to all clients
@@ -331,43 +634,150 @@ class Scene(ming.Server):
         and updates all object states.
         """
 
+        start = time.perf_counter()
+        self._ticks += 1
+
+        # Profiling bits are skipped altogether when disabled
+        prof = self._profiler
+        if prof is not None:
+            prof.begin()
+
         # Process incoming user commands
         self.pump()
 
+        if prof is not None:
+            prof.mark('pump')
+
         #################################
         # Run a physical simulation step:
         #################################
 
         if self._state == self.ST_PLAYING:
-            # FIXME: This is working, it caps the velocity to 0 in x
-            # so it won't move sideways no matter what
-            for player in self._players.values():
-
-                # cancel horizontal velocity
-                player.velocity = 0, player.velocity.y
-
-                # artificial friction maybe?
-                player.apply_impulse(
-                    (0, - self._paddle_friction * player.velocity.y)
-                )
+            # Paddle rules are applied here unless entities
+            # handle them themselves on every step
+            if not self._velocity_callbacks:
+                # FIXME: This is working, it caps the velocity to 0 in x
+                # so it won't move sideways no matter what
+                for player in self._players:
+
+                    # cancel horizontal velocity
+                    player.velocity = 0, player.velocity.y
+
+                    # artificial friction maybe?
+                    player.apply_impulse(
+                        (0, - self._paddle_friction * player.velocity.y)
+                    )
 
             # Physics are performed based on a fixed time step
             # or time scale from which all bodies on a scene
             # are ruled. This is done for consistent client-server
             # physics.
-            self._ent_mgr.step(self._tickrate)
+            steps, substep = self._physics_steps(dt)
+            for i in range(steps):
+                self._ent_mgr.step(substep)
+
+            if prof is not None:
+                prof.mark('step')
 
             # Tell the EntityManager to deliver all
             # pending messages (if there are any)
             self._ent_mgr.dispatch_messages()
 
+            if prof is not None:
+                prof.mark('dispatch')
+
         elif self._state == self.ST_BEGIN:
             # If all players are ready, then move on
-            if all([p.ready for p in self._players.values()]):
+            if all([p.ready for p in self._players]):
                 self._state = self.ST_PLAYING
 
         # Broadcast latest snapshot to all clients
-        self.broadcast_update()
+        if self._snapshot_due():
+            self.broadcast_update()
+
+        if prof is not None:
+            prof.mark('broadcast')
+            prof.end()
+
+        if self._watchdog is not None:
+            self._watchdog.record(
+                time.perf_counter() - start, dt - self._tickrate
+            )
+
+    def _stage(self):
+        """Current degradation stage"""
+        if self._watchdog is None:
+            return TickWatchdog.STAGE_NORMAL
+        return self._watchdog.stage
+
+    def _physics_steps(self, dt):
+        """Physics steps to run on this tick
+
+        Under the heaviest degradation stage, steps twice as long
+        are run, as many of them as the time actually elapsed since
+        the last tick (plus whatever was left over from previous
+        ticks) makes up for, so late ticks are caught up on. Time
+        owed is capped at MAX_PHYSICS_LAG ticks though, beyond that
+        simulated time is let fall behind.
+
+        Args:
+            dt(float): time elapsed since the last tick
+        Returns:
+            A tuple holding the number of steps and their time step
+        """
+        if self._stage() < TickWatchdog.STAGE_LOW_PHYSICS_RATE:
+            self._physics_lag = 0.0
+            return self._substeps, self._substep
+
+        substep = 2 * self._substep
+        lag = min(self._physics_lag + dt,
+                  self.MAX_PHYSICS_LAG * self._tickrate)
+        steps = int(lag / substep)
+        self._physics_lag = lag - steps * substep
+        return steps, substep
+
+    def _snapshot_due(self):
+        """Whether a snapshot is to be broadcast on this tick
+
+        While degraded, snapshots not affecting actual play (waiting,
+        begin, score and game set screens) are the first ones to be
+        sent less often, then snapshots are sent every other tick.
+        """
+        stage = self._stage()
+        if stage >= TickWatchdog.STAGE_LOW_SNAPSHOT_RATE and self._ticks % 2:
+            return False
+        if stage >= TickWatchdog.STAGE_SHED_NONCRITICAL \
+                and self._state != self.ST_PLAYING and self._ticks % 4:
+            return False
+        return True
+
+    def stats(self):
+        """Get tick timings per phase
+
+        Returns:
+            A dict holding count, p50, p99 and max (in milliseconds)
+            for each phase since the last dump, None if the profiler
+            has not been enabled (see sv_profile)
+        """
+        if self._profiler is None:
+            return None
+        return self._profiler.stats()
+
+    def dump_stats(self, dt=None):
+        """Log tick timings and start a new profiling window"""
+        if self._profiler is not None:
+            log.info('tick timings:\n%s', self._profiler.format_stats())
+            self._profiler.reset()
+        if self._watchdog is not None:
+            log.info(
+                'tick budget overruns: %d out of %d ticks',
+                self._watchdog.overruns, self._watchdog.ticks
+            )
+        if self.packets_rejected:
+            log.info(
+                'requests rejected by flood protection: %d %r',
+                self.packets_rejected, self.limiter.rejected
+            )
 
     def on_data_received(self, data, host, port):
         """Pump network requests from clients
@@ -381,12 +791,18 @@ class Scene(ming.Server):
         #
         # Get a nice Request from raw data
         #
-        request = Request(data=data)
+        request = Request.acquire()
+        try:
+            request.data = data
+        except ValueError:
+            # not a request at all
+            request.release()
+            return
 
         #
         # By default, the server will not be OK with the incoming request
         #
-        response = Response()
+        response = Response.acquire()
         response.status = Response.STATUS_UNAUTHORIZED
         response.reason = Response.REASON_CONN_REFUSED
 
@@ -401,32 +817,43 @@ class Scene(ming.Server):
         # The actual pump
         #######################################
         if request.command is not None:
+            # Requests are only taken from the address
+            # their session token has been given to
+            player_me = None
+            if request.player_id is not None:
+                player_me = self._players.validate(
+                    request.player_id, host, port
+                )
+
             if request.player_id is None:
                 #
                 # Client is trying to establish a connection
                 #
                 if request.command == Request.CMD_CONNECT:
-                    if len(self._players) < self.MAX_PLAYERS:
+                    # A client already connected is granted its very
+                    # same session again (the grant may have been lost)
+                    player = self._players.find(host, port)
+                    if player is None and not self._players.full:
+                        player = self.create_player(host, port)
+                        self.update_players()
+
+                    if player is not None:
                         response.status = Response.STATUS_OK
                         response.reason = Response.REASON_CONN_GRANTED
-                        response.player_id = self.create_player(host, port).uuid
-                        self.update_players()
+                        response.player_id = player.token
 
                         # Send the packet to the client
                         self.send(response.data, host, port)
 
-            elif request.player_id in self._players:
+            elif player_me is not None:
                 #
                 # Request is valid and going to be processed
                 #
 
-                # First of all, get the players' entities
-                player_me = self._players[request.player_id]
-
-                # FIXME: this will get better
-                if self._players[request.player_id].foe is not None:
-                    foe_uuid = self._players[request.player_id].foe
-                    player_foe = self._players[foe_uuid]
+                # Keep latest client time around to echo it
+                if request.timestamp is not None:
+                    player_me.timestamp = request.timestamp
+                    player_me.timestamp_received = time.perf_counter()
 
                 # Get player's command
                 command = request.command
@@ -451,5 +878,8 @@ class Scene(ming.Server):
 
                 # disconnect command
                 if command == Request.CMD_DISCONNECT:
-                    self.destroy_player(request.player_id)
+                    self.destroy_player(player_me)
                     self.update_players()
+
+        request.release()
+        response.release()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+game.net.session
+~~~~~~~~
+Player sessions on a scene
+
+Every player connected to a scene is given a session token, a small
+random integer its requests have to carry from then on along with
+coming from the very same address. Players are also numbered, odd
+and even numbers going in pairs (1 and 2, 3 and 4, ...), each
+player's foe being the other one on its pair.
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import random
+
+
+class SessionRegistry:
+    """
+    Players indexed by session token, address and number
+
+    Players are expected to have host, port, number, token
+    and foe attributes (see PlayerPaddle), the last two of
+    them being set here.
+    """
+
+    # Session tokens are this many bits long
+    TOKEN_BITS = 31
+
+    def __init__(self, max_sessions, *, rng=None):
+        """Constructor
+
+        Args:
+            max_sessions(int): players allowed at most
+        Kwargs:
+            rng(random.Random, optional): source of session tokens
+        """
+        self._max_sessions = max_sessions
+        if rng is None:
+            rng = random.SystemRandom()
+        self._rng = rng
+
+        self._by_token = {}
+        self._by_address = {}
+        self._by_number = {}
+
+    def __len__(self):
+        return len(self._by_token)
+
+    def __iter__(self):
+        return iter(self._by_token.values())
+
+    @property
+    def full(self):
+        """Whether there's no room for another player"""
+        return len(self._by_token) >= self._max_sessions
+
+    @staticmethod
+    def foe_number(number):
+        """Number of the foe of a player"""
+        return number + 1 if number % 2 else number - 1
+
+    def next_number(self):
+        """Lowest player number not taken (None if full)"""
+        for number in range(1, self._max_sessions + 1):
+            if number not in self._by_number:
+                return number
+        return None
+
+    def add(self, player):
+        """Open a session for a player
+
+        Its number is expected to be free (see next_number).
+
+        Args:
+            player(PlayerPaddle): player to be added
+        Returns:
+            The session token given to the player
+        """
+        token = self._rng.getrandbits(self.TOKEN_BITS)
+        while not token or token in self._by_token:
+            token = self._rng.getrandbits(self.TOKEN_BITS)
+        player.token = token
+
+        self._by_token[token] = player
+        self._by_address[player.host, player.port] = player
+        self._by_number[player.number] = player
+
+        foe = self._by_number.get(self.foe_number(player.number))
+        player.foe = foe
+        if foe is not None:
+            foe.foe = player
+        return token
+
+    def remove(self, player):
+        """Close the session of a player"""
+        del self._by_token[player.token]
+        del self._by_address[player.host, player.port]
+        del self._by_number[player.number]
+        if player.foe is not None:
+            player.foe.foe = None
+            player.foe = None
+
+    def get(self, token):
+        """Player holding a session token (None if none)"""
+        return self._by_token.get(token)
+
+    def find(self, host, port):
+        """Player connected from an address (None if none)"""
+        return self._by_address.get((host, port))
+
+    def by_number(self, number):
+        """Player with a number (None if none)"""
+        return self._by_number.get(number)
+
+    def validate(self, token, host, port):
+        """Player a request is from, if it really is
+
+        Args:
+            token(int): session token on the request
+            host(str): address the request came from
+            port(int): port the request came from
+        Returns:
+            The player holding the token, None if there's none
+            or the request doesn't come from its address
+        """
+        # tokens come straight off the wire, anything but
+        # an int (e.g. an unhashable list) is no token at all
+        if type(token) is not int:
+            return None
+        player = self._by_token.get(token)
+        if player is None or player.port != port or player.host != host:
+            return None
+        return player
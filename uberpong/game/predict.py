@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""
+game.predict
+~~~~~~~~
+Client-side ball trajectory prediction
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+INFINITY = float('inf')
+
+
+class BallPredictor:
+    """
+    Analytic ball trajectory between snapshots
+
+    Given the last known position and velocity of the ball, its path
+    is worked out as a chain of straight segments, each one ending on
+    a bounce off the top or bottom walls or off a paddle face. Paddles
+    are taken to move on a straight line as well. The ball comes to
+    a halt once it reaches either the left or the right boundary,
+    where the server is going to have a point scored anyway.
+
+    Segments are only worked out as time gets to them, and then
+    kept, so a frame just evaluates a linear formula on its segment.
+    """
+
+    # Segments worked out after a reset before the ball is left alone
+    MAX_SEGMENTS = 64
+
+    # indexes on a segment
+    _T0, _X, _Y, _VX, _VY, _T1, _EVENT = range(7)
+
+    # what a segment ends on
+    EV_NONE = 0
+    EV_WALL = 1
+    EV_PADDLE = 2
+    EV_BOUNDARY = 3
+
+    def __init__(self, extents, *, ball_size, paddle_size):
+        """Constructor
+
+        Args:
+            extents(tuple): (left, bottom, right, top) inner edges
+                of the board boundaries (see Board.extents)
+        Kwargs:
+            ball_size(int, int): ball width and height
+            paddle_size(int, int): paddle width and height
+        """
+        left, bottom, right, top = extents
+        half_w, half_h = ball_size[0] / 2, ball_size[1] / 2
+
+        # ranges the center of the ball moves on
+        self._min_x = left + half_w
+        self._max_x = right - half_w
+        self._min_y = bottom + half_h
+        self._max_y = top - half_h
+
+        self._ball_half_w = half_w
+        self._ball_half_h = half_h
+        self._paddle_half_w = paddle_size[0] / 2
+        self._paddle_half_h = paddle_size[1] / 2
+
+        self._paddles = ()
+        self._segments = []
+        self._index = 0
+
+    def reset(self, position, velocity, *, time, paddles=()):
+        """Start over from a known ball state
+
+        Args:
+            position(float, float): ball position
+            velocity(float, float): ball velocity
+        Kwargs:
+            time(float): time at which the ball was on position
+            paddles(iterable): (x, y, vy) state of each paddle at time
+        """
+        self._paddles = [
+            (px, py, pvy, time) for px, py, pvy in paddles
+        ]
+        x, y = position
+        vx, vy = velocity
+        # segments are counted on the new list, not the previous one
+        self._segments = []
+        self._segments.append(self._segment(time, x, y, vx, vy))
+        self._index = 0
+
+    def position(self, time):
+        """Get predicted ball position at a given time
+
+        Args:
+            time(float): time (on the same clock given to reset)
+        Returns:
+            A (x, y) tuple, None if the predictor has not been reset
+        """
+        segments = self._segments
+        if not segments:
+            return None
+
+        # move forth through segments, working out new ones on demand
+        index = self._index
+        seg = segments[index]
+        while time >= seg[self._T1]:
+            index += 1
+            if index == len(segments):
+                segments.append(self._next_segment(seg))
+            seg = segments[index]
+
+        # ... and back, in case of an earlier time
+        while index and time < seg[self._T0]:
+            index -= 1
+            seg = segments[index]
+        self._index = index
+
+        dt = max(time - seg[self._T0], 0.0)
+        return seg[self._X] + seg[self._VX] * dt, \
+            seg[self._Y] + seg[self._VY] * dt
+
+    @property
+    def segments(self):
+        """Number of segments worked out since last reset"""
+        return len(self._segments)
+
+    def _segment(self, t0, x, y, vx, vy):
+        """Build a segment starting at t0, finding out when it ends"""
+
+        # the ball is left alone once it has bounced way too much
+        if len(self._segments) >= self.MAX_SEGMENTS - 1:
+            return (t0, x, y, vx, vy, INFINITY, self.EV_NONE)
+
+        # walls
+        t1, event = INFINITY, self.EV_NONE
+        if vy > 0:
+            t1, event = max((self._max_y - y) / vy, 0.0), self.EV_WALL
+        elif vy < 0:
+            t1, event = max((self._min_y - y) / vy, 0.0), self.EV_WALL
+
+        # left and right boundaries
+        t_boundary = INFINITY
+        if vx > 0:
+            t_boundary = max((self._max_x - x) / vx, 0.0)
+        elif vx < 0:
+            t_boundary = max((self._min_x - x) / vx, 0.0)
+        if t_boundary < t1:
+            t1, event = t_boundary, self.EV_BOUNDARY
+
+        # paddle faces, these take ties over walls
+        if vx:
+            t_paddle = self._paddle_hit(t0, x, y, vx, vy)
+            if t_paddle is not None and t_paddle <= t1:
+                t1, event = t_paddle, self.EV_PADDLE
+
+        return (t0, x, y, vx, vy, t0 + t1, event)
+
+    def _paddle_hit(self, t0, x, y, vx, vy):
+        """Time elapsed until the ball hits a paddle face, if it does"""
+        reach_x = self._ball_half_w + self._paddle_half_w
+        reach_y = self._ball_half_h + self._paddle_half_h
+        hit = None
+        for px, py, pvy, pt in self._paddles:
+            # only faces the ball is heading to
+            if vx < 0:
+                face_x = px + reach_x
+                if x < face_x:
+                    continue
+            else:
+                face_x = px - reach_x
+                if x > face_x:
+                    continue
+
+            dt = (face_x - x) / vx
+            if hit is not None and dt >= hit:
+                continue
+
+            # both paddle and ball have to be there at the same time
+            paddle_y = py + pvy * (t0 + dt - pt)
+            if abs(y + vy * dt - paddle_y) <= reach_y:
+                hit = dt
+        return hit
+
+    def _next_segment(self, seg):
+        """Build the segment following a bounce at the end of seg"""
+        t1 = seg[self._T1]
+        dt = t1 - seg[self._T0]
+        x = seg[self._X] + seg[self._VX] * dt
+        y = seg[self._Y] + seg[self._VY] * dt
+        vx, vy = seg[self._VX], seg[self._VY]
+
+        event = seg[self._EVENT]
+        if event == self.EV_BOUNDARY:
+            # the ball stays there
+            return (t1, x, y, 0.0, 0.0, INFINITY, self.EV_NONE)
+        if event == self.EV_WALL:
+            vy = -vy
+        else:
+            vx = -vx
+
+        return self._segment(t1, x, y, vx, vy)
@@ -1,10 +1,4 @@
 # -*- coding: utf-8 -*-
 
-from .load import LoadState
-from .round import RoundState
-from .splash import SplashState
-from .begin import BeginState
-from .score import ScoreState
-from .set import GameSetState
-from .wait import WaitState
-from .credits import CreditsState
+# States are not imported here, the game imports
+# each one of them the first time it is needed
@@ -12,6 +12,7 @@ See LICENSE for more details.
 """
 
 
+import time
 import pyglet
 import pyglet.gl
 
@@ -21,9 +22,51 @@ from uberpong.engine.spot import spot_get
 from .. import utils
 
 
+class FadeOverlay:
+    """
+    Full window quad used for fade animations
+
+    Its vertex list is built once and only its alpha gets
+    updated in place afterwards.
+    """
+
+    def __init__(self, width, height):
+        self._alpha = 0
+        self._vertex_list = pyglet.graphics.vertex_list(
+            6,
+            ('v2i/static', (0, height,
+                            0, 0,
+                            width, 0,
+
+                            width, 0,
+                            width, height,
+                            0, height)),
+            ('c4B/stream', (0, 0, 0, 0) * 6)
+        )
+
+    def draw(self, alpha):
+        """Draw the quad with a given alpha
+
+        Args:
+            alpha(int): amount of alpha on the quad
+        """
+        if alpha != self._alpha:
+            colors = self._vertex_list.colors
+            for i in range(3, 24, 4):
+                colors[i] = alpha
+            self._alpha = alpha
+
+        pyglet.gl.glEnable(pyglet.gl.GL_BLEND)
+        self._vertex_list.draw(pyglet.gl.GL_TRIANGLES)
+        pyglet.gl.glDisable(pyglet.gl.GL_BLEND)
+
+
 class BaseState(State):
     """base state"""
 
+    # Fade overlay shared among all states (built on first use)
+    _fade_overlay = None
+
     def __init__(self, *, machine, fade_in=False):
         """Constructor
 
@@ -46,25 +89,25 @@ class BaseState(State):
         # get the sorcerer to use resources
         self.sorcerer = spot_get('game_object').sorcerer
 
-        # create the base fonts used throughout the entire game
-        self.sorcerer.create_font(
-            utils.FONT_SECONDARY,
-            file_name='8bitOperatorPlus8-Regular.ttf'
-        )
-        self.sorcerer.create_font(
-            utils.FONT_PRIMARY,
-            file_name='8bitOperatorPlus-Regular.ttf'
-        )
-
         # fade attributes
-        self._fade_step = None
         self._fade_total_time = None
+        self._fade_last_time = None
         self._trans_state_name = None
 
         # TODO: give more flexibility about this
         if fade_in:
             self._sched_fadein(100)
 
+    @property
+    def fps(self):
+        """Frames per second needed right now
+
+        Fade animations are drawn at full rate.
+        """
+        if self._fade_out or self._fade_in:
+            return None
+        return self.FPS
+
     def create_label(self, text, **kwargs):
         """ Create a pyglet label easily
 
@@ -89,20 +132,14 @@ class BaseState(State):
         pyglet.gl.glClearColor(red/255, green/255, blue/255, alpha/255)
 
     def _setup_fade(self, total_time, alpha):
-        """Set up fade animation and schedule it"""
+        """Set up fade animation"""
 
         # total fade animation time in seconds
         self._fade_total_time = total_time/1000
 
-        # updates to animation are going to be made at 60 fps
-        fade_interval = 1/60.0
-
-        # the amount of alpha applied to the fade polygon is relative to both
-        # the total time of the animation and its interval time
-        self._fade_step = int(255 / (self._fade_total_time/fade_interval))
-
-        # actually schedule the animation under the set interval
-        pyglet.clock.schedule_interval(self._fade_alpha_step, fade_interval)
+        # the animation is stepped on every frame by the time
+        # elapsed since the previous one, starting on the next frame
+        self._fade_last_time = None
 
         # set initial alpha
         self._fade_alpha = alpha
@@ -130,43 +167,39 @@ class BaseState(State):
 
         self._sched_fadeout(total_time, state_name)
 
-    def _fade_alpha_step(self, dt):
+    def _fade_alpha_step(self):
+        """Step the fade animation by the time elapsed since last frame"""
+        now = time.perf_counter()
+        if self._fade_last_time is None:
+            dt = 0.0
+        else:
+            dt = now - self._fade_last_time
+        self._fade_last_time = now
+
+        # alpha goes all the way through in the total animation time
+        step = 255 * dt / self._fade_total_time
         if self._fade_out:
-            self._fade_alpha += self._fade_step
             # make sure alpha reaches no more than its top value
-            if self._fade_alpha > 255:
-                self._fade_alpha = 255
+            self._fade_alpha = min(self._fade_alpha + step, 255)
         if self._fade_in:
-            self._fade_alpha -= self._fade_step
             # make sure alpha reaches no more than its bottom value
-            if self._fade_alpha < 0:
-                self._fade_alpha = 0
+            self._fade_alpha = max(self._fade_alpha - step, 0)
 
     def _fade_cleanup(self):
         """Clean up everyhing before exiting"""
-
-        pyglet.clock.unschedule(self._fade_alpha_step)
         self._fade_in = False
         self._fade_out = False
 
     def on_update(self):
         if self._fade_out or self._fade_in:
-            pyglet.gl.glEnable(pyglet.gl.GL_BLEND)
+            self._fade_alpha_step()
+
             # draw the polygon depending on set alpha
-            width = self.window.width
-            height = self.window.height
-            pyglet.graphics.draw(
-                6, pyglet.gl.GL_TRIANGLES,
-                ('v2i', (0, height,
-                         0, 0,
-                         width, 0,
-
-                         width, 0,
-                         width, height,
-                         0, height)),
-                ('c4B', (0, 0, 0, self._fade_alpha) * 6)
-            )
-            pyglet.gl.glDisable(pyglet.gl.GL_BLEND)
+            if BaseState._fade_overlay is None:
+                BaseState._fade_overlay = FadeOverlay(
+                    self.window.width, self.window.height
+                )
+            BaseState._fade_overlay.draw(int(self._fade_alpha))
 
             # Stop "fade" animation
             if self._fade_out:
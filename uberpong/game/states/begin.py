@@ -16,7 +16,7 @@ See LICENSE for more details.
 """
 
 
-from ..net import Scene
+from ..net.scene import Scene
 from .base import BaseState
 
 
@@ -55,9 +55,7 @@ class BeginState(BaseState):
         """Draw all the things!"""
 
         self.client.tick()
-        self.client.draw_board()
-        self.client.draw_ball()
-        self.client.draw_paddles()
+        self.client.draw(scores=False)
         self._wait_label.draw()
 
         # Check for a state change, at anytime is expected
@@ -23,6 +23,9 @@ from .. import colors
 class CreditsState(BaseState):
     """Game start state"""
 
+    # Nothing moves on here
+    FPS = 10
+
     def __init__(self, *, machine):
         """Constructor
 
@@ -51,18 +54,14 @@ class CreditsState(BaseState):
         # set the background color
         self.set_background_color(*colors.GRAY0)
 
-        # a player to have better sound playback
-        self._player = pyglet.media.Player()
-
     #
     # pyglet event callbacks
     #
 
     def on_begin(self):
         # play the sound!
-        if not self._player.playing:
-            self._player.queue(self._snd_credits)
-            self._player.play()
+        if not self.sorcerer.sound_playing('snd_credits'):
+            self.sorcerer.play_sound('snd_credits')
 
         # schedule a transition to the next state
         pyglet.clock.schedule_once(self._trans_splash, 2)
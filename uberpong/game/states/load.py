@@ -6,6 +6,7 @@ game.states.load
 Set up client-server
 
 Purpose:
+* Assets still being loaded on background are finished
 * The client tries to connect to a server
 * A nice "Connecting to server..." text is drawn here
 
@@ -37,13 +38,8 @@ class LoadState(BaseState):
         # A flag to control _get_going
         self._push_schedule = False
 
-        # sprite sheet
-        self._img = self.sorcerer.get_resource('sprite_sheet')
-
         # ball sprite
-        _ball_region = self._img.get_region(32, 32, 64, 64)
-        _ball_region.anchor_x = _ball_region.width // 2
-        _ball_region.anchor_y = _ball_region.height // 2
+        _ball_region = self.sorcerer.get_region('big_ball')
         self._ball_sprite = pyglet.sprite.Sprite(_ball_region)
         self._ball_sprite.set_position(
             self.window.width // 2,
@@ -98,10 +94,21 @@ class LoadState(BaseState):
         # Draw sprites
         self._ball_sprite.draw()
 
+        # Report progress on assets being loaded
+        if not self.sorcerer.loaded:
+            conn_text = "loading... {}%".format(
+                int(self.sorcerer.progress * 100)
+            )
+        else:
+            conn_text = "connecting to server..."
+        if self._conn_label.text != conn_text:
+            self._conn_label.text = conn_text
+
         #
         # Check whether the client has connected to the server
+        # (no gameplay state is to wait for any asset afterwards)
         #
-        if self._client.connected:
+        if self._client.connected and self.sorcerer.loaded:
             if not self._push_schedule:
 
                 # Tear down connection attempt
@@ -110,6 +117,10 @@ class LoadState(BaseState):
                 # A flag to control this code block
                 self._push_schedule = True
 
+                # Build gameplay states beforehand, now
+                # that all of their assets are at hand
+                self.machine.preload_states()
+
                 # get going to next state
                 self.transition_to('game_wait')
 
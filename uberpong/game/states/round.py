@@ -14,7 +14,7 @@ See LICENSE for more details.
 
 
 from .base import BaseState
-from ..net import Scene
+from ..net.scene import Scene
 
 
 class RoundState(BaseState):
@@ -47,10 +47,7 @@ class RoundState(BaseState):
         self.client.tick()
 
         # Draw all the things in the client!
-        self.client.draw_board()
-        self.client.draw_scores()
-        self.client.draw_paddles()
-        self.client.draw_ball()
+        self.client.draw()
 
         # Check for a state change, at anytime is expected
         # from the server to change to "score" state
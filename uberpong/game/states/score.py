@@ -18,7 +18,7 @@ import pyglet
 from .base import BaseState
 from uberpong.engine.spot import spot_set, spot_get
 from .. import colors
-from ..net import Scene
+from ..net.scene import Scene
 
 
 class ScoreState(BaseState):
@@ -40,12 +40,9 @@ class ScoreState(BaseState):
                 file_name='Jingle_Achievement_00.wav'
         )
 
-        # toggle flags
+        # toggle flags (see on_begin)
         self._show_scores = True
 
-        # a player to have better sound playback
-        self._player = pyglet.media.Player()
-
     #
     # pyglet event callbacks
     #
@@ -55,13 +52,13 @@ class ScoreState(BaseState):
 
 
     def on_begin(self):
+        self._show_scores = True
         pyglet.clock.schedule_interval(self._toggle_show_scores, 0.1)
         self.set_background_color(*colors.CRIMSON)
 
         #play the sound!
-        if not self._player.playing:
-           self._player.queue(self._snd_score)
-           self._player.play()
+        if not self.sorcerer.sound_playing('snd_score'):
+            self.sorcerer.play_sound('snd_score')
 
 
     def on_exit(self):
@@ -69,9 +66,10 @@ class ScoreState(BaseState):
 
     def on_update(self):
         # Draw all the things but the ball in the client!
-        if self._show_scores:
-            self.client.draw_scores()
-        self.client.draw_paddles()
+        self.client.draw(
+            board=False, ball=False, entities=False,
+            scores=self._show_scores
+        )
 
         # Switch to previous state
         if self.client.server_state == Scene.ST_PLAYING:
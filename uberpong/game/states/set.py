@@ -20,7 +20,7 @@ import pyglet
 
 from .. import colors
 from .base import BaseState
-from ..net import Scene
+from ..net.scene import Scene
 
 
 class GameSetState(BaseState):
@@ -46,24 +46,19 @@ class GameSetState(BaseState):
             file_name='Jingle_Win_00.wav'
         )
 
-        # a player to have better sound playback
-        self._player = pyglet.media.Player()
-
     #
     # pyglet event callbacks
     #
 
     def _go_back(self, dt):
         if self._server is not None:
-            # TODO: horrible workaround
-            self._server._state = Scene.ST_BEGIN
+            self._server.restart()
         self.pop_until('game_begin')
 
     def on_begin(self):
         # play the damn sound!
-        if not self._player.playing:
-            self._player.queue(self._snd_gameset)
-            self._player.play()
+        if not self.sorcerer.sound_playing('snd_gameset'):
+            self.sorcerer.play_sound('snd_gameset')
 
         self.set_background_color(*colors.TURQUOISE)
         pyglet.clock.schedule_once(
@@ -29,6 +29,9 @@ from .. import colors
 class SplashState(BaseState):
     """Game start state"""
 
+    # Only the ball rotates, on 60 Hz steps
+    FPS = 60
+
     def __init__(self, *, machine):
         """Constructor
 
@@ -39,13 +42,8 @@ class SplashState(BaseState):
         # Call my parent
         super().__init__(machine=machine, fade_in=True)
 
-        # base image
-        self._img = self.sorcerer.get_resource('sprite_sheet')
-
         # logo sprite
-        _logo_region = self._img.get_region(96, 0, 464, 256)
-        _logo_region.anchor_x = _logo_region.width // 2
-        _logo_region.anchor_y = _logo_region.height // 2
+        _logo_region = self.sorcerer.get_region('logo')
         self._logo_sprite = pyglet.sprite.Sprite(_logo_region)
         self._logo_sprite.set_position(
             self.window.width // 2,
@@ -53,9 +51,7 @@ class SplashState(BaseState):
         )
 
         # ball sprite
-        _ball_region = self._img.get_region(32, 32, 64, 64)
-        _ball_region.anchor_x = _ball_region.width // 2
-        _ball_region.anchor_y = _ball_region.height // 2
+        _ball_region = self.sorcerer.get_region('big_ball')
         self._ball_sprite = pyglet.sprite.Sprite(_ball_region)
         self._ball_sprite.set_position(
             self._logo_sprite.x + _logo_region.width//2 - 16,
@@ -166,7 +162,7 @@ class SplashState(BaseState):
         self._show_press_start = False
 
         # Play begin sound
-        self.snd_begin.play()
+        self.sorcerer.play_sound('snd_begin')
 
         # Schedule a new state onto the stack after the sound has been played
         pyglet.clock.schedule_once(
@@ -17,7 +17,7 @@ See LICENSE for more details.
 
 from .base import BaseState
 from .. import colors
-from ..net import Scene
+from ..net.scene import Scene
 
 
 class WaitState(BaseState):
@@ -23,7 +23,9 @@ def create_label(text='', *,
                  bold=False,
                  font_name=FONT_PRIMARY,
                  anchor_x='center',
-                 anchor_y='center'):
+                 anchor_y='center',
+                 batch=None,
+                 group=None):
     """ Create a pyglet label easily
 
     Args:
@@ -36,6 +38,8 @@ def create_label(text='', *,
         bold(bool, optional): whether or not this label is going to be rendered as bold text
         anchor_x(int, optional): horizontal anchor for this label
         anchor_y(int), optional: vertical anchor for this label
+        batch(pyglet.graphics.Batch, optional): batch to render this label on
+        group(pyglet.graphics.Group, optional): group within the batch
     """
 
     # by default, a label created under this method
@@ -54,7 +58,8 @@ def create_label(text='', *,
     label = pyglet.text.Label(
         text, font_name=font_name, font_size=font_size,
         x=pos_x, y=pos_y, bold=bold,
-        anchor_x=anchor_x, anchor_y=anchor_y
+        anchor_x=anchor_x, anchor_y=anchor_y,
+        batch=batch, group=group
     )
     label.set_style('color', colors.GRAY0 + (255,))
 
@@ -10,13 +10,11 @@ See LICENSE for more details.
 """
 
 import socket
-import lz4
+import importlib
 
-from .json import JsonCodec
-from .ubjson import UbJsonCodec
-from .bson import BsonCodec
-
-NET_MAX_BYTES = 512
+# Largest UDP payload over IPv4, snapshots carrying
+# lots of entities can get way bigger than a single MTU
+NET_MAX_BYTES = 65507
 NET_ENCODING = 'utf-8'
 
 
@@ -25,24 +23,37 @@ class Channel:
     UDP data flow unit
     """
 
+    # Codecs (module and class), each one is only
+    # imported when actually used
     CODECS = {
-        'json': JsonCodec,
-        'bson': BsonCodec,
-        'ubjson': UbJsonCodec
+        'json': ('.json', 'JsonCodec'),
+        'bson': ('.bson', 'BsonCodec'),
+        'ubjson': ('.ubjson', 'UbJsonCodec')
     }
 
-    def __init__(self, *, codec='json'):
-        """Constructor"""
+    def __init__(self, *, codec='json', sock=None):
+        """Constructor
+
+        Kwargs:
+            codec(str, optional): name of the codec to use (see CODECS)
+            sock(optional): socket to use instead of a new UDP one
+                (e.g. a loopback one, see ming.loopback)
+        """
 
         #
         if codec.lower() not in self.CODECS:
             raise TypeError('{} is not a valid codec!'.format(codec))
 
         #
-        self._codec = self.CODECS[codec.lower()]()
+        module, cls = self.CODECS[codec.lower()]
+        self._codec = getattr(
+            importlib.import_module(module, __package__), cls
+        )()
 
         # Create the actual UDP socket
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock = sock
 
         #########################################################
         # Set the socket to non-blocking mode, so the socket won't
@@ -50,8 +61,15 @@ class Channel:
         #########################################################
         self.sock.setblocking(False)
 
-        # LZ4 compression flag
+        # LZ4 compression flag and module (imported when enabled)
         self._use_lz4 = False
+        self._lz4 = None
+
+        # Traffic counters
+        self.packets_in = 0
+        self.packets_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
 
     @property
     def use_lz4(self):
@@ -61,26 +79,57 @@ class Channel:
     @use_lz4.setter
     def use_lz4(self, value):
         """Activate/deactivate use of LZ4 compression"""
+        if value and self._lz4 is None:
+            self._lz4 = importlib.import_module('lz4')
         self._use_lz4 = value
 
     def pump(self):
         """Receive raw data from socket and decode it as a dict"""
-        data = {}  # fancy data
+        datagram = self._receive()
+        if datagram is not None:
+            self._dispatch(*datagram)
 
-        # Extract raw JSON data from socket and
-        # convert it into a dict (if possible)
+    def _receive(self):
+        """Receive a datagram from socket
+
+        Returns:
+            A (raw data, address) tuple, None if there's nothing
+            to receive
+        """
         try:
             data_raw, addr = self.sock.recvfrom(NET_MAX_BYTES)
+        except OSError:
+            return None
+        self.packets_in += 1
+        self.bytes_in += len(data_raw)
+        return data_raw, addr
+
+    def _decode(self, data_raw):
+        """Decode a datagram
+
+        Returns:
+            Decoded data, None unless it is a non-empty dict or list
+        """
+        # Convert raw JSON data into a dict (if possible)
+        try:
             if self._use_lz4:
-                data_str = lz4.uncompress(data_raw)
+                data_str = self._lz4.uncompress(data_raw)
             else:
                 data_str = data_raw
             data = self._codec.decode(data_str)
         except Exception as e:
-            pass
+            return None
 
-        # on_data_received is only called if data is not empty
         if (isinstance(data, dict) or isinstance(data, list)) and len(data):
+            return data
+        return None
+
+    def _dispatch(self, data_raw, addr):
+        """Decode a datagram and hand it over to on_data_received"""
+        data = self._decode(data_raw)
+
+        # on_data_received is only called if data is not empty
+        if data is not None:
             self.on_data_received(data, addr[0], addr[1])
 
     def send(self, data, host, port):
@@ -91,12 +140,14 @@ class Channel:
 
         # Getting raw data
         if self._use_lz4:
-            data_raw = lz4.compress(self._codec.encode(data))
+            data_raw = self._lz4.compress(self._codec.encode(data))
         else:
             data_raw = self._codec.encode(data)
 
         # Put the data on the wire as an UTF-8 JSON string
         self.sock.sendto(data_raw, (host, port))
+        self.packets_out += 1
+        self.bytes_out += len(data_raw)
 
     def close(self):
         """Close socket"""
@@ -0,0 +1,486 @@
+# -*- coding: utf-8 -*-
+
+"""
+ming.proxy
+~~~~~~~~
+Network conditions emulator
+
+A Proxy stands between clients and a server, relaying datagrams both
+ways as a bad link would: late, with some jitter, some of them lost,
+duplicated or out of order, and no faster than a given rate. Upstream
+(client to server) and downstream (server to client) conditions are
+set apart, and each direction draws from a seeded RNG of its own, so
+the very same packets meet the very same fate on every run.
+
+Each client is given a socket of its own towards the server, so the
+server tells clients apart just as it would with no proxy in between.
+Those sockets are closed once their client goes quiet for a while,
+and they're all waited on through a selector (epoll where available),
+so thousands of clients can go through a proxy as long as the open
+files limit (ulimit -n) allows for one socket each.
+
+Conditions are written as a comma separated list of name=value pairs:
+
+    latency      delay added to every packet (ms)
+    jitter       delay varies this much either way (ms)
+    loss         chance of a packet being lost (0-1)
+    duplicate    chance of a packet being sent twice (0-1)
+    reorder      chance of a packet skipping the delay (0-1)
+    rate         bandwidth cap (bytes per second, 0 is none)
+    limit        packets queued on a capped link before dropping
+
+Usage:
+    proxy.py <listen_port> <server_address> <server_port> [--up <conditions>] [--down <conditions>] [--seed <seed>] [--idle <seconds>] [--stats <seconds>]
+    proxy.py -h | --help
+
+Options:
+  -u --up <conditions>        Client to server conditions
+  -d --down <conditions>      Server to client conditions
+  -s --seed <seed>            Seed for both RNGs
+  --idle <seconds>            Forget clients quiet for this long [default: 30]
+  --stats <seconds>           Print stats this often [default: 5]
+  -h --help                   Show this screen.
+
+e.g.
+    PYTHONPATH=. python3 -m uberpong.ming.proxy 54213 localhost 54212 \\
+        --up latency=40,jitter=10,loss=0.01 --down latency=40,rate=32000
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import heapq
+import random
+import selectors
+import socket
+import time
+from collections import OrderedDict
+
+from .channel import NET_MAX_BYTES
+
+
+class Conditions:
+    """Conditions of one direction of a link"""
+
+    FIELDS = ('latency', 'jitter', 'loss', 'duplicate',
+              'reorder', 'rate', 'limit')
+
+    def __init__(self, *, latency=0, jitter=0, loss=0.0, duplicate=0.0,
+                 reorder=0.0, rate=0, limit=1000):
+        """Constructor
+
+        Kwargs:
+            latency(float): delay added to every packet (ms)
+            jitter(float): delay varies this much either way (ms)
+            loss(float): chance of a packet being lost
+            duplicate(float): chance of a packet being sent twice
+            reorder(float): chance of a packet skipping the delay
+            rate(int): bandwidth cap in bytes per second (0 is none)
+            limit(int): packets queued on a capped link before dropping
+        """
+        for name, value in (('loss', loss), ('duplicate', duplicate),
+                            ('reorder', reorder)):
+            if not 0 <= value <= 1:
+                raise ValueError('{} must be within 0 and 1'.format(name))
+        if latency < 0 or jitter < 0 or rate < 0 or limit < 1:
+            raise ValueError('invalid conditions')
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.duplicate = duplicate
+        self.reorder = reorder
+        self.rate = rate
+        self.limit = limit
+
+    @classmethod
+    def parse(cls, spec):
+        """Build conditions out of 'name=value,...'
+
+        Args:
+            spec(str): conditions (None or empty is a perfect link)
+        Raises:
+            ValueError: spec is not valid
+        """
+        kwargs = {}
+        for pair in (spec or '').split(','):
+            if not pair.strip():
+                continue
+            name, sep, value = pair.partition('=')
+            name = name.strip()
+            if not sep or name not in cls.FIELDS:
+                raise ValueError('invalid condition: {!r}'.format(pair))
+            kwargs[name] = int(value) if name == 'limit' else float(value)
+        return cls(**kwargs)
+
+    def __repr__(self):
+        return ','.join('{}={}'.format(name, getattr(self, name))
+                        for name in self.FIELDS)
+
+
+class Link:
+    """
+    One direction of an emulated link
+
+    This only decides when (if ever) packets get across, sending
+    them is up to whoever is using it (see Proxy).
+    """
+
+    def __init__(self, conditions, rng):
+        """Constructor
+
+        Args:
+            conditions(Conditions): conditions to emulate
+            rng(random.Random): source of randomness
+        """
+        self.conditions = conditions
+        self._rng = rng
+
+        # When the capped link is done putting out queued packets,
+        # and when each of those is done
+        self._free_at = 0.0
+        self._backlog = []
+
+        # Stats
+        self.packets_in = 0
+        self.lost = 0
+        self.duplicated = 0
+        self.reordered = 0
+        self.overflowed = 0
+
+    def submit(self, size, now):
+        """Decide the fate of a packet
+
+        Args:
+            size(int): packet size in bytes
+            now(float): current time in seconds
+        Returns:
+            A list of times (in seconds) at which a copy of the
+            packet is to be sent, empty if it's been lost
+        """
+        c = self.conditions
+        rng = self._rng
+        self.packets_in += 1
+
+        if c.loss and rng.random() < c.loss:
+            self.lost += 1
+            return []
+
+        # Bandwidth cap, packets are put out one after the other
+        departure = now
+        if c.rate:
+            backlog = self._backlog
+            while backlog and backlog[0] <= now:
+                heapq.heappop(backlog)
+            if len(backlog) >= c.limit:
+                self.overflowed += 1
+                return []
+            departure = max(now, self._free_at) + size / c.rate
+            self._free_at = departure
+            heapq.heappush(backlog, departure)
+
+        copies = 1
+        if c.duplicate and rng.random() < c.duplicate:
+            self.duplicated += 1
+            copies = 2
+
+        times = []
+        for i in range(copies):
+            if c.reorder and rng.random() < c.reorder:
+                # jumps ahead of whatever is being delayed
+                self.reordered += 1
+                times.append(departure)
+                continue
+            delay = c.latency
+            if c.jitter:
+                delay += rng.uniform(-c.jitter, c.jitter)
+            times.append(departure + max(delay, 0) / 1000)
+        return times
+
+
+class Proxy:
+    """
+    UDP proxy emulating network conditions
+
+    It can be run on its own (see run), or pumped along with
+    something else (see pump and next_due).
+    """
+
+    # Size of socket buffers (bytes)
+    SOCKET_BUFFER = 1 << 20
+
+    def __init__(self, *, port, server_address, server_port,
+                 up=None, down=None, seed=None, idle_timeout=30,
+                 clock=time.perf_counter, sock_factory=None):
+        """Constructor
+
+        Kwargs:
+            port(int): port clients connect to
+            server_address(str): address of the server
+            server_port(int): port of the server
+            up(Conditions, optional): client to server conditions
+            down(Conditions, optional): server to client conditions
+            seed(int, optional): seed for both directions
+            idle_timeout(float): seconds a client can go without
+                traffic either way before its socket is closed
+            clock(callable): current time in seconds
+            sock_factory(callable, optional): creates sockets, UDP
+                sockets by default (in-process sockets with no file
+                descriptor, see ming.loopback, can only be pumped)
+        """
+        if sock_factory is None:
+            def sock_factory():
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+                # room for bursts while packets are being delayed
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF,
+                                self.SOCKET_BUFFER)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF,
+                                self.SOCKET_BUFFER)
+                return sock
+        self._sock_factory = sock_factory
+        self._clock = clock
+        self._server = (server_address, server_port)
+
+        if seed is None:
+            up_rng, down_rng = random.Random(), random.Random()
+        else:
+            up_rng = random.Random(seed * 2)
+            down_rng = random.Random(seed * 2 + 1)
+        self.up = Link(up or Conditions(), up_rng)
+        self.down = Link(down or Conditions(), down_rng)
+
+        self._idle_timeout = idle_timeout
+
+        self.sock = self._socket()
+        self.sock.bind(('', port))
+
+        # Sockets are waited on through a selector, if they can be
+        self._selector = None
+        if hasattr(self.sock, 'fileno'):
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self.sock, selectors.EVENT_READ)
+
+        # client address -> [socket towards the server, last seen],
+        # least recently seen first, and socket -> client address
+        self._upstream = OrderedDict()
+        self._clients = {}
+
+        # Clients forgotten for being quiet
+        self.expired = 0
+
+        # Packets on the wire: (due, seq, data, sock, address)
+        self._queue = []
+        self._seq = 0
+
+        self.packets_out = 0
+
+    def _socket(self):
+        sock = self._sock_factory()
+        sock.setblocking(False)
+        return sock
+
+    @property
+    def sockets(self):
+        """Every socket this proxy receives on"""
+        return [self.sock] + list(self._clients)
+
+    def _enqueue(self, link, data, sock, address, now):
+        queue = self._queue
+        for due in link.submit(len(data), now):
+            heapq.heappush(queue, (due, self._seq, data, sock, address))
+            self._seq += 1
+
+    def _open(self, address, now):
+        """Open a socket towards the server for a client"""
+        sock = self._socket()
+
+        # it has to be bound before it can be waited on
+        sock.bind(('', 0))
+        if self._selector is not None:
+            self._selector.register(sock, selectors.EVENT_READ)
+
+        entry = self._upstream[address] = [sock, now]
+        self._clients[sock] = address
+        return entry
+
+    def _close(self, address):
+        """Close the socket towards the server of a client"""
+        sock, last_seen = self._upstream.pop(address)
+        del self._clients[sock]
+        if self._selector is not None:
+            self._selector.unregister(sock)
+        sock.close()
+
+    def _touch(self, address, now):
+        """Take note of traffic from or to a client"""
+        entry = self._upstream[address]
+        entry[1] = now
+        self._upstream.move_to_end(address)
+        return entry[0]
+
+    def expire(self, now=None):
+        """Close sockets of clients quiet for too long"""
+        if now is None:
+            now = self._clock()
+        deadline = now - self._idle_timeout
+        upstream = self._upstream
+        while upstream:
+            address, (sock, last_seen) = next(iter(upstream.items()))
+            if last_seen > deadline:
+                break
+            self._close(address)
+            self.expired += 1
+
+    def _receive(self, sock, now):
+        """Take in everything waiting on a socket"""
+        while True:
+            try:
+                data, address = sock.recvfrom(NET_MAX_BYTES)
+            except (BlockingIOError, InterruptedError):
+                return
+
+            if sock is self.sock:
+                # From a client, to the server
+                if address in self._upstream:
+                    upstream = self._touch(address, now)
+                else:
+                    upstream = self._open(address, now)[0]
+                self._enqueue(self.up, data, upstream, self._server, now)
+            else:
+                # From the server, back to its client
+                address = self._clients[sock]
+                self._touch(address, now)
+                self._enqueue(self.down, data, self.sock, address, now)
+
+    def flush(self, now=None):
+        """Send every packet due by now"""
+        if now is None:
+            now = self._clock()
+        queue = self._queue
+        while queue and queue[0][0] <= now:
+            due, seq, data, sock, address = heapq.heappop(queue)
+            try:
+                sock.sendto(data, address)
+                self.packets_out += 1
+            except OSError:
+                pass
+
+    def pump(self, readable=None):
+        """Relay packets
+
+        Args:
+            readable(list, optional): sockets known to have data, by
+                default those the selector finds ready (or all of
+                them, for sockets that can't be waited on)
+        """
+        now = self._clock()
+        if readable is None:
+            readable = self._ready(0)
+        for sock in readable:
+            self._receive(sock, now)
+        self.flush(now)
+
+    def poll(self, timeout):
+        """Wait for packets (or for some to be due) and relay them
+
+        Args:
+            timeout(float): seconds to wait at most
+        """
+        due = self.next_due()
+        if due is not None:
+            timeout = min(timeout, due - self._clock())
+        self.pump(self._ready(max(timeout, 0)))
+
+    def _ready(self, timeout):
+        """Sockets with data waiting on them"""
+        if self._selector is None:
+            return self.sockets
+        return [key.fileobj for key, events
+                in self._selector.select(timeout)]
+
+    def next_due(self):
+        """Time at which the next packet is due (None if none)"""
+        return self._queue[0][0] if self._queue else None
+
+    def run(self, *, stats_interval=None):
+        """Relay packets until interrupted
+
+        Kwargs:
+            stats_interval(float, optional): print stats this often
+        """
+        now = self._clock()
+        next_stats = None
+        if stats_interval:
+            next_stats = now + stats_interval
+
+        # idle clients are looked for a few times per timeout
+        expire_interval = self._idle_timeout / 4
+        next_expire = now + expire_interval
+
+        while True:
+            now = self._clock()
+            if now >= next_expire:
+                self.expire(now)
+                next_expire = now + expire_interval
+            timeout = next_expire - now
+            if next_stats is not None:
+                if now >= next_stats:
+                    print(self.format_stats())
+                    next_stats += stats_interval
+                timeout = min(timeout, next_stats - now)
+            self.poll(timeout)
+
+    def format_stats(self):
+        """Stats for both directions as a printable string"""
+        lines = []
+        for name, link in (('up', self.up), ('down', self.down)):
+            lines.append(
+                '{:<5} in {:8d}  lost {:6d}  dup {:6d}  reorder {:6d}'
+                '  overflow {:6d}'.format(
+                    name, link.packets_in, link.lost, link.duplicated,
+                    link.reordered, link.overflowed)
+            )
+        lines.append(
+            'out   {:8d}  queued {:6d}  clients {:6d}  expired {}'.format(
+                self.packets_out, len(self._queue), len(self._clients),
+                self.expired)
+        )
+        return '\n'.join(lines)
+
+    def close(self):
+        """Close every socket"""
+        for address in list(self._upstream):
+            self._close(address)
+        if self._selector is not None:
+            self._selector.close()
+        self.sock.close()
+        self._queue.clear()
+
+
+def main(argv=None):
+    from docopt import docopt
+
+    options = docopt(__doc__, argv=argv)
+    seed = options['--seed']
+    proxy = Proxy(
+        port=int(options['<listen_port>']),
+        server_address=options['<server_address>'],
+        server_port=int(options['<server_port>']),
+        up=Conditions.parse(options['--up']),
+        down=Conditions.parse(options['--down']),
+        seed=int(seed) if seed is not None else None,
+        idle_timeout=float(options['--idle'])
+    )
+    print('up:   {!r}\ndown: {!r}'.format(proxy.up.conditions,
+                                         proxy.down.conditions))
+    try:
+        proxy.run(stats_interval=float(options['--stats']))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(proxy.format_stats())
+        proxy.close()
+
+
+if __name__ == '__main__':
+    main()
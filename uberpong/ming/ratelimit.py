@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+ming.ratelimit
+~~~~~~~~
+Token buckets per client address
+
+Each address gets a bucket per message class, holding up to a burst
+of tokens and refilled at a steady rate. Every message takes a token
+and messages finding the bucket empty are rejected. Buckets are kept
+on a table of bounded size, the least recently used ones being thrown
+away to make room for new ones.
+
+(c) 2015 by Alejandro Ricoveri
+See LICENSE for more details.
+"""
+
+import time
+from collections import OrderedDict
+
+
+class RateLimiter:
+    """Token buckets per (address, message class)"""
+
+    def __init__(self, limits, *, max_buckets=4096, clock=time.perf_counter):
+        """Constructor
+
+        Args:
+            limits(dict): (rate, burst) for each message class, rate
+                being tokens per second, classes with no limit
+                are never rejected
+        Kwargs:
+            max_buckets(int): buckets kept at most
+            clock(callable): current time in seconds
+        """
+        self._limits = {}
+        for cls, (rate, burst) in limits.items():
+            self.set_limit(cls, rate, burst)
+        self._max_buckets = max_buckets
+        self._clock = clock
+
+        # (address, class) -> [tokens, last refill]
+        self._buckets = OrderedDict()
+
+        # Rejected messages for each class
+        self.rejected = {}
+
+        # Buckets thrown away to make room
+        self.evictions = 0
+
+    def set_limit(self, cls, rate, burst):
+        """Set (or lift, with a rate of 0) the limit of a message class
+
+        Buckets already on the table keep their tokens.
+        """
+        if rate:
+            self._limits[cls] = (float(rate), float(max(burst, 1)))
+        else:
+            self._limits.pop(cls, None)
+
+    @property
+    def buckets(self):
+        """Number of buckets on the table"""
+        return len(self._buckets)
+
+    def allow(self, address, cls):
+        """Take a token for a message
+
+        Args:
+            address(tuple): (host, port) the message comes from
+            cls(str): message class
+        Returns:
+            Whether the message is allowed through
+        """
+        limit = self._limits.get(cls)
+        if limit is None:
+            return True
+        rate, burst = limit
+
+        now = self._clock()
+        key = (address, cls)
+        buckets = self._buckets
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self._max_buckets:
+                buckets.popitem(last=False)
+                self.evictions += 1
+            bucket = buckets[key] = [burst, now]
+        else:
+            buckets.move_to_end(key)
+            tokens = bucket[0] + (now - bucket[1]) * rate
+            bucket[0] = tokens if tokens < burst else burst
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return True
+
+        self.rejected[cls] = self.rejected.get(cls, 0) + 1
+        return False
@@ -10,19 +10,94 @@ See LICENSE for more details.
 """
 
 from .channel import Channel
+from .ratelimit import RateLimiter
 
 
 class Server(Channel):
     """
     Network server implementation
+
+    Incoming datagrams can be rate limited per client address, in
+    two stages: all datagrams from an address are limited together
+    right after being received, before being decoded at all (see
+    DATAGRAM_CLASS), and then, once decoded, each message is limited
+    along the others of its class (see classify).
     """
-    def __init__(self, *, port, **kwargs):
-        """Constructor"""
+
+    # Rejected datagrams skipped over on a single pump
+    MAX_REJECTS = 64
+
+    # Class limiting all datagrams from an address, before decoding
+    DATAGRAM_CLASS = 'datagram'
+
+    def __init__(self, *, port, limits=None, max_buckets=4096, **kwargs):
+        """Constructor
+
+        Kwargs:
+            port(int): port to listen on
+            limits(dict, optional): (rate, burst) for each message
+                class, no rate limiting at all if not given
+                (see ming.ratelimit.RateLimiter)
+            max_buckets(int): token buckets kept at most
+            kwargs(dict, optional): see Channel
+        """
         super().__init__(**kwargs)
 
         # Bind socket to port
         self.sock.bind(("", port))
 
+        # Token buckets
+        self.limiter = None
+        if limits is not None:
+            self.limiter = RateLimiter(limits, max_buckets=max_buckets)
+
+        # Datagrams rejected for going over their limit
+        self.packets_rejected = 0
+
+    def classify(self, data):
+        """Tell the class of a message
+
+        Args:
+            data(dict|list): decoded message
+        Returns:
+            The class of the message, None for no class at all
+        """
+        return None
+
+    def admit(self, addr, cls):
+        """Whether a message is to be taken in
+
+        Args:
+            addr(tuple): (host, port) it comes from
+            cls(str): class of the message
+        """
+        limiter = self.limiter
+        if limiter is None or cls is None or limiter.allow(addr, cls):
+            return True
+        self.packets_rejected += 1
+        return False
+
+    def pump(self):
+        """Take in a datagram
+
+        Rejected datagrams are thrown away and the next one is
+        received in their place, so floods can't keep other
+        clients from being heard.
+        """
+        for i in range(self.MAX_REJECTS + 1):
+            datagram = self._receive()
+            if datagram is None:
+                return
+            data_raw, addr = datagram
+            if not self.admit(addr, self.DATAGRAM_CLASS):
+                continue
+            data = self._decode(data_raw)
+            if data is None:
+                continue
+            if self.admit(addr, self.classify(data)):
+                self.on_data_received(data, addr[0], addr[1])
+                return
+
     def send_default(self, data, host, port):
         self.send({
             "src_addr": host,